@@ -0,0 +1,169 @@
+import asyncio
+import io
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from asgiref.sync import AsyncToSync, SyncToAsync
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+# Чтение API: произведения, отзывы и комментарии.
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+READ_PATH = re.compile(r'^/api/v1/titles/')
+
+OVERLOADED = json.dumps(
+    {'detail': 'Сервер перегружен, повторите запрос позже'},
+    ensure_ascii=False
+).encode()
+
+
+class Pool:
+    """Пул потоков и число запросов, ожидающих его или выполняемых в нём."""
+
+    def __init__(self, name, threads):
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix=name)
+        self.pending = 0
+
+
+class PooledWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """
+    WsgiToAsgiInstance, выполняющий приложение в заданном пуле потоков.
+    В asgiref run_wsgi_app обёрнут в sync_to_async с thread_sensitive=True,
+    и все запросы шли бы в один общий поток, поэтому __call__ и запуск
+    приложения написаны здесь; от asgiref остаются build_environ и
+    start_response. В отличие от asgiref у ответа вызывается close(): на нём
+    Django отправляет request_finished и закрывает соединение потока с базой.
+    """
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    def build_environ(self, scope, body):
+        environ = super().build_environ(scope, body)
+        # Тело уже прочитано целиком, в том числе при chunked-передаче
+        # без Content-Length.
+        environ['CONTENT_LENGTH'] = str(body.seek(0, io.SEEK_END))
+        body.seek(0)
+        return environ
+
+    async def __call__(self, scope, receive, send):
+        self.scope = scope
+        with SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message['type'] != 'http.request':
+                    raise ValueError(
+                        f'Неожиданное сообщение {message["type"]}')
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            self.sync_send = AsyncToSync(send)
+            await SyncToAsync(
+                self.run_application, thread_sensitive=False,
+                executor=self.executor
+            )(body)
+
+    def run_application(self, body):
+        """Выполняется в потоке пула: start_response и send в одном потоке."""
+        environ = self.build_environ(self.scope, body)
+        response = self.wsgi_application(environ, self.start_response)
+        try:
+            self.send_body(response)
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+    def send_body(self, response):
+        bytes_sent = 0
+        for output in response:
+            if not self.response_started:
+                self.response_started = True
+                self.sync_send(self.response_start)
+            length = self.response_content_length
+            if length is not None:
+                # Не больше байт, чем объявлено в Content-Length.
+                output = output[:length - bytes_sent]
+            self.sync_send({
+                'type': 'http.response.body', 'body': output,
+                'more_body': True,
+            })
+            bytes_sent += len(output)
+            if bytes_sent == length:
+                return
+
+
+class ThreadPoolASGIHandler(WsgiToAsgi):
+    """
+    ASGI-приложение поверх WSGI-обработчика Django 2.2, где нет
+    асинхронных представлений: протокол ведёт asgiref.wsgi.WsgiToAsgi.
+
+    Соединения и чтение тела запроса обслуживаются циклом событий, поток
+    занят обработкой запроса в Django и отправкой ответа (потоковый ответ
+    читается курсором базы, который нельзя передать другому потоку).
+    Чтение произведений, отзывов и комментариев идёт в отдельный пул
+    потоков, остальное - в пул записи, поэтому медленная база не отнимает
+    потоки у другой половины API. У каждого потока своё соединение с базой,
+    размер пулов ограничивает и их. Когда запросов к пулу больше
+    max_pending, новые сразу получают 503.
+    """
+
+    def __init__(self, wsgi_application, read_threads=32, write_threads=8,
+                 max_pending=1024):
+        super().__init__(wsgi_application)
+        self.max_pending = max_pending
+        self.pools = {
+            'read': Pool('asgi-read', read_threads),
+            'write': Pool('asgi-write', write_threads),
+        }
+
+    def get_pool(self, scope):
+        if scope['method'] in READ_METHODS and READ_PATH.match(scope['path']):
+            return self.pools['read']
+        return self.pools['write']
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(
+                f'Неподдерживаемый тип соединения {scope["type"]}')
+        pool = self.get_pool(scope)
+        if pool.pending >= self.max_pending:
+            return await self.send_response(send, 503, [
+                (b'content-type', b'application/json'),
+                (b'retry-after', b'1'),
+            ], OVERLOADED)
+        pool.pending += 1
+        try:
+            await PooledWsgiToAsgiInstance(
+                self.wsgi_application, pool.executor
+            )(scope, receive, send)
+        finally:
+            pool.pending -= 1
+        return None
+
+    async def send_response(self, send, status, headers, body):
+        await send({
+            'type': 'http.response.start', 'status': status,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                loop = asyncio.get_event_loop()
+                for pool in self.pools.values():
+                    await loop.run_in_executor(None, pool.executor.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
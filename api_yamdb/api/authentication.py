@@ -0,0 +1,135 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+# Права в permissions.py проверяются по ролям из токена, без запроса
+# к базе. Полная запись пользователя нужна только отдельным view, для них
+# есть короткоживущий кеш в памяти процесса. При смене роли, прав или
+# блокировке пользователя сигналы сбрасывают кеш и отзывают выданные
+# ранее токены: время отзыва записывается в User.tokens_revoked_at и
+# сравнивается с временем выпуска токена (iat). Кеш Django держит это
+# время TOKEN_USER_CACHE_TTL секунд; с общим кешем (Redis, Memcached)
+# отзыв виден всем процессам сразу, с кешем в памяти процесса - не позже
+# чем через TOKEN_USER_CACHE_TTL секунд.
+
+USER_CLAIMS = ('role', 'is_staff', 'is_superuser', 'username')
+REVOKED_KEY = 'token-user-revoked:{}'
+
+_users = {}
+_users_lock = threading.Lock()
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с ролью и правами пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['iat'] = time.time()
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, восстановленный из токена без запроса к базе."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    def get_instance(self):
+        return get_cached_user(self.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без загрузки пользователя из базы.
+    Токены без ролей (выданные до ClaimsAccessToken) обслуживаются
+    по-старому, через запись пользователя.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise AuthenticationFailed(
+                'Токен не содержит идентификатор пользователя')
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if validated_token.get('iat', 0) < tokens_revoked_at(user_id):
+            raise AuthenticationFailed('Токен отозван, получите новый')
+        if 'role' not in validated_token:
+            return self.get_legacy_user(user_id)
+        return ClaimsUser(validated_token)
+
+    def get_legacy_user(self, user_id):
+        try:
+            user = get_cached_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Пользователь не найден')
+        if not user.is_active:
+            raise AuthenticationFailed('Пользователь заблокирован')
+        return user
+
+
+def get_cached_user(pk):
+    """Запись пользователя из кеша процесса (TOKEN_USER_CACHE_TTL секунд)."""
+    ttl = settings.TOKEN_USER_CACHE_TTL
+    with _users_lock:
+        expires, user = _users.get(pk, (0, None))
+    if user is None or expires < time.monotonic():
+        user = User.objects.get(pk=pk)
+        if ttl:
+            with _users_lock:
+                _users[pk] = (time.monotonic() + ttl, user)
+    return copy.deepcopy(user)
+
+
+def get_user_instance(user):
+    """Модель пользователя для request.user любого вида."""
+    if isinstance(user, ClaimsUser):
+        return user.get_instance()
+    return user
+
+
+def tokens_revoked_at(pk):
+    """
+    Время последнего отзыва токенов пользователя, 0 - токены не
+    отзывались. Для удалённого пользователя отозваны все токены.
+    """
+    key = REVOKED_KEY.format(pk)
+    revoked = cache.get(key)
+    if revoked is None:
+        row = User.objects.filter(pk=pk).values_list(
+            'tokens_revoked_at').first()
+        if row is None:
+            revoked = float('inf')
+        else:
+            revoked = row[0] or 0
+        cache.set(key, revoked, settings.TOKEN_USER_CACHE_TTL)
+    return revoked
+
+
+def forget_user(pk, revoke=False):
+    """
+    Сбрасывает кеш пользователя; с revoke отзывает его токены и
+    возвращает время отзыва.
+    """
+    with _users_lock:
+        _users.pop(pk, None)
+    if not revoke:
+        return None
+    revoked = time.time()
+    User.objects.filter(pk=pk).update(tokens_revoked_at=revoked)
+    cache.set(REVOKED_KEY.format(pk), revoked, settings.TOKEN_USER_CACHE_TTL)
+    return revoked
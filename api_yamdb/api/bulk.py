@@ -0,0 +1,230 @@
+from django.db import connections, router
+from django.db.models import prefetch_related_objects
+from rest_framework import serializers
+from rest_framework.relations import SlugRelatedField
+from rest_framework.validators import UniqueValidator
+
+# Пакетная запись списков объектов через сериализаторы каталога.
+# Каждый элемент проверяется тем же сериализатором, что и при обычной
+# записи, но слаги связанных объектов и уникальность полей проверяются
+# одним запросом на весь список, а запись идёт через bulk_create,
+# bulk_update и пакетную вставку связей many-to-many. Сигналы моделей
+# при этом не вызываются, версии данных увеличивает вызывающий код.
+
+NOT_FOUND_MESSAGE = 'Объект не найден'
+DUPLICATE_MESSAGE = 'Объект встречается в списке несколько раз'
+
+
+def related_key(relation):
+    return relation.queryset.model._meta.label, relation.slug_field
+
+
+def is_lookup_value(value):
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def slug_relations(serializer):
+    """Поля сериализатора, ссылающиеся на связанные объекты по слагу."""
+    for field in serializer.fields.values():
+        if field.read_only:
+            continue
+        relation = getattr(field, 'child_relation', field)
+        if isinstance(relation, SlugRelatedField):
+            yield field.field_name, relation
+
+
+def resolve_slugs(serializer, items):
+    """
+    Загружает связанные объекты для всех слагов из items, по одному
+    запросу на поле: {related_key: {slug: объект}}.
+    """
+    related = {}
+    for name, relation in slug_relations(serializer):
+        slugs = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            values = value if isinstance(value, list) else [value]
+            slugs.update(str(slug) for slug in values if is_lookup_value(slug))
+        objects = related.setdefault(related_key(relation), {})
+        if slugs:
+            objects.update(
+                (str(getattr(obj, relation.slug_field)), obj)
+                for obj in relation.get_queryset().filter(
+                    **{f'{relation.slug_field}__in': slugs})
+            )
+    return related
+
+
+class BulkItem:
+    __slots__ = ('data', 'instance', 'attrs', 'errors', 'obj')
+
+    def __init__(self, data):
+        self.data = data
+        self.instance = None
+        self.attrs = None
+        self.errors = None
+        self.obj = None
+
+
+class BulkWriter:
+    """
+    Проверка и запись списка объектов сериализатором serializer
+    (ListSerializer). Без creating элементы обновляются: их находят
+    в queryset по полю lookup_field.
+    """
+    batch_size = 1000
+
+    def __init__(self, serializer, queryset, lookup_field, creating):
+        self.child = serializer.child
+        self.model = queryset.model
+        self.queryset = queryset
+        self.creating = creating
+        self.key_field = (
+            self.model._meta.pk.name if lookup_field == 'pk'
+            else lookup_field
+        )
+        self.db = router.db_for_write(self.model)
+        self.m2m_fields = [
+            field for field in self.model._meta.many_to_many
+            if field.name in self.child.fields
+        ]
+
+    def validate(self, items):
+        items = [BulkItem(data) for data in items]
+        self.child.context['related_objects'] = resolve_slugs(
+            self.child, [item.data for item in items])
+        unique_fields = self.pop_unique_validators()
+        if not self.creating:
+            self.find_instances(items)
+        for item in items:
+            if item.errors is not None:
+                continue
+            try:
+                item.attrs = self.child.run_validation(item.data)
+            except serializers.ValidationError as exc:
+                item.errors = serializers.as_serializer_error(exc)
+        if self.creating:
+            for name, source in unique_fields:
+                self.check_unique(items, name, source)
+        return items
+
+    def pop_unique_validators(self):
+        """
+        Убирает UniqueValidator с полей: уникальность проверяется
+        одним запросом в check_unique.
+        """
+        unique_fields = []
+        for name, field in self.child.fields.items():
+            validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+            if len(validators) != len(field.validators):
+                field.validators = validators
+                unique_fields.append((name, field.source))
+        return unique_fields
+
+    def find_instances(self, items):
+        keys = {
+            str(item.data[self.key_field]) for item in items
+            if isinstance(item.data, dict)
+            and is_lookup_value(item.data.get(self.key_field))
+        }
+        instances = {
+            str(getattr(obj, self.key_field)): obj
+            for obj in self.queryset.select_for_update(of=('self',)).filter(
+                **{f'{self.key_field}__in': keys})
+        } if keys else {}
+        seen = set()
+        for item in items:
+            if not isinstance(item.data, dict):
+                continue
+            item.data = dict(item.data)
+            key = item.data.pop(self.key_field, None)
+            if not is_lookup_value(key):
+                item.errors = {self.key_field: [
+                    serializers.Field.default_error_messages['required']]}
+            elif str(key) not in instances:
+                item.errors = {self.key_field: [NOT_FOUND_MESSAGE]}
+            elif str(key) in seen:
+                item.errors = {self.key_field: [DUPLICATE_MESSAGE]}
+            else:
+                item.instance = instances[str(key)]
+                seen.add(str(key))
+
+    def check_unique(self, items, name, source):
+        valid = [
+            item for item in items
+            if item.errors is None and source in item.attrs
+        ]
+        existing = set(self.model.objects.filter(
+            **{f'{source}__in': [item.attrs[source] for item in valid]}
+        ).values_list(source, flat=True)) if valid else set()
+        for item in valid:
+            value = item.attrs[source]
+            if value in existing:
+                item.errors = {name: [str(UniqueValidator.message)]}
+            existing.add(value)
+
+    def write(self, items):
+        """Записывает корректные элементы, возвращает их число."""
+        valid = [item for item in items if item.errors is None]
+        relations = {field.name: [] for field in self.m2m_fields}
+        fields = set()
+        for item in valid:
+            item.obj = item.instance or self.model()
+            for name, value in item.attrs.items():
+                if name in relations:
+                    relations[name].append((item.obj, value))
+                else:
+                    setattr(item.obj, name, value)
+                    fields.add(name)
+        objs = [item.obj for item in valid]
+        if self.creating:
+            self.create(objs)
+        elif fields:
+            self.model.objects.using(self.db).bulk_update(
+                objs, sorted(fields), batch_size=self.batch_size)
+        for field in self.m2m_fields:
+            self.set_relations(field, relations[field.name])
+        self.prefetch(objs)
+        return len(objs)
+
+    def create(self, objs):
+        needs_pk = (
+            self.m2m_fields or self.model._meta.pk.name in self.child.fields)
+        features = connections[self.db].features
+        if needs_pk and not features.can_return_ids_from_bulk_insert:
+            # bulk_create здесь не возвращает первичные ключи.
+            for obj in objs:
+                obj.save(using=self.db)
+            return
+        self.model.objects.using(self.db).bulk_create(
+            objs, batch_size=self.batch_size)
+
+    def set_relations(self, field, relations):
+        if not relations:
+            return
+        through = field.remote_field.through
+        source = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+        if not self.creating:
+            through.objects.using(self.db).filter(
+                **{f'{source}__in': [obj.pk for obj, _ in relations]}
+            ).delete()
+        through.objects.using(self.db).bulk_create([
+            through(**{source: obj.pk, target: pk})
+            for obj, related in relations
+            for pk in dict.fromkeys(related_obj.pk for related_obj in related)
+        ], batch_size=self.batch_size)
+
+    def prefetch(self, objs):
+        names = [field.name for field in self.m2m_fields]
+        if not names:
+            return
+        for obj in objs:
+            getattr(obj, '_prefetched_objects_cache', {}).clear()
+        prefetch_related_objects(objs, *names)
+
+    def represent(self, item):
+        return self.child.to_representation(item.obj)
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import Counter
+from weakref import WeakValueDictionary
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class ResponseCache:
+    """
+    Кеш готовых данных ответа поверх любого бэкенда Django.
+
+    При промахе данные строит только один обработчик: внутри процесса
+    остальные ждут на общей блокировке ключа, между процессами блокировкой
+    служит атомарный cache.add(). Кто не получил блокировку, ждёт, пока
+    значение появится в кеше, а по истечении lock_timeout строит его сам.
+    """
+
+    def __init__(self, prefix, alias='default', timeout=300,
+                 lock_timeout=10, poll_interval=0.05):
+        self.prefix = prefix
+        self.alias = alias
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.counters = Counter()
+        self.counters_lock = threading.Lock()
+        self.local_locks = WeakValueDictionary()
+        self.local_locks_lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def count(self, name):
+        with self.counters_lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self.counters_lock:
+            return {
+                name: self.counters[name]
+                for name in ('hits', 'misses', 'coalesced')
+            }
+
+    def local_lock(self, key):
+        with self.local_locks_lock:
+            return self.local_locks.setdefault(key, threading.Lock())
+
+    def get_or_build(self, key, build):
+        """Возвращает (значение, взято_из_кеша)."""
+        key = f'{self.prefix}:{key}'
+        value = self.cache.get(key)
+        if value is not None:
+            self.count('hits')
+            return value, True
+        with self.local_lock(key):
+            value = self.cache.get(key)
+            if value is not None:
+                self.count('coalesced')
+                return value, True
+            return self.wait_or_build(key, build)
+
+    def wait_or_build(self, key, build):
+        lock_key = f'{key}:lock'
+        if self.cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                return self.build(key, build), False
+            finally:
+                self.cache.delete(lock_key)
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            value = self.cache.get(key)
+            if value is not None:
+                self.count('coalesced')
+                return value, True
+        return self.build(key, build), False
+
+    def build(self, key, build):
+        value = build()
+        self.cache.set(key, value, self.timeout)
+        self.count('misses')
+        return value
+
+
+titles_cache = ResponseCache(
+    'titles',
+    alias=settings.TITLES_CACHE_ALIAS,
+    timeout=settings.TITLES_CACHE_TIMEOUT,
+)
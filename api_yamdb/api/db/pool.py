@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.backends.base.base import NO_DB_ALIAS
+
+# Пулы процесса по псевдонимам баз. После fork (gunicorn с preload_app)
+# пул родителя не используется: его соединения принадлежат мастеру.
+pools = {}
+pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Пул соединений DB-API с ожиданием свободного соединения.
+
+    Соединения открываются по мере надобности, не больше size. Проверка
+    при выдаче локальная (alive), запрос к серверу (ping) уходит только
+    если соединение простояло дольше check_interval секунд. Сломанные
+    соединения, в том числе разорванные сервером, выбрасываются, вместо
+    них открываются новые.
+    """
+
+    def __init__(self, size, timeout=10, check_interval=30,
+                 alive=None, ping=None, reset=None, key=None):
+        self.key = key
+        self.size = size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.alive = alive or (lambda connection: True)
+        self.ping = ping or (lambda connection: True)
+        self.reset = reset or (lambda connection: True)
+        self.pid = os.getpid()
+        self.retired = False
+        self.idle = deque()
+        self.opened = 0
+        self.condition = threading.Condition()
+        self.counters = dict.fromkeys((
+            'checkouts', 'waits', 'timeouts', 'discarded', 'pings',
+        ), 0)
+        self.wait_seconds = 0.0
+
+    def get(self, connect, error=RuntimeError):
+        """Соединение из пула или новое от connect()."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self.condition:
+            self.counters['checkouts'] += 1
+            started = time.monotonic()
+            while True:
+                connection = self.take_idle()
+                if connection is not None:
+                    break
+                if self.opened < self.size:
+                    self.opened += 1
+                    break
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    self.counters['timeouts'] += 1
+                    self.wait_seconds += time.monotonic() - started
+                    raise error(
+                        f'Нет свободных соединений в пуле ({self.size}) '
+                        f'за {self.timeout} с')
+                if not waited:
+                    self.counters['waits'] += 1
+                    waited = True
+                self.condition.wait(left)
+            if waited:
+                self.wait_seconds += time.monotonic() - started
+        if connection is not None:
+            return connection
+        try:
+            return connect()
+        except Exception:
+            self.release_slot()
+            raise
+
+    def take_idle(self):
+        """Последнее вернувшееся исправное соединение (LIFO)."""
+        while self.idle:
+            connection, returned = self.idle.pop()
+            if not self.alive(connection):
+                self.discard(connection)
+                continue
+            if time.monotonic() - returned > self.check_interval:
+                self.counters['pings'] += 1
+                if not self.ping(connection):
+                    self.discard(connection)
+                    continue
+            return connection
+        return None
+
+    def put(self, connection):
+        if os.getpid() != self.pid:
+            # Сокет общий с родителем, закрывать его нельзя.
+            return
+        usable = (
+            not self.retired
+            and self.alive(connection) and self.reset(connection))
+        with self.condition:
+            if usable:
+                self.idle.append((connection, time.monotonic()))
+            else:
+                self.discard(connection)
+            self.condition.notify()
+
+    def discard(self, connection):
+        """Закрыть и забыть соединение; вызывается под condition."""
+        self.counters['discarded'] += 1
+        self.opened -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def release_slot(self):
+        with self.condition:
+            self.opened -= 1
+            self.condition.notify()
+
+    def close_idle(self, retire=False):
+        with self.condition:
+            self.retired = self.retired or retire
+            while self.idle:
+                connection, _ = self.idle.pop()
+                self.discard(connection)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'opened': self.opened,
+                'idle': len(self.idle),
+                'in_use': self.opened - len(self.idle),
+                'wait_seconds': self.wait_seconds,
+                **self.counters,
+            }
+
+
+def get_pool(alias, key, **kwargs):
+    """
+    Пул базы alias в текущем процессе. Если параметры подключения (key)
+    сменились, например тесты перешли на тестовую базу, прежний пул
+    закрывается.
+    """
+    with pools_lock:
+        pool = pools.get(alias)
+        if pool is None or pool.pid != os.getpid() or pool.key != key:
+            if pool is not None and pool.pid == os.getpid():
+                pool.close_idle(retire=True)
+            pool = ConnectionPool(key=key, **kwargs)
+            pools[alias] = pool
+    return pool
+
+
+def close_pool(alias):
+    """Закрыть свободные соединения пула alias, если он есть."""
+    with pools_lock:
+        pool = pools.pop(alias, None)
+    if pool is not None and pool.pid == os.getpid():
+        pool.close_idle(retire=True)
+
+
+def pool_stats():
+    """Состояние пулов процесса: {псевдоним: stats()}."""
+    with pools_lock:
+        current = [
+            (alias, pool) for alias, pool in pools.items()
+            if pool.pid == os.getpid()
+        ]
+    return {alias: pool.stats() for alias, pool in sorted(current)}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Соединения базы Django берутся из ConnectionPool и возвращаются в
+    него вместо закрытия. Настройки - ключ POOL в DATABASES:
+    SIZE, TIMEOUT (ожидание свободного соединения, с) и CHECK_INTERVAL
+    (простой, после которого соединение проверяется запросом, с).
+    С пулом CONN_MAX_AGE лучше оставить 0: соединение возвращается в пул
+    в конце каждого запроса и достаётся другому потоку.
+    """
+    connection_pool = None
+
+    def get_pool(self):
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(
+            self.alias,
+            key=tuple(
+                self.settings_dict[name]
+                for name in ('NAME', 'USER', 'HOST', 'PORT')),
+            size=int(options.get('SIZE', 10)),
+            timeout=float(options.get('TIMEOUT', 10)),
+            check_interval=float(options.get('CHECK_INTERVAL', 30)),
+            alive=self.pool_alive,
+            ping=self.pool_ping,
+            reset=self.pool_reset,
+        )
+
+    def get_new_connection(self, conn_params):
+        if self.alias == NO_DB_ALIAS:
+            # Служебное соединение без базы для создания тестовой базы.
+            return super().get_new_connection(conn_params)
+        self.connection_pool = self.get_pool()
+        return self.connection_pool.get(
+            lambda: super(PooledDatabaseWrapperMixin, self)
+            .get_new_connection(conn_params),
+            error=self.Database.OperationalError,
+        )
+
+    def _close(self):
+        # Соединение возвращается в тот пул, из которого взято.
+        if self.connection_pool is None:
+            super()._close()
+        elif self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.put(self.connection)
+
+    # Проверки - методы класса: пул живёт дольше отдельных обёрток.
+    @classmethod
+    def pool_alive(cls, connection):
+        return True
+
+    @classmethod
+    def pool_ping(cls, connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except cls.Database.Error:
+            return False
+        return True
+
+    @classmethod
+    def pool_reset(cls, connection):
+        """Откатить незавершённую транзакцию перед возвратом в пул."""
+        try:
+            connection.rollback()
+        except cls.Database.Error:
+            return False
+        return True
+
+
+class PooledCreationMixin:
+    """Тестовую базу нельзя удалить, пока пул держит к ней соединения."""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pool(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
@@ -0,0 +1,30 @@
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+from ..pool import PooledCreationMixin, PooledDatabaseWrapperMixin
+
+
+class DatabaseCreation(PooledCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """PostgreSQL с пулом соединений: ENGINE = 'api.db.postgresql'."""
+    creation_class = DatabaseCreation
+
+    @classmethod
+    def pool_alive(cls, connection):
+        # Без запроса к серверу: psycopg2 помечает соединение закрытым
+        # или в неизвестном состоянии, если сервер его разорвал.
+        return (
+            not connection.closed
+            and connection.get_transaction_status()
+            != extensions.TRANSACTION_STATUS_UNKNOWN
+        )
+
+    @classmethod
+    def pool_reset(cls, connection):
+        if (connection.get_transaction_status()
+                == extensions.TRANSACTION_STATUS_IDLE):
+            return True
+        return super().pool_reset(connection)
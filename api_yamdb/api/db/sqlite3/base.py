@@ -0,0 +1,22 @@
+from django.db.backends.sqlite3 import base, creation
+
+from ..pool import PooledCreationMixin, PooledDatabaseWrapperMixin
+
+
+class DatabaseCreation(PooledCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """
+    SQLite с пулом соединений: ENGINE = 'api.db.sqlite3'. Нужен, чтобы
+    проверять пул в тестах без PostgreSQL; базы в памяти Django не
+    закрывает, поэтому они в пул не возвращаются.
+    """
+    creation_class = DatabaseCreation
+
+    @classmethod
+    def pool_reset(cls, connection):
+        if not connection.in_transaction:
+            return True
+        return super().pool_reset(connection)
@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework.fields import DateTimeField
+
+from .loaders import chunked
+from .models import Title
+
+# Выгрузка таблиц целиком: строки читаются QuerySet.iterator() пакетами
+# по EXPORT_CHUNK_SIZE (на PostgreSQL - серверным курсором), так что
+# память не зависит от размера выгрузки. Значения приводятся к тому же
+# виду, что и в ответах API.
+
+DATETIME = DateTimeField()
+
+
+def iterate(queryset, columns):
+    """Кортежи значений columns пакетами по EXPORT_CHUNK_SIZE строк."""
+    return chunked(
+        queryset.values_list(*columns).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE),
+        settings.EXPORT_CHUNK_SIZE)
+
+
+def title_genres(ids, using):
+    """{id произведения: [слаги жанров]} одним запросом на пакет."""
+    genres = defaultdict(list)
+    rows = Title.genre.through.objects.using(using).filter(
+        title_id__in=ids
+    ).order_by('genre__name', 'genre_id').values_list(
+        'title_id', 'genre__slug')
+    for title_id, slug in rows:
+        genres[title_id].append(slug)
+    return genres
+
+
+def title_rows(queryset):
+    columns = (
+        'id', 'name', 'year', 'description', 'category__slug', 'rating',
+        'reviews_count',
+    )
+    for chunk in iterate(queryset, columns):
+        genres = title_genres([row[0] for row in chunk], queryset.db)
+        for pk, name, year, description, category, *rating in chunk:
+            yield (
+                pk, name, year, description, category, genres.get(pk, []),
+                *rating,
+            )
+
+
+def review_rows(queryset):
+    columns = (
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date')
+    for chunk in iterate(queryset, columns):
+        for *values, pub_date in chunk:
+            yield (*values, DATETIME.to_representation(pub_date))
+
+
+def comment_rows(queryset):
+    columns = (
+        'id', 'review__title_id', 'review_id', 'author__username', 'text',
+        'pub_date',
+    )
+    for chunk in iterate(queryset, columns):
+        for *values, pub_date in chunk:
+            yield (*values, DATETIME.to_representation(pub_date))
+
+
+# Ресурс -> (заголовки столбцов, функция строк).
+EXPORTS = {
+    'titles': (
+        ('id', 'name', 'year', 'description', 'category', 'genre',
+         'rating', 'reviews_count'),
+        title_rows,
+    ),
+    'reviews': (
+        ('id', 'title', 'author', 'text', 'score', 'pub_date'),
+        review_rows,
+    ),
+    'comments': (
+        ('id', 'title', 'review', 'author', 'text', 'pub_date'),
+        comment_rows,
+    ),
+}
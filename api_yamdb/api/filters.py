@@ -1,50 +1,136 @@
-from functools import reduce
-from operator import or_
-
-from django.db.models import Q
+from django.db.models import F
 from django_filters import CharFilter
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter, SearchFilter
 
-from .models import Title
+from .models import Category, Comment, Genre, Review, Title
+from .search import search_titles
 
+GENRE_MATCH_CHOICES = (
+    ('any', 'Хотя бы один из жанров'),
+    ('all', 'Все жанры'),
+)
+
+
+def filter_search(queryset, field_name, value):
+    return search_titles(queryset, value)
+
+
+class SlugInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Слаги через запятую: ?genre__in=drama,comedy."""
 
-def filter_name(queryset, field_name, value):
-    """
-    Split the filter value into separate search terms and construct a set of
-    queries from this.
-    The set of queries includes an icontains lookup for the lookup fields for
-    each of the search terms. The set of queries is then joined
-    with the OR operator.
-    """
-    lookups = [f'{field_name}__icontains', ]
 
-    or_queries = []
+class TitleSearchFilter(SearchFilter):
+    """Параметр search: полнотекстовый поиск по названию и описанию."""
 
-    search_terms = value.split()
+    def filter_queryset(self, request, queryset, view):
+        return search_titles(
+            queryset, request.query_params.get(self.search_param, ''))
 
-    for search_term in search_terms:
-        or_queries += [Q(**{lookup: search_term}) for lookup in lookups]
 
-    return queryset.filter(reduce(or_, or_queries))
+class TitleOrderingFilter(OrderingFilter):
+    """
+    ?ordering=-rating,year по полям ordering_fields представления. Равные
+    значения упорядочиваются по id в направлении первого поля, пустые
+    значения (рейтинг без отзывов) всегда в конце. Порядок по одному
+    полю совпадает с индексом, поэтому страница читается из индекса без
+    сортировки всей таблицы. Без параметра порядок прежний.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*self.order_expressions(
+            queryset.model, ordering))
+
+    def order_expressions(self, model, ordering):
+        expressions = []
+        for term in ordering:
+            name = term.lstrip('-')
+            descending = term.startswith('-')
+            # NULLS LAST только для столбцов с NULL: для остальных это
+            # мешает базе взять обычный индекс.
+            nulls_last = model._meta.get_field(name).null or None
+            expression = F(name)
+            expressions.append(
+                expression.desc(nulls_last=nulls_last) if descending
+                else expression.asc(nulls_last=nulls_last))
+        if not {term.lstrip('-') for term in ordering} & {'id', 'pk'}:
+            expressions.append(
+                F('pk').desc() if ordering[0].startswith('-')
+                else F('pk').asc())
+        return expressions
 
 
 class TitleFilter(filters.FilterSet):
-    category = CharFilter(
-        method=filter_name,
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = CharFilter(
-        method=filter_name,
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    """
+    Слаги категории и жанров сравниваются точно. Связи проверяются
+    подзапросами IN по индексам (category_id, genre_id в таблице связей),
+    а не соединением с жанрами, поэтому произведения не повторяются.
+    ?genre__in= с ?genre_match=all оставляет произведения со всеми
+    жанрами списка, по умолчанию (any) - хотя бы с одним.
+    """
+    category = CharFilter(method='filter_category')
+    category__in = SlugInFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
+    genre__in = SlugInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=GENRE_MATCH_CHOICES, method='filter_genre_match')
+    rating__gte = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating__lte = filters.NumberFilter(field_name='rating', lookup_expr='lte')
     name = CharFilter(
-        method=filter_name,
-        field_name='name',
-        lookup_expr='icontains'
+        method=filter_search,
+        field_name='name'
     )
 
     class Meta:
         model = Title
-        fields = ['category', 'genre', 'description', 'name', 'year']
+        fields = {
+            'description': ['exact'],
+            'year': ['exact', 'gte', 'lte'],
+        }
+
+    def filter_category(self, queryset, name, value):
+        slugs = value if isinstance(value, list) else [value]
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=slugs).values('pk'))
+
+    def filter_genre(self, queryset, name, value):
+        slugs = value if isinstance(value, list) else [value]
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            for slug in dict.fromkeys(slugs):
+                queryset = queryset.filter(pk__in=self.genre_titles([slug]))
+            return queryset
+        return queryset.filter(pk__in=self.genre_titles(slugs))
+
+    def genre_titles(self, slugs):
+        return Title.genre.through.objects.filter(
+            genre_id__in=Genre.objects.filter(
+                slug__in=slugs).values('pk')
+        ).values('title_id')
+
+    def filter_genre_match(self, queryset, name, value):
+        # Учитывается в filter_genre.
+        return queryset
+
+
+class ReviewExportFilter(filters.FilterSet):
+    """Выгрузка отзывов: ?title=, ?author=, ?pub_date_after= и т.д."""
+    author = CharFilter(field_name='author__username')
+    pub_date = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Review
+        fields = ['title', 'author', 'score', 'pub_date']
+
+
+class CommentExportFilter(filters.FilterSet):
+    """Выгрузка комментариев: ?title=, ?review=, ?author=, ?pub_date_*=."""
+    title = filters.NumberFilter(field_name='review__title_id')
+    author = CharFilter(field_name='author__username')
+    pub_date = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Comment
+        fields = ['title', 'review', 'author', 'pub_date']
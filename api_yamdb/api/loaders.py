@@ -0,0 +1,108 @@
+import csv
+import io
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connections
+
+COPY_NULL = r'\N'
+
+
+def chunked(rows, size):
+    """Разбивает поток строк на списки не длиннее size."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchLoader:
+    """
+    Пакетная запись строк в таблицу модели: COPY на PostgreSQL,
+    bulk_create на остальных базах. Значения проходят через поля модели,
+    так что умолчания и auto_now_add работают как при обычном create().
+    С auto_now=False даты auto_now/auto_now_add берутся из строк: такие
+    поля пишутся без pre_save(), сами поля модели не меняются.
+    """
+
+    def __init__(self, model, using='default', use_copy=True, auto_now=True):
+        self.model = model
+        self.using = using
+        self.connection = connections[using]
+        self.use_copy = use_copy and self.connection.vendor == 'postgresql'
+        self.explicit = set() if auto_now else {
+            field for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        }
+
+    def load(self, rows):
+        return self.write([self.model(**row) for row in rows])
+
+    def write(self, objs):
+        if self.use_copy:
+            self.copy(objs)
+        elif self.explicit:
+            # bulk_create вызывает pre_save() и перезаписал бы даты.
+            self.insert(objs)
+        else:
+            # Размер пакета INSERT подбирает бэкенд: у SQLite есть
+            # ограничения на число параметров и термов в запросе.
+            self.model.objects.using(self.using).bulk_create(objs)
+        return len(objs)
+
+    def fields(self, objs):
+        return [
+            field for field in self.model._meta.concrete_fields
+            if not field.primary_key or objs[0].pk is not None
+        ]
+
+    def columns(self, fields):
+        quote = self.connection.ops.quote_name
+        return ', '.join(quote(field.column) for field in fields)
+
+    def copy(self, objs):
+        fields = self.fields(objs)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objs:
+            writer.writerow([
+                COPY_NULL if value is None else value
+                for value in (self.prepare(field, obj) for field in fields)
+            ])
+        buffer.seek(0)
+        table = self.connection.ops.quote_name(self.model._meta.db_table)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {table} ({self.columns(fields)}) FROM STDIN '
+                f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer
+            )
+
+    def insert(self, objs):
+        fields = self.fields(objs)
+        table = self.connection.ops.quote_name(self.model._meta.db_table)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} ({self.columns(fields)}) '
+                f'VALUES ({placeholders})',
+                [[self.prepare(field, obj) for field in fields]
+                 for obj in objs]
+            )
+
+    def prepare(self, field, obj):
+        if field in self.explicit:
+            value = getattr(obj, field.attname)
+        else:
+            value = field.pre_save(obj, True)
+        return field.get_db_prep_save(value, self.connection)
+
+    def reset_sequences(self):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), [self.model])
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
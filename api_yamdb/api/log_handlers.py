@@ -0,0 +1,13 @@
+import logging.handlers
+import os
+
+
+class RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler, который создаёт каталог журнала при открытии
+    файла. С delay=True это первая запись, а не загрузка настроек.
+    """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
@@ -0,0 +1,240 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api.loaders import BatchLoader, chunked
+from api.models import Category, Comment, Genre, Review, Title, User
+from api.versions import CATALOG, bump_versions
+
+# Использование:
+# python manage.py generate_data [--reviews N] [--titles N] [--users N]
+#     [--comments N] [--categories N] [--genres N] [--zipf S] [--seed N]
+#     [--batch-size N] [--no-copy]
+#
+# Генерирует синтетический каталог для нагрузочных проверок. Не заданные
+# размеры выводятся из --reviews. Число отзывов на произведение,
+# комментариев на отзыв и популярность жанров и категорий распределены
+# по Ципфу с показателем --zipf: чем меньше id, тем популярнее объект
+# (произведение с id первой записи получает больше всего отзывов).
+# С одинаковым --seed данные совпадают. Строки дописываются после уже
+# существующих, пакетами через BatchLoader (COPY на PostgreSQL).
+
+WORDS = (
+    'ветер дом город река песня ночь свет море лес звезда время память '
+    'дорога тень сердце война мир огонь небо зима лето осень весна герой '
+    'тайна история путь сон голос улица остров берег поле камень книга '
+    'письмо окно сад мост поезд корабль замок край друг семья дети'
+).split()
+SCORE_WEIGHTS = (1, 1, 2, 2, 4, 6, 10, 14, 12, 8)
+MODERATOR_SHARE = 0.02
+PERIOD_DAYS = 3 * 365
+
+
+def zipf_cum_weights(size, exponent):
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = 'Генерация синтетических данных каталога'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews', type=int, default=10000,
+            help='Количество отзывов')
+        for name, help_text in (
+            ('titles', 'Количество произведений (отзывы / 20)'),
+            ('users', 'Количество пользователей (отзывы / 5)'),
+            ('comments', 'Количество комментариев (отзывы / 2)'),
+        ):
+            parser.add_argument(f'--{name}', type=int, help=help_text)
+        parser.add_argument(
+            '--categories', type=int, default=10,
+            help='Количество категорий')
+        parser.add_argument(
+            '--genres', type=int, default=30,
+            help='Количество жанров')
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа')
+        parser.add_argument(
+            '--seed', type=int,
+            help='Начальное значение генератора случайных чисел')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной транзакции')
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY на PostgreSQL')
+
+    def handle(self, *args, **kwargs):
+        reviews = kwargs['reviews']
+        self.sizes = {
+            'reviews': reviews,
+            'titles': kwargs['titles'] or max(reviews // 20, 1),
+            'users': kwargs['users'] or max(reviews // 5, 10),
+            'comments': (
+                reviews // 2 if kwargs['comments'] is None
+                else kwargs['comments']),
+            'categories': kwargs['categories'],
+            'genres': kwargs['genres'],
+        }
+        if min(self.sizes.values()) < 0 or not all(
+                self.sizes[name] for name in ('titles', 'users', 'genres',
+                                              'categories')):
+            raise CommandError('Размеры таблиц должны быть положительными')
+        if reviews > self.sizes['titles'] * self.sizes['users']:
+            raise CommandError(
+                'Отзывов больше, чем пар произведение-пользователь')
+        self.rng = random.Random(kwargs['seed'])
+        self.zipf = kwargs['zipf']
+        self.batch_size = kwargs['batch_size']
+        self.use_copy = not kwargs['no_copy']
+        self.now = timezone.now()
+        self.start = {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for model in (User, Category, Genre, Title, Review, Comment)
+        }
+
+        self.load(User, self.users())
+        self.load(Category, self.categories())
+        self.load(Genre, self.genres())
+        self.load(Title, self.titles())
+        self.load(Title.genre.through, self.title_genres())
+        self.load(Review, self.reviews())
+        self.load(Comment, self.comments())
+
+        call_command('rebuild_ratings', stdout=self.stdout)
+        bump_versions(*CATALOG)
+
+    def load(self, model, rows):
+        loader = BatchLoader(model, use_copy=self.use_copy, auto_now=False)
+        started = time.monotonic()
+        loaded = 0
+        for batch in chunked(rows, self.batch_size):
+            with transaction.atomic():
+                loaded += loader.load(batch)
+        loader.reset_sequences()
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'Данные добавлены в таблицу {model._meta.db_table}: '
+            f'{loaded} строк, {loaded / elapsed:.0f} строк/с')
+
+    def ids(self, model, size):
+        return range(self.start[model], self.start[model] + size)
+
+    def text(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def date(self):
+        return self.now - timedelta(
+            seconds=self.rng.randrange(PERIOD_DAYS * 24 * 3600))
+
+    def users(self):
+        for pk in self.ids(User, self.sizes['users']):
+            yield {
+                'id': pk,
+                'username': f'user{pk}',
+                'email': f'user{pk}@yamdb.fake',
+                'password': '!',
+                'role': (
+                    User.MODERATOR if self.rng.random() < MODERATOR_SHARE
+                    else User.USER),
+                'date_joined': self.date(),
+            }
+
+    def categories(self):
+        for pk in self.ids(Category, self.sizes['categories']):
+            yield {
+                'id': pk, 'name': f'Категория {pk}', 'slug': f'category-{pk}'}
+
+    def genres(self):
+        for pk in self.ids(Genre, self.sizes['genres']):
+            yield {'id': pk, 'name': f'Жанр {pk}', 'slug': f'genre-{pk}'}
+
+    def titles(self):
+        categories = list(self.ids(Category, self.sizes['categories']))
+        weights = zipf_cum_weights(len(categories), self.zipf)
+        for pk in self.ids(Title, self.sizes['titles']):
+            # Свежих произведений больше, чем старых.
+            age = min(int(self.rng.expovariate(1 / 15)), 100)
+            yield {
+                'id': pk,
+                'name': self.text(1, 4).capitalize(),
+                'description': self.text(10, 40),
+                'year': self.now.year - age,
+                'category_id': self.rng.choices(
+                    categories, cum_weights=weights)[0],
+            }
+
+    def title_genres(self):
+        genres = list(self.ids(Genre, self.sizes['genres']))
+        weights = zipf_cum_weights(len(genres), self.zipf)
+        for pk in self.ids(Title, self.sizes['titles']):
+            chosen = set(self.rng.choices(
+                genres, cum_weights=weights, k=self.rng.randint(1, 3)))
+            for genre_id in sorted(chosen):
+                yield {'title_id': pk, 'genre_id': genre_id}
+
+    def reviews_per_title(self):
+        """
+        Число отзывов каждого произведения по Ципфу. Автор пишет
+        не больше одного отзыва на произведение: отзывы сверх числа
+        пользователей переходят к следующим по популярности произведениям.
+        """
+        titles = list(self.ids(Title, self.sizes['titles']))
+        counts = Counter(self.rng.choices(
+            titles,
+            cum_weights=zipf_cum_weights(len(titles), self.zipf),
+            k=self.sizes['reviews']
+        ))
+        extra = 0
+        for _ in range(2):
+            for pk in titles:
+                total = counts[pk] + extra
+                counts[pk] = min(total, self.sizes['users'])
+                extra = total - counts[pk]
+        return [(pk, counts[pk]) for pk in titles]
+
+    def reviews(self):
+        users = self.ids(User, self.sizes['users'])
+        scores = range(1, 11)
+        pk = self.start[Review]
+        for title_id, count in self.reviews_per_title():
+            for author_id in self.rng.sample(users, count):
+                yield {
+                    'id': pk,
+                    'title_id': title_id,
+                    'author_id': author_id,
+                    'text': self.text(5, 60),
+                    'score': self.rng.choices(scores, SCORE_WEIGHTS)[0],
+                    'pub_date': self.date(),
+                }
+                pk += 1
+
+    def comments(self):
+        if not self.sizes['reviews']:
+            return
+        reviews = list(self.ids(Review, self.sizes['reviews']))
+        weights = zipf_cum_weights(len(reviews), self.zipf)
+        users = self.ids(User, self.sizes['users'])
+        left = self.sizes['comments']
+        while left > 0:
+            size = min(left, self.batch_size)
+            for review_id in self.rng.choices(
+                    reviews, cum_weights=weights, k=size):
+                yield {
+                    'review_id': review_id,
+                    'author_id': self.rng.choice(users),
+                    'text': self.text(3, 30),
+                    'pub_date': self.date(),
+                }
+            left -= size
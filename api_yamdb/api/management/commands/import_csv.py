@@ -1,11 +1,17 @@
 import csv
 import os
+import time
+from itertools import islice
 
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from rest_framework.generics import get_object_or_404
+from django.db import transaction
 
-from api.models import Category, Comment, Genre, Review, Title, User
+from api.loaders import BatchLoader, chunked
+from api.models import (Category, Comment, Genre, ImportProgress, Review,
+                        Title, User)
+from api.versions import CATALOG, bump_versions
 
 # Использование:
 # 1. отредактировать список app_models, теми файлами, которые надо загрузить.
@@ -16,7 +22,12 @@ from api.models import Category, Comment, Genre, Review, Title, User
 # 3. все поля таблицы базы данных, которые не заполняются из csv должны иметь
 # возможность быть пустыми или Null
 # 4. запустить файл импорта командой
-# python manage.py import_csv [-dd] [-o]
+# python manage.py import_csv [-dd] [--batch-size N] [--no-copy] [--resume]
+#
+# Файлы читаются потоком и записываются пакетами, каждый пакет в своей
+# транзакции (на PostgreSQL через COPY). В той же транзакции число
+# загруженных строк файла записывается в ImportProgress; с --resume
+# загрузка продолжается с последнего записанного пакета.
 
 
 class Command(BaseCommand):
@@ -26,11 +37,39 @@ class Command(BaseCommand):
         parser.add_argument(
             '-dd', '--data_dir',
             default=os.path.join(
-                os.path.dirname(settings.BASE_DIR), 'data\\'),
+                os.path.dirname(settings.BASE_DIR), 'data'),
             help="Директроия начальных данных для загрузки")
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной транзакции')
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY на PostgreSQL')
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить загрузку с последнего записанного пакета')
+
+    def load_file(self, path, loader, progress):
+        loaded = 0
+        with open(path, encoding='utf-8', newline='') as csv_file:
+            reader = csv.DictReader(csv_file, delimiter=',', quotechar='"')
+            rows = islice(reader, progress.rows, None)
+            for batch in chunked(rows, self.batch_size):
+                with transaction.atomic():
+                    loaded += loader.load(batch)
+                    progress.rows += len(batch)
+                    progress.save()
+        return loaded
 
     def handle(self, *args, **kwargs):
         data_dir = kwargs['data_dir']
+        self.batch_size = kwargs['batch_size']
+        if not kwargs['resume']:
+            ImportProgress.objects.all().delete()
 
         app_models = {
             'user': User,
@@ -39,25 +78,25 @@ class Command(BaseCommand):
             'title': Title,
             'review': Review,
             'comment': Comment,
-            'title_genre': Title,
+            'title_genre': Title.genre.through,
         }
 
         for file_name, model in app_models.items():
-            with open(
-                f'{data_dir}{file_name}.csv', encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(
-                    csv_file, delimiter=',', quotechar='"')
-
-                for line in reader:
-                    if file_name == 'title_genre':
-                        title = get_object_or_404(
-                            Title,
-                            pk=line['title_id']
-                        )
-                        title.genre.add(line['genre_id'])
-                    else:
-                        model.objects.create(**line)
-            csv_file.close()
+            loader = BatchLoader(model, use_copy=not kwargs['no_copy'])
+            progress, _ = ImportProgress.objects.get_or_create(
+                name=file_name)
+            started = time.monotonic()
+            loaded = self.load_file(
+                os.path.join(data_dir, f'{file_name}.csv'),
+                loader,
+                progress
+            )
+            loader.reset_sequences()
+            elapsed = max(time.monotonic() - started, 1e-6)
             self.stdout.write(
-                f'Данные добавлены в таблицу api_{file_name}')
+                f'Данные добавлены в таблицу {model._meta.db_table}: '
+                f'{loaded} строк, {loaded / elapsed:.0f} строк/с')
+
+        call_command('rebuild_ratings', stdout=self.stdout)
+        bump_versions(*CATALOG)
+        ImportProgress.objects.all().delete()
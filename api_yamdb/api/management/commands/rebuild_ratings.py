@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from api.models import Title
+from api.versions import TITLE, bump_versions
+
+# Использование:
+# python manage.py rebuild_ratings [--check] [--batch-size N]
+# Без --check пересчитывает сумму оценок и число отзывов у произведений,
+# у которых хранимые значения расходятся с таблицей отзывов.
+# С --check только сообщает о расхождениях и завершается с ошибкой,
+# если они найдены.
+
+
+class Command(BaseCommand):
+    help = 'Проверка и пересчёт хранимых рейтингов произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить хранимые значения')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений в одном запросе')
+
+    def batches(self, batch_size):
+        bounds = Title.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            return
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            yield Title.objects.filter(
+                pk__gte=start, pk__lt=start + batch_size)
+
+    def handle(self, *args, **kwargs):
+        check = kwargs['check']
+        stale = 0
+        for batch in self.batches(kwargs['batch_size']):
+            with transaction.atomic():
+                stale_pks = list(
+                    batch.stale_ratings().values_list('pk', flat=True))
+                if stale_pks and not check:
+                    Title.objects.filter(pk__in=stale_pks).rebuild_ratings()
+                    bump_versions(TITLE)
+            stale += len(stale_pks)
+        if check and stale:
+            raise CommandError(
+                f'Рейтинг расходится с отзывами у {stale} произведений')
+        if check:
+            self.stdout.write('Хранимые рейтинги совпадают с отзывами')
+        else:
+            self.stdout.write(f'Пересчитан рейтинг {stale} произведений')
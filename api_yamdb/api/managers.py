@@ -1,6 +1,11 @@
 from enum import Enum
 
 from django.contrib.auth.models import UserManager
+from django.db import connections, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .ratings import rating_expression
 
 
 class Roles(Enum):
@@ -24,3 +29,80 @@ class CreateSuperUserManager(UserManager):
             raise ValueError('Superuser must have role="admin".')
 
         return self._create_user(username, email, password, **extra_fields)
+
+
+class TitleQuerySet(models.QuerySet):
+    """
+    Хранимый рейтинг произведений: сумма оценок, число отзывов и их
+    частное rating, по которому списки фильтруются и упорядочиваются.
+    """
+
+    def shift_rating(self, score_delta, count_delta):
+        # В UPDATE справа стоят значения строки до изменения.
+        return self.update(
+            score_sum=F('score_sum') + score_delta,
+            reviews_count=F('reviews_count') + count_delta,
+            rating=rating_expression(
+                F('score_sum') + score_delta,
+                F('reviews_count') + count_delta)
+        )
+
+    def _review_subquery(self, aggregate):
+        reviews = self.model.reviews.field.model.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return Coalesce(
+            Subquery(
+                reviews.annotate(value=aggregate).values('value'),
+                output_field=models.IntegerField()
+            ),
+            0
+        )
+
+    def with_actual_rating(self):
+        return self.annotate(
+            actual_score_sum=self._review_subquery(Sum('score')),
+            actual_reviews_count=self._review_subquery(Count('pk'))
+        )
+
+    def stale_ratings(self):
+        # NULL не равен NULL, поэтому рейтинг без отзывов сравнивается
+        # через Coalesce.
+        return self.with_actual_rating().annotate(
+            stored_rating=Coalesce('rating', Value(-1.0)),
+            expected_rating=Coalesce(
+                rating_expression(F('score_sum'), F('reviews_count')),
+                Value(-1.0))
+        ).exclude(
+            score_sum=F('actual_score_sum'),
+            reviews_count=F('actual_reviews_count'),
+            stored_rating=F('expected_rating')
+        )
+
+    def rebuild_ratings(self):
+        return self.update(
+            score_sum=self._review_subquery(Sum('score')),
+            reviews_count=self._review_subquery(Count('pk')),
+            rating=rating_expression(
+                self._review_subquery(Sum('score')),
+                self._review_subquery(Count('pk')))
+        )
+
+    def stored_ratings(self, ids):
+        """
+        Хранимые рейтинг и число отзывов произведений ids:
+        {pk: (rating, reviews_count)}. Список ids делится на части
+        только там, где база ограничивает число параметров запроса.
+        """
+        ids = list(ids)
+        batch_size = (
+            connections[self.db].features.max_query_params or len(ids) or 1)
+        ratings = {}
+        for start in range(0, len(ids), batch_size):
+            ratings.update(
+                (pk, (rating, reviews_count))
+                for pk, rating, reviews_count in self.filter(
+                    pk__in=ids[start:start + batch_size]
+                ).order_by().values_list('pk', 'rating', 'reviews_count')
+            )
+        return ratings
@@ -0,0 +1,324 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import ListSerializer
+
+# Метрики хранятся в памяти процесса: при нескольких воркерах gunicorn
+# каждый отдаёт свои, суммирует их Prometheus.
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PHASES = ('db', 'serialize', 'render', 'total')
+
+current_metrics = ContextVar('current_metrics', default=None)
+slow_query_logger = logging.getLogger('api.slow_queries')
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus: счётчики по верхним границам."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {total}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum:.6f}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+def format_labels(**labels):
+    return ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in labels.items()
+    )
+
+
+class Registry:
+    """Накопленные метрики запросов по представлениям."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.seconds = {}
+            self.queries = {}
+            self.requests = {}
+
+    def record(self, metrics, status_code):
+        with self.lock:
+            for phase, value in metrics.durations().items():
+                key = (metrics.view, phase)
+                if key not in self.seconds:
+                    self.seconds[key] = Histogram(SECONDS_BUCKETS)
+                self.seconds[key].observe(value)
+            if metrics.view not in self.queries:
+                self.queries[metrics.view] = Histogram(QUERIES_BUCKETS)
+            self.queries[metrics.view].observe(metrics.queries)
+            key = (metrics.view, status_code)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def render(self, caches=(), pools=None):
+        """
+        Текст в формате Prometheus; caches - пары (имя, ResponseCache),
+        pools - результат api.db.pool.pool_stats().
+        """
+        with self.lock:
+            lines = [
+                '# HELP yamdb_request_seconds Время обработки запроса '
+                'по этапам',
+                '# TYPE yamdb_request_seconds histogram',
+            ]
+            for (view, phase), histogram in sorted(self.seconds.items()):
+                lines.extend(histogram.lines(
+                    'yamdb_request_seconds',
+                    format_labels(view=view, phase=phase)))
+            lines += [
+                '# HELP yamdb_request_queries Запросов к базе на запрос',
+                '# TYPE yamdb_request_queries histogram',
+            ]
+            for view, histogram in sorted(self.queries.items()):
+                lines.extend(histogram.lines(
+                    'yamdb_request_queries', format_labels(view=view)))
+            lines += [
+                '# HELP yamdb_requests_total Обработано запросов',
+                '# TYPE yamdb_requests_total counter',
+            ]
+            for (view, status), count in sorted(self.requests.items()):
+                lines.append('yamdb_requests_total{{{}}} {}'.format(
+                    format_labels(view=view, status=status), count))
+        lines += [
+            '# HELP yamdb_response_cache_total Обращения к кешу ответов',
+            '# TYPE yamdb_response_cache_total counter',
+        ]
+        for name, cache in caches:
+            for result, count in cache.stats().items():
+                lines.append('yamdb_response_cache_total{{{}}} {}'.format(
+                    format_labels(cache=name, result=result), count))
+        lines.extend(pool_lines(pools or {}))
+        return '\n'.join(lines) + '\n'
+
+
+POOL_METRICS = (
+    ('opened', 'gauge', 'Открыто соединений пула'),
+    ('in_use', 'gauge', 'Выдано соединений пула'),
+    ('idle', 'gauge', 'Свободно соединений пула'),
+    ('size', 'gauge', 'Размер пула'),
+    ('checkouts', 'counter', 'Выдач соединений из пула'),
+    ('waits', 'counter', 'Выдач с ожиданием свободного соединения'),
+    ('wait_seconds', 'counter', 'Суммарное ожидание соединения'),
+    ('timeouts', 'counter', 'Не дождались соединения'),
+    ('discarded', 'counter', 'Выброшено сломанных соединений'),
+    ('pings', 'counter', 'Проверок соединений запросом'),
+)
+
+
+def pool_lines(pools):
+    lines = []
+    for key, kind, help_text in POOL_METRICS:
+        name = f'yamdb_db_pool_{key}'
+        if kind == 'counter':
+            name += '_total'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for alias, stats in pools.items():
+            lines.append('{}{{{}}} {}'.format(
+                name, format_labels(db=alias), stats[key]))
+    return lines
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.view = 'unknown'
+        self.started = time.perf_counter()
+        self.finished = None
+        self.queries = 0
+        self.timings = dict.fromkeys(('db', 'serialize', 'render'), 0.0)
+        self.active = set()
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper: число и время запросов."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.timings['db'] += duration
+            if duration * 1000 >= settings.SLOW_QUERY_MS:
+                log_slow_query(self.view, sql, duration)
+
+    @contextmanager
+    def timer(self, phase):
+        # Вложенные замеры одного этапа не складываются.
+        if phase in self.active:
+            yield
+            return
+        self.active.add(phase)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.perf_counter() - started
+            self.active.discard(phase)
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def durations(self):
+        durations = dict(self.timings)
+        durations['total'] = (
+            (self.finished or time.perf_counter()) - self.started)
+        return durations
+
+    def server_timing(self):
+        durations = self.durations()
+        parts = [f'db;dur={durations["db"] * 1000:.2f};'
+                 f'desc="{self.queries} queries"']
+        parts.extend(
+            f'{phase};dur={durations[phase] * 1000:.2f}'
+            for phase in PHASES[1:]
+        )
+        return ', '.join(parts)
+
+
+def log_slow_query(view, sql, duration):
+    """Запрос дольше SLOW_QUERY_MS: одна строка JSON в журнале."""
+    slow_query_logger.warning(json.dumps({
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'view': view,
+        'duration_ms': round(duration * 1000, 2),
+        'sql': sql,
+    }, ensure_ascii=False))
+
+
+def read_slow_queries(limit=100):
+    """Последние записи журнала медленных запросов, новые первыми."""
+    try:
+        with open(settings.SLOW_QUERY_LOG, encoding='utf-8') as log:
+            lines = deque(log, maxlen=limit)
+    except FileNotFoundError:
+        return []
+    entries = []
+    for line in reversed(lines):
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+@contextmanager
+def timer(phase):
+    """Замер этапа текущего запроса; вне запроса ничего не делает."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.timer(phase):
+        yield
+
+
+def view_name(request, view_func):
+    """Имя представления для меток: TitleViewSet.list, redoc и т. п."""
+    cls = getattr(view_func, 'cls', None) or getattr(
+        view_func, 'view_class', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{cls.__name__}.{actions.get(method, method)}'
+
+
+class MetricsMiddleware:
+    """
+    Число и время SQL-запросов, время сериализации, рендеринга и всего
+    запроса. Замеры уходят в заголовок Server-Timing и в гистограммы
+    registry, которые отдаёт /metrics/. Должно стоять первым в MIDDLEWARE,
+    чтобы total включал остальные middleware и рендеринг.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.execute))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        metrics.finish()
+        response['Server-Timing'] = metrics.server_timing()
+        registry.record(metrics, response.status_code)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics.view = view_name(request, view_func)
+
+    def process_template_response(self, request, response):
+        # Вызывается последним перед response.render().
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.metrics.timings['render'] += (
+                time.perf_counter() - started)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class TimedListSerializer(ListSerializer):
+
+    @property
+    def data(self):
+        with timer('serialize'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Время построения serializer.data попадает в метрики запроса."""
+
+    @property
+    def data(self):
+        with timer('serialize'):
+            return super().data
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is ListSerializer:
+            serializer.__class__ = TimedListSerializer
+        return serializer
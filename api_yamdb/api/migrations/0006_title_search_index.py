@@ -0,0 +1,82 @@
+from django.db import DatabaseError, migrations, transaction
+
+# SQL зафиксирован здесь, а не берётся из api.search: изменения модуля
+# не должны менять то, что делает уже применённая миграция.
+POSTGRES_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS api_title_search_idx ON api_title '
+    "USING gin ((to_tsvector('russian'::regconfig, "
+    "coalesce(name, '') || ' ' || coalesce(description, ''))))",
+]
+POSTGRES_TRIGRAM_INDEXES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS api_title_name_trgm_idx ON api_title '
+    'USING gin (upper(name::text) gin_trgm_ops)',
+]
+SQLITE_INDEX = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS api_title_fts USING fts5('
+    "name, description, content='api_title', content_rowid='id')",
+    'CREATE TRIGGER IF NOT EXISTS api_title_fts_ai AFTER INSERT ON api_title '
+    'BEGIN INSERT INTO api_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER IF NOT EXISTS api_title_fts_ad AFTER DELETE ON api_title '
+    'BEGIN INSERT INTO api_title_fts(api_title_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    'CREATE TRIGGER IF NOT EXISTS api_title_fts_au AFTER UPDATE ON api_title '
+    'BEGIN INSERT INTO api_title_fts(api_title_fts, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    'INSERT INTO api_title_fts(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    "INSERT INTO api_title_fts(api_title_fts) VALUES ('rebuild')",
+]
+
+
+def execute_optional(connection, statements):
+    """Выполняет statements, если база их поддерживает."""
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+    except DatabaseError:
+        pass
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for sql in POSTGRES_INDEXES:
+            schema_editor.execute(sql)
+        execute_optional(connection, POSTGRES_TRIGRAM_INDEXES)
+    elif connection.vendor == 'sqlite':
+        execute_optional(connection, SQLITE_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = [
+            'DROP INDEX IF EXISTS api_title_search_idx',
+            'DROP INDEX IF EXISTS api_title_name_trgm_idx',
+        ]
+    elif connection.vendor == 'sqlite':
+        statements = [
+            'DROP TRIGGER IF EXISTS api_title_fts_ai',
+            'DROP TRIGGER IF EXISTS api_title_fts_ad',
+            'DROP TRIGGER IF EXISTS api_title_fts_au',
+            'DROP TABLE IF EXISTS api_title_fts',
+        ]
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_review_comment_ordering'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+CATALOG = ('category', 'genre', 'title', 'review')
+
+
+def create_versions(apps, schema_editor):
+    DataVersion = apps.get_model('api', 'DataVersion')
+    DataVersion.objects.using(schema_editor.connection.alias).bulk_create(
+        DataVersion(name=name, version=1) for name in CATALOG
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Данные')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Версия')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Версия данных',
+                'verbose_name_plural': 'Версии данных',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
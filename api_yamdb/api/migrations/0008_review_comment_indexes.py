@@ -0,0 +1,88 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def review_subquery(Review, aggregate):
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return Coalesce(
+        Subquery(
+            reviews.annotate(value=aggregate).values('value'),
+            output_field=models.IntegerField()
+        ),
+        0
+    )
+
+
+def merge_duplicate_reviews(apps, schema_editor):
+    """
+    Оставляет автору по одному отзыву на произведение - самый новый.
+    Комментарии к остальным переносятся на него, рейтинг затронутых
+    произведений пересчитывается.
+    """
+    alias = schema_editor.connection.alias
+    Title = apps.get_model('api', 'Title')
+    Review = apps.get_model('api', 'Review')
+    Comment = apps.get_model('api', 'Comment')
+    reviews = Review.objects.using(alias)
+    duplicates = reviews.order_by().values('title', 'author').annotate(
+        count=Count('pk')
+    ).filter(count__gt=1)
+    title_ids = set()
+    for pair in duplicates:
+        ids = list(reviews.filter(
+            title=pair['title'], author=pair['author']
+        ).order_by('-pub_date', '-id').values_list('pk', flat=True))
+        Comment.objects.using(alias).filter(
+            review__in=ids[1:]).update(review=ids[0])
+        reviews.filter(pk__in=ids[1:]).delete()
+        title_ids.add(pair['title'])
+    Title.objects.using(alias).filter(pk__in=title_ids).update(
+        score_sum=review_subquery(Review, Sum('score')),
+        reviews_count=review_subquery(Review, Count('pk'))
+    )
+    if schema_editor.connection.vendor == 'postgresql':
+        # Отложенные проверки внешних ключей выполняются сейчас, иначе
+        # PostgreSQL не даст изменить таблицы в этой же транзакции.
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', '-id'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('title', 'author'), name='unique_review_author'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='unique_review_title',
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='api.Title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', '-pub_date', '-id'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='api.Review', verbose_name='Отзыв на произведение'),
+        ),
+    ]
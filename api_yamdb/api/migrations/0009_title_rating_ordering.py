@@ -0,0 +1,66 @@
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import Cast, NullIf
+
+# SQL зафиксирован здесь, а не берётся из api.ratings: изменения модуля
+# не должны менять то, что делает уже применённая миграция.
+INDEXES = {
+    'postgresql': [
+        'CREATE INDEX IF NOT EXISTS title_rating_desc_idx ON api_title '
+        '(rating DESC NULLS LAST, id DESC)',
+        'CREATE INDEX IF NOT EXISTS title_rating_asc_idx ON api_title '
+        '(rating ASC NULLS LAST, id ASC)',
+    ],
+    'sqlite': [
+        'CREATE INDEX IF NOT EXISTS title_rating_desc_idx ON api_title '
+        '(rating IS NULL, rating DESC, id DESC)',
+        'CREATE INDEX IF NOT EXISTS title_rating_asc_idx ON api_title '
+        '(rating IS NULL, rating ASC, id ASC)',
+    ],
+}
+DROP_INDEXES = [
+    'DROP INDEX IF EXISTS title_rating_desc_idx',
+    'DROP INDEX IF EXISTS title_rating_asc_idx',
+]
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('api', 'Title')
+    Title.objects.using(schema_editor.connection.alias).update(
+        rating=ExpressionWrapper(
+            Cast(F('score_sum'), FloatField()) / NullIf(F('reviews_count'), 0),
+            output_field=FloatField()
+        )
+    )
+    for sql in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in INDEXES:
+        for sql in DROP_INDEXES:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_review_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'year'], name='title_name_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-reviews_count', '-id'], name='title_reviews_count_idx'),
+        ),
+        migrations.RunPython(fill_rating, drop_indexes),
+    ]
@@ -0,0 +1,305 @@
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .bulk import BulkWriter
+from .metrics import timer
+from .models import Review, Title
+from .versions import bump_versions, get_versions
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list и retrieve по версиям данных из
+    version_names. Если клиент прислал актуальный If-None-Match,
+    отвечаем 304, не выполняя запрос к каталогу и сериализацию.
+    Last-Modified точен только до секунды, и две записи в одну секунду
+    его не меняют, поэтому If-Modified-Since к 304 не приводит.
+    """
+    version_names = ()
+
+    def get_data_versions(self):
+        if not hasattr(self, '_data_versions'):
+            self._data_versions = get_versions(self.version_names)
+        return self._data_versions
+
+    def get_cache_validators(self, request):
+        versions = self.get_data_versions()
+        key = '|'.join([
+            request.get_full_path(),
+            request.accepted_media_type or '',
+            *(f'{name}:{versions[name][0]}' for name in sorted(versions))
+        ])
+        etag = '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+        modified = [date for _, date in versions.values() if date]
+        last_modified = int(max(modified).timestamp()) if modified else None
+        return etag, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_cache_validators(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    """
+    Кеширует данные ответов list и retrieve. Ключ строится из схемы,
+    хоста (ссылки next и previous пагинации абсолютные), пути с
+    параметрами фильтрации, поиска и страницы и из версий данных, поэтому
+    любая запись в каталог (сигналы моделей увеличивают версии) делает
+    старые записи кеша недоступными.
+    """
+    response_cache = None
+
+    def get_response_cache_key(self, request):
+        versions = self.get_data_versions()
+        key = '|'.join([
+            request.scheme,
+            request.get_host(),
+            request.path,
+            request.accepted_media_type or '',
+            *(f'{name}={value}' for name, value in sorted(
+                request.query_params.lists())),
+            *(f'{name}:{version}:{modified and modified.isoformat()}'
+              for name, (version, modified) in sorted(versions.items()))
+        ])
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        def build():
+            response = handler(request, *args, **kwargs)
+            return response.status_code, response.data
+
+        (status_code, data), hit = self.response_cache.get_or_build(
+            self.get_response_cache_key(request), build)
+        return Response(
+            data,
+            status=status_code,
+            headers={'X-Cache': 'HIT' if hit else 'MISS'}
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class BulkWriteMixin:
+    """
+    POST и PATCH на /<ресурс>/bulk/ со списком объектов (см. bulk.py).
+    При PATCH элементы находятся по lookup_field, остальные поля
+    обновляются частично.
+
+    По умолчанию запись атомарная: при ошибке в любом элементе ничего не
+    пишется, а в ответе 400 приходит список ошибок по элементам. С
+    ?atomic=false корректные элементы записываются, а ответ 207 содержит
+    статус и данные или ошибки для каждого элемента.
+    """
+    bulk_versions = ()
+
+    @action(detail=False, methods=['post', 'patch'],
+            url_path='bulk', url_name='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError(
+                {'non_field_errors': ['Ожидается непустой список объектов']})
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос']})
+        creating = request.method == 'POST'
+        writer = BulkWriter(
+            self.get_serializer(many=True, partial=not creating),
+            self.get_queryset(),
+            self.lookup_field,
+            creating
+        )
+        with transaction.atomic(using=writer.db):
+            items = writer.validate(items)
+            failed = any(item.errors is not None for item in items)
+            if failed and self.is_bulk_atomic(request):
+                return Response(
+                    [item.errors or {} for item in items],
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if writer.write(items):
+                bump_versions(*self.bulk_versions)
+        return self.bulk_response(writer, items, creating)
+
+    def is_bulk_atomic(self, request):
+        return request.query_params.get('atomic', 'true').lower() not in (
+            'false', '0', 'no')
+
+    def bulk_response(self, writer, items, creating):
+        success = status.HTTP_201_CREATED if creating else status.HTTP_200_OK
+        if not self.is_bulk_atomic(self.request):
+            with timer('serialize'):
+                data = [
+                    {'status': status.HTTP_400_BAD_REQUEST,
+                     'errors': item.errors}
+                    if item.errors is not None
+                    else {'status': success, 'data': writer.represent(item)}
+                    for item in items
+                ]
+            return Response(data, status=status.HTTP_207_MULTI_STATUS)
+        with timer('serialize'):
+            data = [writer.represent(item) for item in items]
+        return Response(data, status=success)
+
+
+class NestedParentMixin:
+    """
+    Родительские объекты вложенных маршрутов /titles/{title_id}/reviews/
+    и /titles/{title_id}/reviews/{review_id}/comments/. Каждый объект
+    загружается один раз за запрос, отзыв ищется только среди отзывов
+    произведения title_id. Представление, его сериализатор (через
+    context['view']) и разрешения получают один и тот же объект.
+    """
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id'))
+        return self._title
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields=id,name,rating оставляет в ответе только эти поля,
+    ?expand=genre выводит названные связи вложенными объектами, остальные
+    связи сворачиваются (см. SparseFieldsetSerializerMixin). Без
+    параметров ответ прежний.
+
+    Запрос к базе сокращается вместе с ответом: загружаются только
+    столбцы sparse_columns запрошенных полей и sparse_required, связи из
+    sparse_select и sparse_prefetch - только для запрошенных полей.
+    """
+    sparse_columns = {}
+    sparse_required = ()
+    sparse_select = {}
+    sparse_prefetch = {}
+
+    def get_sparse_fields(self):
+        """(fields, expand): множества имён или None без параметра."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = (None, None)
+            request = getattr(self, 'request', None)
+            if request is not None and request.method in SAFE_METHODS:
+                self._sparse_fields = (
+                    self.parse_sparse_param('fields', self.sparse_columns),
+                    self.parse_sparse_param(
+                        'expand',
+                        self.get_serializer_class().expandable_fields()),
+                )
+        return self._sparse_fields
+
+    def parse_sparse_param(self, param, allowed):
+        if param not in self.request.query_params:
+            return None
+        names = {
+            name.strip()
+            for value in self.request.query_params.getlist(param)
+            for name in value.split(',')
+            if name.strip()
+        }
+        unknown = names - set(allowed)
+        if unknown:
+            raise ValidationError({param: [
+                'Неизвестные поля: {}. Доступны: {}'.format(
+                    ', '.join(sorted(unknown)), ', '.join(allowed))]})
+        return names
+
+    def get_serializer_context(self):
+        fields, expand = self.get_sparse_fields()
+        return {
+            **super().get_serializer_context(),
+            'fields': fields,
+            'expand': expand,
+        }
+
+    def trim_queryset(self, queryset):
+        fields, _ = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        queryset = queryset.select_related(None).prefetch_related(None)
+        select = [
+            self.sparse_select[name]
+            for name in fields if name in self.sparse_select
+        ]
+        if select:
+            queryset = queryset.select_related(*select)
+        prefetch = [
+            self.sparse_prefetch[name]
+            for name in fields if name in self.sparse_prefetch
+        ]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        columns = {
+            column for name in fields for column in self.sparse_columns[name]
+        }
+        return queryset.only('pk', *self.sparse_required, *columns)
+
+
+class StreamingJSONMixin:
+    """
+    Большие списки (от JSON_STREAM_MIN_ITEMS объектов) отдаются
+    StreamingHttpResponse кусками FastJSONRenderer.render_chunks, без
+    одного большого bytes со всем ответом.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        renderer = getattr(response, 'accepted_renderer', None)
+        if (not hasattr(renderer, 'render_chunks')
+                or renderer.stream_items(
+                    response.data, response.accepted_media_type,
+                    response.renderer_context) is None):
+            return response
+        streaming = StreamingHttpResponse(
+            renderer.render_chunks(
+                response.data, response.accepted_media_type,
+                response.renderer_context),
+            status=response.status_code,
+            content_type=response.content_type or renderer.media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                streaming[header] = value
+        streaming.cookies = response.cookies
+        return streaming
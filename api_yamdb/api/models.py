@@ -1,11 +1,11 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from pytils.translit import slugify
 
-from .managers import CreateSuperUserManager, Roles
+from .managers import CreateSuperUserManager, Roles, TitleQuerySet
 from .validators import year_validator
 
 
@@ -55,6 +55,12 @@ class User(AbstractUser):
         choices=ROLES,
         default=USER,
     )
+    tokens_revoked_at = models.FloatField(
+        verbose_name='Время отзыва токенов',
+        blank=True,
+        null=True,
+        editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -153,15 +159,59 @@ class Title(models.Model):
         blank=True,
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
+
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        blank=True,
+        null=True,
+        editable=False
+    )
+
+    RATING_FIELDS = ('score_sum', 'reviews_count', 'rating')
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ['name', 'year']
+        # Индексы по рейтингу (NULL в конце) создаёт миграция, см.
+        # ratings.py.
+        indexes = [
+            models.Index(
+                fields=['name', 'year'],
+                name='title_name_year_idx'
+            ),
+            models.Index(
+                fields=['-reviews_count', '-id'],
+                name='title_reviews_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.category.name} {self.name}'
 
+    def save(self, *args, **kwargs):
+        # Рейтинг обновляется только сигналами отзывов, поэтому при
+        # сохранении произведения устаревшие значения из памяти не пишем.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Review(models.Model):
     """Отзывы на произведения."""
@@ -170,6 +220,7 @@ class Review(models.Model):
         verbose_name='Произведение',
         related_name='reviews',
         on_delete=models.CASCADE,
+        db_index=False
     )
     text = models.TextField(
         verbose_name='Отзыв',
@@ -202,17 +253,30 @@ class Review(models.Model):
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        # Отзывы произведения и повторный отзыв автора ищутся по этим
+        # индексам; отдельный индекс по title не нужен.
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
-                fields=['text', 'title'],
-                name='unique_review_title'
+                fields=['title', 'author'],
+                name='unique_review_author'
             )
         ]
 
     def __str__(self):
         return f'{self.text[:100]} {self.author}'
 
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется сигналами в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Комментарии к отзывам на произведения."""
@@ -220,7 +284,8 @@ class Comment(models.Model):
         Review,
         verbose_name='Отзыв на произведение',
         related_name='comments',
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     text = models.TextField(
         verbose_name='Комментарий',
@@ -239,4 +304,57 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
+
+class DataVersion(models.Model):
+    """Версии данных для валидаторов кеша (ETag, Last-Modified)."""
+    name = models.CharField(
+        verbose_name='Данные',
+        max_length=50,
+        primary_key=True
+    )
+    version = models.BigIntegerField(
+        verbose_name='Версия',
+        default=0
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        default=timezone.now
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.name} {self.version}'
+
+
+class ImportProgress(models.Model):
+    """
+    Сколько строк файла уже загрузил import_csv. Пишется в транзакции
+    пакета, поэтому всегда совпадает с записанными строками.
+    """
+    name = models.CharField(
+        verbose_name='Файл',
+        max_length=50,
+        primary_key=True
+    )
+    rows = models.PositiveIntegerField(
+        verbose_name='Загружено строк',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'Ход загрузки'
+        verbose_name_plural = 'Ход загрузки'
+
+    def __str__(self):
+        return f'{self.name} {self.rows}'
@@ -0,0 +1,154 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+PAGE_SIZE_QUERY_PARAM = 'page_size'
+
+
+def get_page_size(request, default):
+    """
+    Размер страницы из ?page_size=, не больше MAX_PAGE_SIZE; без параметра
+    или с неверным значением - default.
+    """
+    try:
+        page_size = int(request.query_params[PAGE_SIZE_QUERY_PARAM])
+    except (KeyError, ValueError):
+        return default
+    if page_size <= 0:
+        return default
+    return min(page_size, settings.MAX_PAGE_SIZE)
+
+
+class PageSizePagination(PageNumberPagination):
+    """
+    Постраничная выдача по номеру страницы, размер страницы задаётся
+    параметром ?page_size= (не больше MAX_PAGE_SIZE).
+    """
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+
+    def get_page_size(self, request):
+        return get_page_size(request, self.page_size)
+
+
+class PubDateCursorPagination(BasePagination):
+    """
+    Постраничная выдача по курсору (pub_date, id) в порядке
+    ('-pub_date', '-id'): без COUNT и OFFSET, страница выбирается
+    по индексу за постоянное время и не сдвигается при новых записях.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = get_page_size(request, self.page_size)
+        self.base_url = request.build_absolute_uri()
+        reverse, position = self.decode_cursor(request)
+        if position is None:
+            queryset = queryset.order_by('-pub_date', '-id')
+        elif reverse:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+            ).order_by('pub_date', 'id')
+        else:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            ).order_by('-pub_date', '-id')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens['r'][0]))
+            pub_date = parse_datetime(tokens['p'][0])
+            pk = int(tokens['i'][0])
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, (pub_date, pk)
+
+    def encode_cursor(self, reverse, obj):
+        querystring = parse.urlencode(
+            {'r': int(reverse), 'p': obj.pub_date.isoformat(), 'i': obj.pk},
+            doseq=True
+        )
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+
+class PubDatePagination(PageSizePagination):
+    """
+    Постраничная выдача по номеру страницы. С параметром
+    ?pagination=cursor (или при переходе по ссылке с ?cursor=)
+    выдача идёт по курсору, см. PubDateCursorPagination.
+    """
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = self.cursor_pagination_class()
+        self.display_page_controls = False
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
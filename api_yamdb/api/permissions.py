@@ -12,7 +12,7 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return ((request.user
                  and request.user.is_authenticated
-                 and obj.author == request.user)
+                 and obj.author_id == request.user.pk)
                 or request.method in permissions.SAFE_METHODS
                 )
 
@@ -51,7 +51,7 @@ class IsAuthorOrStaffOrReadOnly(permissions.BasePermission):
         return bool(
             (request.user
              and request.user.is_authenticated
-             and obj.author == request.user
+             and obj.author_id == request.user.pk
              )
             or (request.user
                 and request.user.is_authenticated
@@ -0,0 +1,121 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+import uuid
+from types import SimpleNamespace
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+
+from .authentication import ClaimsJWTAuthentication
+from .metrics import view_name
+from .permissions import IsAdmin
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_NAME = re.compile(r'^[\w.-]+\.prof$')
+
+
+class ProfileStore:
+    """
+    Профили cProfile в каталоге на диске. Хранится не больше max_count
+    последних файлов, старые удаляются при записи нового.
+    """
+
+    def __init__(self, directory, max_count):
+        self.directory = directory
+        self.max_count = max_count
+
+    def path(self, name):
+        if not PROFILE_NAME.match(name):
+            raise FileNotFoundError(name)
+        return os.path.join(self.directory, name)
+
+    def save(self, profiler, view):
+        os.makedirs(self.directory, exist_ok=True)
+        name = '{}-{}-{}.prof'.format(
+            time.strftime('%Y%m%dT%H%M%S'), view, uuid.uuid4().hex[:8])
+        name = re.sub(r'[^\w.-]', '_', name)
+        path = self.path(name)
+        profiler.dump_stats(f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+        self.prune()
+        return name
+
+    def entries(self):
+        """Профили от новых к старым: (имя, os.stat_result)."""
+        try:
+            names = [
+                name for name in os.listdir(self.directory)
+                if PROFILE_NAME.match(name)
+            ]
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            try:
+                entries.append((name, os.stat(self.path(name))))
+            except FileNotFoundError:
+                continue
+        return sorted(entries, key=lambda entry: entry[1].st_mtime,
+                      reverse=True)
+
+    def prune(self):
+        for name, _ in self.entries()[self.max_count:]:
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                continue
+
+    def report(self, name, sort='cumulative', limit=50):
+        """Текстовый отчёт pstats по профилю."""
+        stream = io.StringIO()
+        stats = pstats.Stats(self.path(name), stream=stream)
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+def get_profile_store():
+    return ProfileStore(settings.PROFILES_DIR, settings.PROFILES_MAX_COUNT)
+
+
+def is_admin_request(request):
+    """
+    Проверка IsAdmin до представления: по сессии или по JWT-токену.
+    DRF проверит токен ещё раз, но только у запросов с заголовком профиля.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            user, _ = ClaimsJWTAuthentication().authenticate(request) or (
+                None, None)
+        except APIException:
+            return False
+    return IsAdmin().has_permission(SimpleNamespace(user=user), None)
+
+
+class ProfilingMiddleware:
+    """
+    Запрос администратора с заголовком X-Profile выполняется под cProfile.
+    Профиль сохраняется в ProfileStore, имя файла возвращается в заголовке
+    X-Profile ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PROFILE_HEADER not in request.META or not is_admin_request(
+                request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+        response['X-Profile'] = get_profile_store().save(
+            profiler, getattr(request, 'profile_view', 'unknown'))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if PROFILE_HEADER in request.META:
+            request.profile_view = view_name(request, view_func)
@@ -0,0 +1,26 @@
+from django.db.models import ExpressionWrapper, FloatField
+from django.db.models.functions import Cast, NullIf
+
+# Хранимый рейтинг произведения: score_sum / reviews_count, NULL без
+# отзывов. Списки по рейтингу упорядочиваются с NULL в конце в обе
+# стороны (TitleOrderingFilter), а такие индексы Meta.indexes в Django
+# 2.2 не описывает, поэтому миграция 0009 создаёт их SQL-запросами. На
+# SQLite это индексы по выражениям, совпадающим с ORDER BY, который
+# Django строит для nulls_last: "rating IS NULL, rating". SQLite теряет
+# их при пересоздании таблицы, и signals.py восстанавливает их после
+# миграций.
+
+SQLITE_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS title_rating_desc_idx ON api_title '
+    '(rating IS NULL, rating DESC, id DESC)',
+    'CREATE INDEX IF NOT EXISTS title_rating_asc_idx ON api_title '
+    '(rating IS NULL, rating ASC, id ASC)',
+]
+
+
+def rating_expression(score_sum, reviews_count):
+    """Рейтинг в базе: деление вещественных чисел, как в Python."""
+    return ExpressionWrapper(
+        Cast(score_sum, FloatField()) / NullIf(reviews_count, 0),
+        output_field=FloatField()
+    )
@@ -0,0 +1,214 @@
+import csv
+import io
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Числа, которые orjson пишет иначе, чем json из стандартной библиотеки
+# (1e16 вместо 1e+16, 0.00001 вместо 1e-05). Совпадения в тексте только
+# отправляют ответ в медленную ветку. Регулярное выражение по всему ответу
+# медленнее самого orjson, поэтому цифры сводятся к 0 и ищется подстрока.
+DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'0' * 9)
+
+
+def float_mismatch(content):
+    return b'0.0000' in content or b'0e' in content.translate(DIGITS_TO_ZERO)
+
+
+def buffered(parts):
+    """Склеивает куски байтов в куски около JSON_STREAM_CHUNK_SIZE."""
+    buffer, size = [], 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= settings.JSON_STREAM_CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+class PlainTextRenderer(BaseRenderer):
+    """Данные - уже готовая строка, ошибки (401, 403) приходят словарём."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return '\n'.join(
+            f'# {key}: {value}' for key, value in data.items()
+        ).encode(self.charset)
+
+
+class PrometheusRenderer(PlainTextRenderer):
+    """Текстовый формат метрик Prometheus."""
+
+    format = 'prometheus'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен. Ответ побайтно совпадает с
+    JSONRenderer: всё, что orjson записал бы иначе (отступы, ключи не
+    строки, большие целые, экспоненты), рендерит JSONRenderer.
+
+    Списки от JSON_STREAM_MIN_ITEMS элементов (и постраничные ответы с
+    таким results) StreamingJSONMixin отдаёт кусками через render_chunks.
+    """
+
+    stream_batch_size = 100
+
+    def __init__(self):
+        self.default = self.encoder_class().default
+
+    def is_fast(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and not self.ensure_ascii and self.compact and self.strict
+            and self.get_indent(
+                accepted_media_type, renderer_context or {}) is None
+        )
+
+    def dumps(self, data):
+        """Байты JSON через orjson или None, если нужен JSONRenderer."""
+        try:
+            content = orjson.dumps(
+                data, default=self.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return None
+        if float_mismatch(content):
+            return None
+        return content.replace(
+            b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.is_fast(accepted_media_type, renderer_context):
+            content = self.dumps(data)
+            if content is not None:
+                return content
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def stream_items(self, data, accepted_media_type=None,
+                     renderer_context=None):
+        """Список, который стоит отдавать кусками, или None."""
+        if not self.compact or self.get_indent(
+                accepted_media_type, renderer_context or {}) is not None:
+            return None
+        items = data
+        if isinstance(data, dict):
+            if not all(isinstance(key, str) for key in data):
+                return None
+            items = data.get('results')
+        if (isinstance(items, list)
+                and len(items) >= settings.JSON_STREAM_MIN_ITEMS):
+            return items
+        return None
+
+    def render_chunks(self, data, accepted_media_type=None,
+                      renderer_context=None):
+        """
+        Те же байты, что render(), кусками около JSON_STREAM_CHUNK_SIZE:
+        список рендерится пачками по stream_batch_size элементов.
+        """
+        fast = self.is_fast(accepted_media_type, renderer_context)
+
+        def encode(value):
+            if value is None:
+                return b'null'
+            content = self.dumps(value) if fast else None
+            if content is not None:
+                return content
+            return super(FastJSONRenderer, self).render(
+                value, accepted_media_type, renderer_context)
+
+        def array(items):
+            buffer, size = [b'['], 1
+            for start in range(0, len(items), self.stream_batch_size):
+                # Компактный список - элементы через запятую в скобках.
+                content = encode(
+                    items[start:start + self.stream_batch_size])[1:-1]
+                buffer.append(b',' + content if start else content)
+                size += len(content) + 1
+                if size >= settings.JSON_STREAM_CHUNK_SIZE:
+                    yield b''.join(buffer)
+                    buffer, size = [], 0
+            buffer.append(b']')
+            yield b''.join(buffer)
+
+        items = self.stream_items(
+            data, accepted_media_type, renderer_context)
+        if items is data:
+            yield from array(items)
+            return
+        yield b'{'
+        for number, (key, value) in enumerate(data.items()):
+            yield (b',' if number else b'') + encode(key) + b':'
+            if value is items:
+                yield from array(items)
+            else:
+                yield encode(value)
+        yield b'}'
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    Выгрузки: объект JSON на строку. render_rows отдаёт строки кусками,
+    ошибки (401, 403, 400) рендерятся одной строкой.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return super().render(data) + b'\n'
+
+    def render_rows(self, columns, rows):
+        return buffered(self.render(dict(zip(columns, row))) for row in rows)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Выгрузки в CSV: строка заголовков, затем строки значений. Списки
+    (жанры) записываются через запятую, None - пустой строкой.
+    """
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        columns = list(rows[0]) if rows else []
+        return b''.join(self.render_rows(
+            columns, ([row.get(name) for name in columns] for row in rows)))
+
+    def render_rows(self, columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([
+                ','.join(map(str, value)) if isinstance(value, list)
+                else value
+                for value in row
+            ])
+            if buffer.tell() >= settings.JSON_STREAM_CHUNK_SIZE:
+                yield buffer.getvalue().encode(self.charset)
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode(self.charset)
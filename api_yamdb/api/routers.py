@@ -0,0 +1,177 @@
+import itertools
+import logging
+import math
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import ClaimsJWTAuthentication
+
+# Чтение каталога (произведения, отзывы, комментарии, жанры, категории)
+# и выгрузки идут на реплики, запись и всё остальное - на основную базу.
+# Кто только что записал, несколько секунд читает с основной базы, чтобы
+# увидеть свою запись, пока реплики догоняют. Отметка о записи хранится
+# в кеше Django по идентификатору пользователя из токена (с общим кешем
+# её видит любой воркер) и дублируется в подписанной cookie для клиентов,
+# которые возвращают cookie. Пользователи и версии данных всегда читаются
+# с основной базы: отставание реплики не должно оживлять отозванный токен
+# или давать устаревший ETag и ключ кеша.
+
+READ_PATHS = re.compile(
+    r'^/api/v1/(titles|genres|categories|export)/')
+PIN_COOKIE = 'replica_pin'
+PIN_KEY = 'replica-pin:{}'
+PRIMARY_MODELS = {'api.User', 'api.DataVersion'}
+
+current_route = ContextVar('current_route', default=None)
+logger = logging.getLogger(__name__)
+
+_next_replica = itertools.count()
+# Псевдоним реплики -> время (monotonic), до которого она не используется.
+_down_until = {}
+
+
+def mark_down(alias, error):
+    _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+    logger.warning('Реплика %s недоступна, чтение с основной базы: %s',
+                   alias, error)
+
+
+def is_healthy(alias):
+    """Реплика не отмечена недоступной и к ней удаётся подключиться."""
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError as error:
+        mark_down(alias, error)
+        return False
+    return True
+
+
+def choose_replica():
+    """Следующая по кругу исправная реплика или None."""
+    replicas = settings.DATABASE_REPLICAS
+    start = next(_next_replica)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if is_healthy(alias):
+            return alias
+    return None
+
+
+class Route:
+    """Выбор базы для чтения в одном запросе; реплика выбирается один раз."""
+
+    def __init__(self):
+        self.alias = None
+
+    def read_alias(self):
+        if self.alias is None:
+            self.alias = choose_replica() or DEFAULT_DB_ALIAS
+        return self.alias
+
+
+def request_user_id(request):
+    """Идентификатор пользователя из JWT запроса, без базы."""
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def is_pinned(request):
+    """
+    Пользователь писал в базу последние REPLICA_STICKY_SECONDS секунд:
+    есть отметка в кеше или подписанная cookie.
+    """
+    user_id = request_user_id(request)
+    if user_id is not None and cache.get(PIN_KEY.format(user_id)):
+        return True
+    return request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_COOKIE,
+        max_age=settings.REPLICA_STICKY_SECONDS
+    ) is not None
+
+
+def pin(request, response):
+    # DRF записывает аутентифицированного пользователя в request.user.
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(PIN_KEY.format(user.pk), True,
+                  settings.REPLICA_STICKY_SECONDS)
+    response.set_signed_cookie(
+        PIN_COOKIE, '1', salt=PIN_COOKIE,
+        max_age=math.ceil(settings.REPLICA_STICKY_SECONDS),
+        httponly=True, samesite='Lax'
+    )
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Безопасные запросы к каталогу читают с реплики, если клиент
+    не писал в базу последние REPLICA_STICKY_SECONDS секунд. Успешная
+    запись закрепляет клиента за основной базой на это время.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                pin(request, response)
+            return response
+        if not READ_PATHS.match(request.path_info) or is_pinned(request):
+            return self.get_response(request)
+        token = current_route.set(Route())
+        try:
+            return self.get_response(request)
+        finally:
+            current_route.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Чтение в запросах ReplicaRoutingMiddleware - с реплики, кроме
+    пользователей и версий данных.
+    """
+
+    def db_for_read(self, model, **hints):
+        route = current_route.get()
+        if route is None:
+            return None
+        if model._meta.label in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        return route.read_alias()
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную базу.
+        instance = hints.get('instance')
+        if (instance is not None
+                and instance._state.db in settings.DATABASE_REPLICAS):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики хранят те же данные, что и основная база.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
@@ -0,0 +1,173 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+# Полнотекстовый поиск по названию и описанию произведений.
+# PostgreSQL: GIN-индекс по выражению to_tsvector (и триграммный индекс
+# по названию, если доступно расширение pg_trgm). SQLite: виртуальная
+# таблица FTS5 с триггерами на api_title. Индексы обновляет сама база
+# при любой записи в api_title, в том числе при bulk-операциях.
+
+SEARCH_CONFIG = 'russian'
+SEARCH_DOCUMENT = (
+    f"to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+    "coalesce({name}, '') || ' ' || coalesce({description}, ''))"
+)
+FTS_TABLE = 'api_title_fts'
+
+POSTGRES_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS api_title_search_idx ON api_title '
+    'USING gin (({}))'.format(
+        SEARCH_DOCUMENT.format(name='name', description='description')),
+]
+POSTGRES_TRIGRAM_INDEXES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS api_title_name_trgm_idx ON api_title '
+    'USING gin (upper(name::text) gin_trgm_ops)',
+]
+SQLITE_INDEX = [
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "name, description, content='api_title', content_rowid='id')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON api_title '
+    f'BEGIN INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON api_title '
+    f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON api_title '
+    f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+_fts_databases = set()
+_trigram_databases = {}
+
+
+def execute_optional(connection, statements):
+    """Выполняет statements, если база их поддерживает."""
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+    except DatabaseError:
+        return False
+    return True
+
+
+def install_search_index(connection):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for sql in POSTGRES_INDEXES:
+                cursor.execute(sql)
+        execute_optional(connection, POSTGRES_TRIGRAM_INDEXES)
+    elif connection.vendor == 'sqlite':
+        execute_optional(connection, SQLITE_INDEX)
+
+
+def has_fts_table(connection):
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_databases:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                'AND name = %s', [FTS_TABLE])
+            if cursor.fetchone() is None:
+                return False
+        _fts_databases.add(key)
+    return True
+
+
+def has_trigram_index(connection):
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _trigram_databases:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM pg_indexes WHERE indexname = %s',
+                ['api_title_name_trgm_idx'])
+            _trigram_databases[key] = cursor.fetchone() is not None
+    return _trigram_databases[key]
+
+
+def search_terms(value):
+    return re.findall(r'\w+', value or '')
+
+
+def search_postgres(queryset, terms):
+    table = queryset.model._meta.db_table
+    document = SEARCH_DOCUMENT.format(
+        name=f'"{table}"."name"', description=f'"{table}"."description"')
+    query = f"to_tsquery('{SEARCH_CONFIG}'::regconfig, %s)"
+    # Совпадения в названии весят больше, чем в описании.
+    rank_document = (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+        f"coalesce(\"{table}\".\"name\", '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+        f"coalesce(\"{table}\".\"description\", '')), 'B')"
+    )
+    tsquery = ' | '.join(f'{term}:*' for term in terms)
+    condition = Q(search_match=True)
+    # Подстроки в названии ищем, только если их покрывает триграммный
+    # индекс: иначе OR с LIKE отключает GIN-индекс.
+    if has_trigram_index(connections[queryset.db]):
+        condition |= reduce(or_, [Q(name__icontains=term) for term in terms])
+    return queryset.annotate(
+        search_match=RawSQL(
+            f'{document} @@ {query}', (tsquery,),
+            output_field=BooleanField()),
+        search_rank=RawSQL(
+            f'ts_rank({rank_document}, {query})', (tsquery,),
+            output_field=FloatField()),
+    ).filter(condition)
+
+
+def search_sqlite(queryset, terms):
+    table = queryset.model._meta.db_table
+    match = ' OR '.join(f'"{term}"*' for term in terms)
+    # RawSQL в pk__in оборачивается в двойные скобки, и SQLite считает
+    # такой подзапрос скалярным, поэтому условие задаётся через extra().
+    return queryset.extra(
+        where=[
+            f'"{table}"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[match]
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+            (match,), output_field=FloatField())
+    )
+
+
+def search_fallback(queryset, terms):
+    return queryset.filter(reduce(or_, [
+        Q(name__icontains=term) | Q(description__icontains=term)
+        for term in terms
+    ]))
+
+
+def search_titles(queryset, value):
+    """
+    Отбирает произведения, в названии или описании которых есть хотя бы
+    одно из слов value (в том числе как начало слова), и упорядочивает
+    их по релевантности.
+    """
+    terms = search_terms(value)
+    if not terms:
+        return queryset
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        queryset = search_postgres(queryset, terms)
+    elif connection.vendor == 'sqlite' and has_fts_table(connection):
+        queryset = search_sqlite(queryset, terms)
+    else:
+        return search_fallback(queryset, terms)
+    return queryset.order_by('-search_rank', *queryset.model._meta.ordering)
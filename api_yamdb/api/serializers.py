@@ -1,13 +1,18 @@
 import uuid
+from collections import OrderedDict
 
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
 from rest_framework.validators import UniqueValidator
 
+from .bulk import is_lookup_value, related_key
+from .metrics import TimedSerializerMixin
 from .models import Category, Comment, Genre, Review, Title, User
 
 
-class TokenObtainByEmailSerializer(serializers.Serializer):
+class TokenObtainByEmailSerializer(TimedSerializerMixin,
+                                   serializers.Serializer):
     email = serializers.EmailField(max_length=100)
     confirmation_code = serializers.CharField(max_length=50)
 
@@ -20,7 +25,8 @@ class TokenObtainByEmailSerializer(serializers.Serializer):
         return attrs
 
 
-class UserEmailConfirmationSerializer(serializers.ModelSerializer):
+class UserEmailConfirmationSerializer(TimedSerializerMixin,
+                                      serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('email',)
@@ -48,7 +54,7 @@ class UserEmailConfirmationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class UsersSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=50,
         required=True,
@@ -72,26 +78,87 @@ class UsersSerializer(serializers.ModelSerializer):
         model = User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class PrefetchedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который при пакетной записи берёт объекты из
+    context['related_objects'], загруженных заранее (см. bulk.py).
+    """
+
+    def to_internal_value(self, data):
+        related = self.context.get('related_objects', {}).get(
+            related_key(self))
+        if related is None:
+            return super().to_internal_value(data)
+        if not is_lookup_value(data):
+            self.fail('invalid')
+        if str(data) not in related:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return related[str(data)]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Поля ответа из context['fields'] и вид связей из context['expand'],
+    их задаёт SparseFieldsetMixin представления. Связи из
+    expandable_fields() выводятся вложенными объектами, если названы в
+    expand, иначе свёрнутыми (слагом или именем).
+    """
+
+    @classmethod
+    def expandable_fields(cls):
+        """{имя: (свёрнутое поле, вложенное поле)}."""
+        return {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get('expand')
+        if expand is not None:
+            for name, (collapsed, expanded) in (
+                    self.expandable_fields().items()):
+                fields[name] = expanded if name in expand else collapsed
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in requested
+        )
+
+
+class AuthorSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        fields = ('username', 'first_name', 'last_name', 'bio')
+        model = User
+
+
+def author_fields():
+    return (
+        serializers.SlugRelatedField(read_only=True, slug_field='username'),
+        AuthorSerializer(read_only=True),
+    )
+
+
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         exclude = ['id']
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         exclude = ['id']
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    rating = serializers.FloatField(min_value=0, max_value=10, required=False)
-    genre = serializers.SlugRelatedField(
+class TitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    rating = serializers.FloatField(read_only=True)
+    genre = PrefetchedSlugRelatedField(
         many=True,
         slug_field='slug',
         queryset=Genre.objects.all(),
     )
-    category = serializers.SlugRelatedField(
+    category = PrefetchedSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all(),
     )
@@ -103,8 +170,10 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleReadOnlySerializer(serializers.ModelSerializer):
-    rating = serializers.FloatField(min_value=0, max_value=10)
+class TitleReadOnlySerializer(TimedSerializerMixin,
+                              SparseFieldsetSerializerMixin,
+                              serializers.ModelSerializer):
+    rating = serializers.FloatField(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
 
@@ -114,12 +183,27 @@ class TitleReadOnlySerializer(serializers.ModelSerializer):
         )
         model = Title
 
-
-class ReviewSerializer(serializers.ModelSerializer):
+    @classmethod
+    def expandable_fields(cls):
+        return {
+            'genre': (
+                serializers.SlugRelatedField(
+                    many=True, read_only=True, slug_field='slug'),
+                GenreSerializer(many=True, read_only=True),
+            ),
+            'category': (
+                serializers.SlugRelatedField(
+                    read_only=True, slug_field='slug'),
+                CategorySerializer(read_only=True),
+            ),
+        }
+
+
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
-        slug_field='username',
-        default=serializers.CurrentUserDefault()
+        slug_field='username'
     )
 
     class Meta:
@@ -127,21 +211,32 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('title',)
         model = Review
 
+    @classmethod
+    def expandable_fields(cls):
+        return {'author': author_fields()}
+
     def validate(self, attrs):
-        attrs['title'] = get_object_or_404(
-            Title, id=self.context['view'].kwargs['title_id'])
-        if not self.partial and Review.objects.filter(
+        if self.instance is not None:
+            return attrs
+        view = self.context['view']
+        attrs['title'] = view.get_title()
+        if Review.objects.filter(
                 title=attrs['title'],
-                author=self.context['request'].user
+                author_id=self.context['request'].user.pk
         ).exists():
             raise serializers.ValidationError(
                 {'author': 'Вы уже оставляли отзыв на это произведение'})
         return attrs
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, SparseFieldsetSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.CharField(source='author.username', read_only=True)
 
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+    @classmethod
+    def expandable_fields(cls):
+        return {'author': author_fields()}
@@ -0,0 +1,121 @@
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_save)
+from django.dispatch import receiver
+
+from . import versions
+from .authentication import forget_user
+from .models import Category, Genre, Review, Title, User
+from .ratings import SQLITE_INDEXES
+from .search import execute_optional, install_search_index
+
+# Имя пользователя в токене справочное и прав не даёт, его смена токены
+# не отзывает.
+TOKEN_USER_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+VERSIONED_MODELS = {
+    Category: versions.CATEGORY,
+    Genre: versions.GENRE,
+    Title: versions.TITLE,
+    Review: versions.REVIEW,
+}
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    """Запоминает оценку отзыва до изменения."""
+    instance._rating_before = None
+    if raw or instance.pk is None:
+        return
+    instance._rating_before = Review.objects.select_for_update().filter(
+        pk=instance.pk
+    ).values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, raw, **kwargs):
+    """Пересчитывает хранимый рейтинг произведения после записи отзыва."""
+    if raw:
+        return
+    before = getattr(instance, '_rating_before', None)
+    if before is None:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1)
+        return
+    title_id, score = before
+    if title_id == instance.title_id:
+        if score != instance.score:
+            Title.objects.filter(pk=title_id).shift_rating(
+                instance.score - score, 0)
+        return
+    Title.objects.filter(pk=title_id).shift_rating(-score, -1)
+    Title.objects.filter(pk=instance.title_id).shift_rating(
+        instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва, в том числе при каскадах."""
+    Title.objects.filter(pk=instance.title_id).shift_rating(
+        -instance.score, -1)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """
+    SQLite пересоздаёт таблицу при изменении полей и теряет триггеры
+    поискового индекса и индексы рейтинга, созданные SQL-запросами,
+    поэтому после миграций они восстанавливаются.
+    """
+    connection = connections[using]
+    if sender.name == 'api' and connection.vendor == 'sqlite':
+        install_search_index(connection)
+        # До миграции 0009 столбца rating нет.
+        execute_optional(connection, SQLITE_INDEXES)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_data_version(sender, **kwargs):
+    """Увеличивает версию данных каталога при любой записи."""
+    if sender in VERSIONED_MODELS:
+        versions.bump_versions(VERSIONED_MODELS[sender])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_version(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versions.bump_versions(versions.TITLE)
+
+
+@receiver(pre_save, sender=User)
+def remember_token_user_fields(sender, instance, raw, **kwargs):
+    """Запоминает поля пользователя, которые попадают в токен."""
+    instance._token_fields_before = None
+    if raw or instance.pk is None:
+        return
+    instance._token_fields_before = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*TOKEN_USER_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_user_change(sender, instance, raw, **kwargs):
+    """
+    Сбрасывает кеш пользователя и отзывает его токены, если изменились
+    роль, права или активность.
+    """
+    if raw:
+        return
+    before = getattr(instance, '_token_fields_before', None)
+    after = tuple(getattr(instance, field) for field in TOKEN_USER_FIELDS)
+    revoked = forget_user(
+        instance.pk, revoke=before is not None and before != after)
+    if revoked is not None:
+        # Иначе следующий save() этого объекта вернёт прежнее значение.
+        instance.tokens_revoked_at = revoked
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    forget_user(instance.pk, revoke=True)
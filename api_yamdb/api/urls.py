@@ -1,8 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, TokenObtainByEmailView,
+from .views import (CategoryViewSet, CommentExportView, CommentViewSet,
+                    GenreViewSet, ReviewExportView, ReviewViewSet,
+                    TitleExportView, TitleViewSet, TokenObtainByEmailView,
                     UserEmailConfirmationView, UsersViewSet)
 
 token_urls = [
@@ -45,8 +46,15 @@ router_v1.register(
     basename='users'
 )
 
+export_urls = [
+    path('titles/', TitleExportView.as_view(), name='export-titles'),
+    path('reviews/', ReviewExportView.as_view(), name='export-reviews'),
+    path('comments/', CommentExportView.as_view(), name='export-comments'),
+]
+
 urlpatterns = [
     path('v1/auth/email/', UserEmailConfirmationView.as_view()),
     path('v1/auth/token/', include(token_urls)),
+    path('v1/export/', include(export_urls)),
     path('v1/', include(router_v1.urls)),
 ]
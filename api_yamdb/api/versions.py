@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataVersion
+
+# Версии данных каталога. Любая запись в таблицу увеличивает версию
+# (сигналы в signals.py, bulk-операции вызывают bump_versions сами),
+# поэтому по версиям можно дёшево понять, изменились ли данные ответа.
+# Версия увеличивается после фиксации транзакции записи: строка
+# DataVersion блокируется только на время своего UPDATE, а не всей
+# записи, и параллельные записи в каталог не ждут друг друга. До этого
+# UPDATE читатели могут получить новые данные со старой версией, но
+# не наоборот.
+
+CATEGORY = 'category'
+GENRE = 'genre'
+TITLE = 'title'
+REVIEW = 'review'
+CATALOG = (CATEGORY, GENRE, TITLE, REVIEW)
+
+
+def bump_versions(*names):
+    transaction.on_commit(lambda: write_versions(names))
+
+
+def write_versions(names):
+    now = timezone.now()
+    updated = DataVersion.objects.filter(name__in=names).update(
+        version=F('version') + 1, modified=now)
+    if updated < len(names):
+        for name in names:
+            DataVersion.objects.get_or_create(
+                name=name, defaults={'version': 1, 'modified': now})
+
+
+def get_versions(names):
+    """Возвращает {name: (version, modified)} для всех names."""
+    versions = dict.fromkeys(names, (0, None))
+    versions.update(
+        (name, (version, modified))
+        for name, version, modified in DataVersion.objects.filter(
+            name__in=names).values_list('name', 'version', 'modified')
+    )
+    return versions
@@ -1,19 +1,36 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.generics import CreateAPIView
+from rest_framework.generics import CreateAPIView, GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
-from .filters import TitleFilter
-from .models import Category, Genre, Review, Title
+from . import versions
+from .authentication import ClaimsAccessToken, get_user_instance
+from .caching import titles_cache
+from .db.pool import pool_stats
+from .export import EXPORTS
+from .filters import (CommentExportFilter, ReviewExportFilter, TitleFilter,
+                      TitleOrderingFilter, TitleSearchFilter)
+from .metrics import read_slow_queries, registry
+from .mixins import (BulkWriteMixin, CachedResponseMixin, ConditionalGetMixin,
+                     NestedParentMixin, SparseFieldsetMixin,
+                     StreamingJSONMixin)
+from .models import Category, Comment, Genre, Review, Title
+from .pagination import PubDatePagination
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrStaffOrReadOnly
+from .profiling import get_profile_store
+from .renderers import (CSVRenderer, NDJSONRenderer, PlainTextRenderer,
+                        PrometheusRenderer)
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer,
                           TitleReadOnlySerializer, TitleSerializer,
@@ -22,6 +39,12 @@ from .serializers import (CategorySerializer, CommentSerializer,
 
 User = get_user_model()
 
+# Столбцы автора для свёрнутого и вложенного вида (AuthorSerializer).
+AUTHOR_COLUMNS = (
+    'author__username', 'author__first_name', 'author__last_name',
+    'author__bio',
+)
+
 
 class ListCreateDestroyModelViewSet(
     mixins.CreateModelMixin,
@@ -47,11 +70,122 @@ class TokenObtainByEmailView(APIView):
             User,
             email=serializer.validated_data.get('email')
         )
-        token = AccessToken().for_user(user)
+        token = ClaimsAccessToken.for_user(user)
         data = {'token': str(token)}
         return Response(data, status=status.HTTP_200_OK)
 
 
+class MetricsView(APIView):
+    """Метрики запросов, кеша ответов и пулов соединений для Prometheus."""
+    permission_classes = (IsAdmin,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(registry.render(
+            caches=[('titles', titles_cache)], pools=pool_stats()))
+
+
+class ProfileListView(APIView):
+    """Сохранённые профили запросов, новые первыми."""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response([
+            {
+                'name': name,
+                'size': stat.st_size,
+                'created': datetime.fromtimestamp(
+                    stat.st_mtime, timezone.utc).isoformat(),
+            }
+            for name, stat in get_profile_store().entries()
+        ])
+
+
+class ProfileDetailView(APIView):
+    """
+    Отчёт pstats по профилю (?sort=, ?limit=), с ?download=1 - сам файл
+    для snakeviz и подобных инструментов.
+    """
+    permission_classes = (IsAdmin,)
+    renderer_classes = (PlainTextRenderer,)
+
+    def get(self, request, name):
+        store = get_profile_store()
+        try:
+            if request.query_params.get('download'):
+                return FileResponse(
+                    open(store.path(name), 'rb'),
+                    as_attachment=True, filename=name)
+            return Response(store.report(
+                name,
+                sort=request.query_params.get('sort', 'cumulative'),
+                limit=int(request.query_params.get('limit', 50))
+            ))
+        except FileNotFoundError:
+            raise NotFound('Профиль не найден')
+        except (KeyError, ValueError):
+            raise ValidationError('Неверные параметры sort или limit')
+
+
+class SlowQueryListView(APIView):
+    """Последние записи журнала медленных запросов."""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(read_slow_queries())
+
+
+class ExportView(GenericAPIView):
+    """
+    Потоковая выгрузка всей таблицы export_resource или её части по
+    фильтрам: NDJSON по умолчанию, CSV с ?format=csv или Accept: text/csv.
+    Только для администратора, строки идут по возрастанию id.
+    """
+    permission_classes = (IsAdmin,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+    pagination_class = None
+    export_resource = None
+
+    def get(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        # Строки читаются уже после выхода из представления, поэтому
+        # база (реплика) выбирается сейчас.
+        queryset = queryset.using(queryset.db)
+        columns, rows = EXPORTS[self.export_resource]
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.render_rows(columns, rows(queryset)),
+            content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.export_resource}.'
+            f'{renderer.format}"')
+        return response
+
+
+class TitleExportView(ExportView):
+    queryset = Title.objects.all()
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter,)
+    filterset_class = TitleFilter
+    export_resource = 'titles'
+
+
+class ReviewExportView(ExportView):
+    queryset = Review.objects.all()
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = ReviewExportFilter
+    export_resource = 'reviews'
+
+
+class CommentExportView(ExportView):
+    queryset = Comment.objects.all()
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = CommentExportFilter
+    export_resource = 'comments'
+
+
 class UsersViewSet(viewsets.ModelViewSet):
     """
     Обработка запросов к /users/. Доступ разрёшен только если
@@ -69,13 +203,15 @@ class UsersViewSet(viewsets.ModelViewSet):
             permission_classes=[IsAuthenticated],
             url_path='me', url_name='users-me')
     def get_self_user_data(self, request):
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(get_user_instance(request.user))
         return Response(serializer.data)
 
     @get_self_user_data.mapping.patch
     def patch_self_user_data(self, request):
+        # Запись идёт в свежую строку: в кеше процесса могут остаться
+        # роль и активность, которые уже изменил администратор.
         serializer = self.get_serializer(
-            request.user,
+            User.objects.get(pk=request.user.pk),
             data=request.data,
             partial=True
         )
@@ -84,7 +220,12 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class CategoryViewSet(ListCreateDestroyModelViewSet):
+class CategoryViewSet(
+    ConditionalGetMixin,
+    BulkWriteMixin,
+    StreamingJSONMixin,
+    ListCreateDestroyModelViewSet
+):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -92,70 +233,168 @@ class CategoryViewSet(ListCreateDestroyModelViewSet):
     search_fields = ['name', ]
     ordering_fields = ['name', ]
     lookup_field = 'slug'
+    version_names = (versions.CATEGORY,)
+    bulk_versions = (versions.CATEGORY,)
 
 
-class GenreViewSet(ListCreateDestroyModelViewSet):
+class GenreViewSet(
+    ConditionalGetMixin,
+    BulkWriteMixin,
+    StreamingJSONMixin,
+    ListCreateDestroyModelViewSet
+):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = [SearchFilter]
     search_fields = ['name', ]
     lookup_field = 'slug'
+    version_names = (versions.GENRE,)
+    bulk_versions = (versions.GENRE,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitleViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkWriteMixin,
+    SparseFieldsetMixin,
+    StreamingJSONMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     # serializer_class = TitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, SearchFilter,)
+    filter_backends = (
+        DjangoFilterBackend, TitleSearchFilter, TitleOrderingFilter)
     filterset_class = TitleFilter
-    search_fields = ('name',)
+    search_fields = ('name', 'description')
+    ordering_fields = ('rating', 'reviews_count', 'year', 'name')
+    version_names = versions.CATALOG
+    response_cache = titles_cache
+    bulk_versions = (versions.TITLE,)
+    sparse_columns = {
+        'id': (),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category',),
+    }
+    sparse_select = {'category': 'category'}
+    sparse_prefetch = {'genre': 'genre'}
+
+    def get_queryset(self):
+        return self.trim_queryset(super().get_queryset())
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleReadOnlySerializer
         return TitleSerializer
 
+    @action(detail=False, url_path='ratings', url_name='ratings')
+    def ratings(self, request):
+        """
+        Рейтинги и число отзывов для списка произведений:
+        /titles/ratings/?ids=1,2,3. Не больше TITLE_RATINGS_MAX_BATCH
+        идентификаторов за запрос, неизвестные пропускаются.
+        """
+        return self.conditional_response(self.list_ratings, request)
+
+    def list_ratings(self, request):
+        ids = self.get_ratings_ids(request)
+        ratings = Title.objects.stored_ratings(ids)
+        return Response({'results': [
+            {
+                'id': pk,
+                'rating': ratings[pk][0],
+                'reviews_count': ratings[pk][1],
+            }
+            for pk in ids if pk in ratings
+        ]})
+
+    def get_ratings_ids(self, request):
+        values = [
+            value.strip()
+            for param in request.query_params.getlist('ids')
+            for value in param.split(',')
+            if value.strip()
+        ]
+        if not values:
+            raise ValidationError(
+                {'ids': 'Укажите идентификаторы произведений'})
+        try:
+            ids = list(dict.fromkeys(int(value) for value in values))
+        except ValueError:
+            raise ValidationError(
+                {'ids': 'Идентификаторы должны быть целыми числами'})
+        if len(ids) > settings.TITLE_RATINGS_MAX_BATCH:
+            raise ValidationError({'ids': (
+                'Не больше {} произведений за запрос'.format(
+                    settings.TITLE_RATINGS_MAX_BATCH))})
+        return ids
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(NestedParentMixin, SparseFieldsetMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrStaffOrReadOnly,)
+    pagination_class = PubDatePagination
+    sparse_columns = {
+        'id': (),
+        'text': ('text',),
+        'author': AUTHOR_COLUMNS,
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'title': ('title',),
+    }
+    # Страницы выбираются по курсору (pub_date, id), title_id нужен
+    # related-менеджеру title.reviews.
+    sparse_required = ('pub_date', 'title')
+    sparse_select = {'author': 'author'}
 
     def get_queryset(self):
-        return get_object_or_404(
-            Title,
-            pk=self.kwargs.get('title_id')
-        ).reviews.all()
+        return self.trim_queryset(
+            self.get_title().reviews.select_related('author'))
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
-            title=get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+            author_id=self.request.user.pk,
+            title=self.get_title()
         )
 
     def get_object(self):
-        obj = get_object_or_404(Review, title_id=self.kwargs['title_id'],
-                                id=self.kwargs['pk'])
+        obj = get_object_or_404(
+            self.trim_queryset(Review.objects.select_related('author')),
+            title_id=self.kwargs['title_id'],
+            id=self.kwargs['pk']
+        )
         self.check_object_permissions(self.request, obj)
         return obj
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(NestedParentMixin, SparseFieldsetMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrStaffOrReadOnly,)
+    pagination_class = PubDatePagination
+    sparse_columns = {
+        'id': (),
+        'text': ('text',),
+        'author': AUTHOR_COLUMNS,
+        'pub_date': ('pub_date',),
+    }
+    sparse_required = ('pub_date', 'review')
+    sparse_select = {'author': 'author'}
 
     def get_queryset(self):
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id')
-        ).comments.all()
+        return self.trim_queryset(
+            self.get_review().comments.select_related('author'))
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
-            review=get_object_or_404(
-                Review,
-                title_id=self.kwargs.get('title_id'),
-                pk=self.kwargs.get('review_id')
-            )
+            author_id=self.request.user.pk,
+            review=self.get_review()
         )
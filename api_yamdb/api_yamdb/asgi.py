@@ -3,14 +3,24 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+В Django 2.2 нет django.core.asgi: WSGI-обработчик Django работает в пулах
+потоков ThreadPoolASGIHandler. Запуск:
+
+    gunicorn api_yamdb.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from api.asgi import ThreadPoolASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+application = ThreadPoolASGIHandler(
+    get_wsgi_application(),
+    read_threads=settings.ASGI_READ_THREADS,
+    write_threads=settings.ASGI_WRITE_THREADS,
+    max_pending=settings.ASGI_MAX_PENDING,
+)
@@ -31,12 +31,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilingMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -62,6 +65,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', default=32))
+ASGI_WRITE_THREADS = int(os.getenv('ASGI_WRITE_THREADS', default=8))
+ASGI_MAX_PENDING = int(os.getenv('ASGI_MAX_PENDING', default=1024))
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv(
@@ -71,10 +78,89 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # С ENGINE = 'api.db.postgresql' соединения берёт и возвращает
+        # пул, тогда CONN_MAX_AGE не нужен. Без пула соединение с
+        # CONN_MAX_AGE > 0 остаётся у каждого потока каждого воркера, и
+        # соединений может стать больше max_connections (см. README).
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=0)),
+        'POOL': {
+            'SIZE': int(os.getenv('DB_POOL_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
+            'CHECK_INTERVAL': float(
+                os.getenv('DB_POOL_CHECK_INTERVAL', default=30)),
+        },
+    }
+}
+
+# Реплики для чтения каталога: адреса host[:port] через пробел, для
+# SQLite - пути к файлам баз.
+DATABASE_REPLICAS = []
+for number, address in enumerate(os.getenv('DB_REPLICAS', '').split(), 1):
+    replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if 'sqlite3' in replica['ENGINE']:
+        replica['NAME'] = address
+    else:
+        replica['HOST'], _, port = address.partition(':')
+        replica['PORT'] = port or replica['PORT']
+    DATABASES[f'replica{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+# Сколько секунд после записи пользователь читает с основной базы.
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', default=5))
+# Через сколько секунд снова пробовать недоступную реплику.
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', default=30))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
 
+TITLES_CACHE_ALIAS = 'default'
+TITLES_CACHE_TIMEOUT = int(os.getenv('TITLES_CACHE_TIMEOUT', default=300))
+TITLE_RATINGS_MAX_BATCH = int(
+    os.getenv('TITLE_RATINGS_MAX_BATCH', default=2000))
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', default=10000))
+TOKEN_USER_CACHE_TTL = int(os.getenv('TOKEN_USER_CACHE_TTL', default=60))
+
+PROFILES_DIR = os.getenv(
+    'PROFILES_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILES_MAX_COUNT = int(os.getenv('PROFILES_MAX_COUNT', default=100))
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', default=200))
+SLOW_QUERY_LOG = os.getenv(
+    'SLOW_QUERY_LOG', default=os.path.join(BASE_DIR, 'logs', 'slow_queries.log'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            # Каталог журнала создаётся при первой записи.
+            'class': 'api.log_handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'api.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,7 +200,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
@@ -122,10 +208,31 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+        'api.pagination.PageSizePagination',
+    'PAGE_SIZE': 10,
+
+    # Ответы побайтно совпадают с JSONRenderer и JSONParser, orjson
+    # необязателен.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Наибольший размер страницы, который можно запросить через ?page_size=.
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', default=1000))
+# Списки от стольких объектов отдаются кусками (StreamingJSONMixin).
+JSON_STREAM_MIN_ITEMS = int(os.getenv('JSON_STREAM_MIN_ITEMS', default=500))
+JSON_STREAM_CHUNK_SIZE = int(
+    os.getenv('JSON_STREAM_CHUNK_SIZE', default=64 * 1024))
+# Выгрузки (/api/v1/export/) читают строки из базы пакетами такого размера.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=14),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -2,9 +2,24 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.views import (MetricsView, ProfileDetailView, ProfileListView,
+                       SlowQueryListView)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('metrics/profiles/', ProfileListView.as_view(), name='profiles'),
+    path(
+        'metrics/profiles/<str:name>/',
+        ProfileDetailView.as_view(),
+        name='profile'
+    ),
+    path(
+        'metrics/slow-queries/',
+        SlowQueryListView.as_view(),
+        name='slow_queries'
+    ),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
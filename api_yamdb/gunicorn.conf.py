@@ -0,0 +1,60 @@
+"""
+Настройки gunicorn для контейнера: gunicorn читает ./gunicorn.conf.py
+из рабочего каталога. Все значения переопределяются переменными
+окружения, см. README.
+"""
+import os
+
+
+def cpu_count():
+    # Учитывает ограничение CPU контейнера через taskset/cpuset.
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+CPUS = cpu_count()
+SERVER_MODE = os.getenv('SERVER_MODE', default='wsgi')
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', default=CPUS * 2 + 1))
+
+if SERVER_MODE == 'asgi':
+    # Потоками управляет ThreadPoolASGIHandler (ASGI_READ_THREADS и
+    # ASGI_WRITE_THREADS).
+    wsgi_app = 'api_yamdb.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'api_yamdb.wsgi:application'
+    threads = int(os.getenv('GUNICORN_THREADS', default=2))
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Приложение загружается и прогревается в мастере один раз, воркеры
+# получают готовые модули после fork.
+preload_app = True
+
+# Перезапуск воркеров против утечек памяти; разброс, чтобы они не
+# перезапускались одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = int(
+    os.getenv('GUNICORN_MAX_REQUESTS_JITTER', default=max_requests // 10))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        warm(server.log)
+
+
+def post_worker_init(worker):
+    if not worker.cfg.preload_app:
+        warm(worker.log)
+
+
+def warm(log):
+    from api.warmup import warmup
+
+    log.info('Прогрев приложения: %.3f с', warmup())
@@ -0,0 +1,90 @@
+import pytest
+
+
+def token_client(user, legacy=False):
+    """Клиент с настоящим access-токеном пользователя."""
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import ClaimsAccessToken
+
+    token_class = AccessToken if legacy else ClaimsAccessToken
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {token_class.for_user(user)}')
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_superuser(
+        username='admin', email='admin@yamdb.fake', password='admin'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    """
+    Небольшой каталог: у каждого произведения несколько жанров,
+    отзывы разных пользователей и комментарии к ним.
+    """
+    from api.models import Category, Comment, Genre, Review, Title
+
+    users = [
+        django_user_model.objects.create(
+            username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(15)
+    ]
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(5)
+    ]
+    titles = []
+    for i in range(15):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=1990 + i,
+            description=f'Описание {i}',
+            category=categories[i % len(categories)],
+        )
+        title.genre.set(genres[:i % len(genres) + 1])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text=f'Отзыв {i}', score=i % 11
+        )
+        for i, user in enumerate(users)
+    ]
+    for i, user in enumerate(users):
+        Comment.objects.create(
+            review=reviews[0], author=user, text=f'Комментарий {i}'
+        )
+    return {
+        'users': users,
+        'categories': categories,
+        'genres': genres,
+        'titles': titles,
+        'reviews': reviews,
+    }
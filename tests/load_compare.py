@@ -0,0 +1,173 @@
+"""
+Сравнение пропускной способности WSGI (синхронные воркеры gunicorn) и
+ASGI (gunicorn с воркерами uvicorn, api_yamdb/asgi.py) на чтении
+произведений, отзывов и комментариев.
+
+Оба сервера запускаются с одинаковым числом процессов на одной базе из
+переменных окружения, к каждому SQL-запросу добавляется задержка
+DB_LATENCY_MS (tests/load_settings.py). База должна быть заполнена:
+
+    python api_yamdb/manage.py generate_data --reviews 100000 --seed 1
+    python tests/load_compare.py --requests 2000 --concurrency 64
+
+Параметры - python tests/load_compare.py --help.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERS = {
+    'wsgi': ['api_yamdb.wsgi:application'],
+    'asgi': ['api_yamdb.asgi:application',
+             '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, args):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='tests.load_settings',
+        DB_LATENCY_MS=str(args.db_latency),
+        PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'api_yamdb')]),
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+         '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers),
+         '--log-level', 'warning'],
+        cwd=ROOT, env=env)
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Сервер на порту {port} не запустился')
+
+
+async def fetch(reader, writer, path):
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin1').partition(':')
+        name, value = name.lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            keep_alive = value != 'close'
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def run_load(port, paths, total, concurrency):
+    """
+    Запросы по кругу из concurrency клиентов. Синхронные воркеры gunicorn
+    не поддерживают keep-alive, тогда соединение открывается заново.
+    """
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        writer = None
+        for number in counter:
+            started = time.perf_counter()
+            if writer is None:
+                reader, writer = await asyncio.open_connection(
+                    '127.0.0.1', port)
+            status, keep_alive = await fetch(
+                reader, writer, paths[number % len(paths)])
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+            if not keep_alive:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+def read_paths():
+    import django
+
+    sys.path[:0] = [ROOT, os.path.join(ROOT, 'api_yamdb')]
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    django.setup()
+    from api.models import Review, Title
+
+    title = Title.objects.order_by('pk').first()
+    review = Review.objects.filter(title=title).order_by('pk').first()
+    if review is None:
+        sys.exit('Нет данных: запустите manage.py generate_data')
+    return [
+        '/api/v1/titles/',
+        f'/api/v1/titles/{title.pk}/',
+        f'/api/v1/titles/{title.pk}/reviews/',
+        f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+    ]
+
+
+def percentile(values, percent):
+    return values[min(len(values) - 1, round(percent / 100 * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--db-latency', type=float, default=20,
+                        help='задержка каждого SQL-запроса, мс')
+    parser.add_argument('--modes', nargs='+', default=list(SERVERS),
+                        choices=list(SERVERS))
+    args = parser.parse_args()
+    paths = read_paths()
+
+    print(f'Запросов: {args.requests}, соединений: {args.concurrency}, '
+          f'процессов: {args.workers}, задержка SQL: {args.db_latency} мс')
+    print(f'{"сервер":<6} {"запросов/с":>11} {"p50, мс":>9} '
+          f'{"p95, мс":>9} {"ошибок":>7}')
+    for mode in args.modes:
+        port = free_port()
+        server = start_server(mode, port, args)
+        try:
+            wait_ready(port)
+            loop = asyncio.get_event_loop()
+            # Прогрев: соединения с базой и импорт в каждом воркере.
+            loop.run_until_complete(
+                run_load(port, paths, args.workers * 20, args.workers))
+            elapsed, latencies, errors = loop.run_until_complete(
+                run_load(port, paths, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f'{mode:<6} {len(latencies) / elapsed:>11.1f} '
+              f'{percentile(latencies, 50) * 1000:>9.1f} '
+              f'{percentile(latencies, 95) * 1000:>9.1f} {errors:>7}')
+
+
+if __name__ == '__main__':
+    main()
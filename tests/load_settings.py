@@ -0,0 +1,31 @@
+"""
+Настройки для tests/load_compare.py: к каждому SQL-запросу добавляется
+задержка DB_LATENCY_MS, как у медленной или удалённой базы.
+"""
+import os
+import time
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import MIDDLEWARE
+
+DB_LATENCY = float(os.getenv('DB_LATENCY_MS', default=20)) / 1000
+
+
+class DBLatencyMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from django.db import connection
+
+        with connection.execute_wrapper(self.delay):
+            return self.get_response(request)
+
+    @staticmethod
+    def delay(execute, sql, params, many, context):
+        time.sleep(DB_LATENCY)
+        return execute(sql, params, many, context)
+
+
+MIDDLEWARE = ['tests.load_settings.DBLatencyMiddleware', *MIDDLEWARE]
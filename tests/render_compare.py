@@ -0,0 +1,90 @@
+"""
+Рендеринг списка произведений: JSONRenderer против FastJSONRenderer
+(api/renderers.py) целиком и кусками, как его отдаёт StreamingJSONMixin.
+
+Произведения читаются из базы из переменных окружения и сериализуются
+один раз, замеряется только рендеринг. База должна быть заполнена:
+
+    python api_yamdb/manage.py generate_data --reviews 30000 --seed 1
+    python tests/render_compare.py --titles 5000 --repeat 20
+
+Печатается медианное время рендеринга и пик памяти (tracemalloc) на
+один ответ.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__))]
+from load_compare import ROOT  # noqa: E402
+
+sys.path[:0] = [os.path.join(ROOT, 'api_yamdb')]
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+def load_titles(count):
+    from api.models import Title
+    from api.serializers import TitleReadOnlySerializer
+
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('id')[:count]
+    return {'count': len(titles), 'next': None, 'previous': None,
+            'results': TitleReadOnlySerializer(titles, many=True).data}
+
+
+def renderings():
+    """Имя -> функция, возвращающая куски ответа."""
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import FastJSONRenderer
+
+    fast = FastJSONRenderer()
+    return {
+        'json': lambda data: [JSONRenderer().render(data)],
+        'fast': lambda data: [fast.render(data)],
+        'fast-stream': fast.render_chunks,
+    }
+
+
+def measure(render, data, repeat):
+    """(медиана времени, пик памяти) одного ответа."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in render(data):
+            pass
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    # Куски отдаются клиенту по одному, в памяти держится только текущий.
+    for _ in render(data):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--titles', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    data = load_titles(args.titles)
+    reference = b''.join(renderings()['json'](data))
+    print(f'Произведений: {data["count"]}, ответ {len(reference)} байт')
+    print(f'{"рендерер":<12} {"время, мс":>10} {"память, КиБ":>12}')
+    for name, render in renderings().items():
+        assert b''.join(render(data)) == reference, (
+            f'{name}: ответ отличается')
+        timing, peak = measure(render, data, args.repeat)
+        print(f'{name:<12} {timing * 1000:>10.1f} {peak / 1024:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Холодный старт воркеров gunicorn: прежний запуск (синхронный воркер без
+предзагрузки) против api_yamdb/gunicorn.conf.py (приложение загружено и
+прогрето в мастере до fork).
+
+Один воркер перезапускается каждые --max-requests запросов, как при
+max_requests в gunicorn.conf.py, так что первый запрос каждого нового
+воркера попадает в замер. База берётся из переменных окружения и должна
+быть заполнена:
+
+    python api_yamdb/manage.py generate_data --reviews 10000 --seed 1
+    python tests/startup_compare.py --requests 200 --max-requests 20
+
+Печатается время до первого ответа сервера, медиана всех запросов и
+средняя задержка первого запроса нового воркера.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from http.client import HTTPConnection
+
+sys.path[:0] = [os.path.dirname(os.path.abspath(__file__))]
+from load_compare import ROOT, free_port, read_paths  # noqa: E402
+
+APP_DIR = os.path.join(ROOT, 'api_yamdb')
+CONFIGS = {
+    # Без gunicorn.conf.py: он читается из текущего каталога.
+    'default': dict(cwd=ROOT, args=[
+        'api_yamdb.wsgi:application', '--chdir', APP_DIR]),
+    'configured': dict(cwd=APP_DIR, args=[]),
+}
+
+
+def get(port, path):
+    connection = HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        started = time.perf_counter()
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - started
+    finally:
+        connection.close()
+
+
+def wait_listening(port, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            HTTPConnection('127.0.0.1', port, timeout=1).connect()
+            return
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError(f'Сервер на порту {port} не запустился')
+
+
+def measure(config, paths, total, max_requests):
+    """(до первого ответа, все задержки, задержки первых запросов воркеров)."""
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY='1', GUNICORN_THREADS='1')
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *CONFIGS[config]['args'],
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning',
+         '--max-requests', str(max_requests), '--max-requests-jitter', '0'],
+        cwd=CONFIGS[config]['cwd'], env=env)
+    try:
+        wait_listening(port)
+        latencies = []
+        for number in range(total):
+            status, latency = get(port, paths[number % len(paths)])
+            assert status == 200, f'{config}: ответ {status}'
+            latencies.append(latency)
+            if number == 0:
+                ready = time.perf_counter() - started
+        return ready, latencies, latencies[::max_requests]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--max-requests', type=int, default=20,
+                        help='перезапуск воркера после стольких запросов')
+    args = parser.parse_args()
+    paths = [*read_paths(), '/api/v1/categories/', '/api/v1/genres/']
+
+    print(f'Запросов: {args.requests}, '
+          f'перезапуск воркера каждые {args.max_requests}')
+    print(f'{"конфигурация":<12} {"старт, мс":>10} {"медиана, мс":>12} '
+          f'{"новый воркер, мс":>17}')
+    for config in CONFIGS:
+        ready, latencies, cold = measure(
+            config, paths, args.requests, args.max_requests)
+        print(f'{config:<12} {ready * 1000:>10.1f} '
+              f'{statistics.median(latencies) * 1000:>12.1f} '
+              f'{statistics.mean(cold) * 1000:>17.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+
+def asgi_request(app, path, method='GET', query=b'', body=b'', headers=()):
+    """Один HTTP-запрос к ASGI-приложению: (статус, заголовки, тело)."""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method,
+        'scheme': 'http', 'path': path, 'query_string': query,
+        'root_path': '', 'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000), 'headers': [
+            (b'host', b'testserver'), *headers],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.get_event_loop().run_until_complete(app(scope, receive, send))
+    start = messages[0]
+    return (
+        start['status'], dict(start['headers']),
+        b''.join(message.get('body', b'') for message in messages[1:]))
+
+
+@pytest.fixture
+def asgi_app():
+    from django.core.handlers.wsgi import WSGIHandler
+
+    from api.asgi import ThreadPoolASGIHandler
+
+    app = ThreadPoolASGIHandler(WSGIHandler(), read_threads=2,
+                                write_threads=1)
+    yield app
+    for pool in app.pools.values():
+        pool.executor.shutdown()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestASGI:
+
+    def test_read_matches_wsgi(self, catalog, asgi_app, client):
+        title = catalog['titles'][0]
+        for path in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/reviews/'):
+            status, headers, body = asgi_request(asgi_app, path)
+            assert status == 200
+            assert json.loads(body) == client.get(path).json(), (
+                'Проверьте, что ASGI отдаёт те же данные, что и WSGI'
+            )
+            assert b'server-timing' in headers
+
+    def test_pools(self, asgi_app):
+        read, write = asgi_app.pools['read'], asgi_app.pools['write']
+        scope = {'method': 'GET', 'path': '/api/v1/titles/1/reviews/'}
+        assert asgi_app.get_pool(scope) is read
+        assert asgi_app.get_pool({**scope, 'method': 'POST'}) is write, (
+            'Проверьте, что запись идёт в отдельный пул потоков'
+        )
+        assert asgi_app.get_pool({**scope, 'path': '/api/v1/users/'}) is (
+            write
+        )
+
+    def test_wsgi_adapter(self, monkeypatch):
+        from asgiref.wsgi import WsgiToAsgiInstance
+
+        from api.asgi import ThreadPoolASGIHandler
+
+        def run_wsgi_app(self, body):
+            raise AssertionError(
+                'Приложение не должно запускаться через run_wsgi_app asgiref')
+
+        # Запуск приложения не зависит от устройства run_wsgi_app в asgiref.
+        monkeypatch.setattr(WsgiToAsgiInstance, 'run_wsgi_app', run_wsgi_app)
+        calls = []
+
+        class Body(list):
+            def close(self):
+                calls.append('close')
+
+        def wsgi_application(environ, start_response):
+            calls.append(threading.current_thread().name)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return Body([b'ok'])
+
+        app = ThreadPoolASGIHandler(
+            wsgi_application, read_threads=1, write_threads=1)
+        assert asgi_request(app, '/api/v1/titles/')[::2] == (200, b'ok')
+        assert calls[0].startswith('asgi-read'), (
+            'Проверьте, что запрос выполняется в пуле потоков чтения'
+        )
+        assert calls[1] == 'close', (
+            'Проверьте, что у ответа вызывается close()'
+        )
+        for pool in app.pools.values():
+            pool.executor.shutdown()
+
+    def test_post(self, asgi_app):
+        from api.models import User
+
+        status, _, body = asgi_request(
+            asgi_app, '/api/v1/auth/email/', method='POST',
+            body=json.dumps({'email': 'asgi@yamdb.fake'}).encode(),
+            headers=[(b'content-type', b'application/json')])
+        assert status == 201, body
+        assert User.objects.filter(email='asgi@yamdb.fake').exists()
+
+    def test_overloaded(self, asgi_app):
+        asgi_app.max_pending = 0
+        status, headers, _ = asgi_request(asgi_app, '/api/v1/titles/')
+        assert status == 503, (
+            'Проверьте, что переполненный пул сразу отвечает 503'
+        )
+        assert headers[b'retry-after'] == b'1'
@@ -0,0 +1,341 @@
+"""
+Замеры задержки всех маршрутов api/urls.py на сгенерированных данных.
+
+Запускается отдельно, по умолчанию замеры пропускаются:
+
+    YAMDB_BENCHMARK=1 BENCHMARK_REVIEWS=100000 pytest -s tests/test_benchmark.py
+
+Переменные окружения:
+    BENCHMARK_REVIEWS    число отзывов (1000 по умолчанию), остальные
+                         таблицы масштабируются от него командой
+                         generate_data;
+    BENCHMARK_REPEAT     запросов на маршрут (30);
+    BENCHMARK_WARMUP     запросов на маршрут до замеров (3);
+    BENCHMARK_BASELINE   файл с эталонными результатами
+                         (tests/benchmark_baseline.json);
+    BENCHMARK_THRESHOLD  допустимый рост задержки относительно эталона
+                         (0.25);
+    BENCHMARK_METRIC     какой перцентиль сравнивать с эталоном (p95);
+    BENCHMARK_SAVE=1     записать результаты как новый эталон.
+
+Замеры сравниваются с эталоном, снятым на том же числе отзывов: тест
+падает, если перцентиль METRIC маршрута вырос больше порога или запросов к базе
+стало больше.
+"""
+import gc
+import json
+import os
+import time
+from itertools import count
+
+import pytest
+
+BASELINE_PATH = os.getenv(
+    'BENCHMARK_BASELINE',
+    os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json'))
+REVIEWS = int(os.getenv('BENCHMARK_REVIEWS', 1000))
+REPEAT = int(os.getenv('BENCHMARK_REPEAT', 30))
+WARMUP = int(os.getenv('BENCHMARK_WARMUP', 3))
+THRESHOLD = float(os.getenv('BENCHMARK_THRESHOLD', 0.25))
+METRIC = os.getenv('BENCHMARK_METRIC', 'p95')
+# Рост меньше двух миллисекунд считается шумом.
+NOISE_MS = 2.0
+SEED = 2021
+
+
+class Scenario:
+    """Запрос к маршруту route; setup готовит данные до замера."""
+
+    def __init__(self, route, url, method='get', client='anonymous',
+                 data=None, setup=None, label=''):
+        self.route = route
+        self.label = label
+        self.url = url
+        self.method = method
+        self.client = client
+        self.data = data
+        self.setup = setup
+
+    @property
+    def key(self):
+        return ' '.join(filter(None, [
+            self.method.upper(), self.route, self.label]))
+
+    def prepare(self, context):
+        if self.setup is not None:
+            self.setup(context)
+
+    def request(self, clients, context):
+        data = self.data(context) if callable(self.data) else self.data
+        response = getattr(clients[self.client], self.method)(
+            self.url.format(**context), data, format='json')
+        if response.streaming:
+            # В замер входит вся выгрузка, а не только начало ответа.
+            for _ in response.streaming_content:
+                pass
+        return response
+
+
+def new_email(context):
+    return {'email': f'bench{next(context["counter"])}@yamdb.fake'}
+
+
+def new_category(context):
+    from api.models import Category
+
+    context['slug'] = f'bench-{next(context["counter"])}'
+    Category.objects.create(name=context['slug'], slug=context['slug'])
+
+
+def new_genre(context):
+    from api.models import Genre
+
+    context['slug'] = f'bench-{next(context["counter"])}'
+    Genre.objects.create(name=context['slug'], slug=context['slug'])
+
+
+def drop_own_review(context):
+    from api.models import Review
+
+    Review.objects.filter(
+        title_id=context['title_id'], author=context['author']).delete()
+
+
+SCENARIOS = [
+    Scenario('api-root', '/api/v1/'),
+    Scenario('auth/email', '/api/v1/auth/email/', 'post', data=new_email),
+    Scenario('token_obtain_pair', '/api/v1/auth/token/', 'post',
+             data=lambda context: context['credentials']),
+    Scenario('categories-list', '/api/v1/categories/'),
+    Scenario('categories-detail', '/api/v1/categories/{slug}/', 'delete',
+             client='admin', setup=new_category),
+    Scenario('categories-bulk', '/api/v1/categories/bulk/', 'patch',
+             client='admin', data=lambda context: context['categories']),
+    Scenario('genres-list', '/api/v1/genres/'),
+    Scenario('genres-detail', '/api/v1/genres/{slug}/', 'delete',
+             client='admin', setup=new_genre),
+    Scenario('genres-bulk', '/api/v1/genres/bulk/', 'patch',
+             client='admin', data=lambda context: context['genres']),
+    Scenario('titles-list', '/api/v1/titles/'),
+    Scenario('titles-list', '/api/v1/titles/?search={search}&page=2',
+             label='search'),
+    Scenario('titles-detail', '/api/v1/titles/{title_id}/'),
+    Scenario('titles-ratings', '/api/v1/titles/ratings/?ids={title_ids}'),
+    Scenario('titles-bulk', '/api/v1/titles/bulk/', 'patch',
+             client='admin', data=lambda context: context['titles']),
+    Scenario('review-list', '/api/v1/titles/{title_id}/reviews/'),
+    Scenario('review-list',
+             '/api/v1/titles/{title_id}/reviews/?pagination=cursor',
+             label='cursor'),
+    Scenario('review-list', '/api/v1/titles/{title_id}/reviews/', 'post',
+             client='author', data={'text': 'Отзыв', 'score': 7},
+             setup=drop_own_review),
+    Scenario('review-detail',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/'),
+    Scenario('comment-list',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'),
+    Scenario('comment-list',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+             'post', client='author', data={'text': 'Комментарий'}),
+    Scenario('comment-detail',
+             '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+             '{comment_id}/'),
+    Scenario('export-titles', '/api/v1/export/titles/', client='admin'),
+    Scenario('export-reviews',
+             '/api/v1/export/reviews/?title={title_id}&format=csv',
+             client='admin'),
+    Scenario('export-comments', '/api/v1/export/comments/?title={title_id}',
+             client='admin'),
+    Scenario('users-list', '/api/v1/users/', client='admin'),
+    Scenario('users-detail', '/api/v1/users/{username}/', client='admin'),
+    Scenario('users-users-me', '/api/v1/users/me/', client='author'),
+]
+
+
+def api_routes():
+    """Имена маршрутов api/urls.py (для безымянных - шаблон пути)."""
+    from api.urls import urlpatterns
+
+    def walk(patterns):
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                yield from walk(pattern.url_patterns)
+            elif pattern.name:
+                yield pattern.name
+            else:
+                yield str(pattern.pattern).strip('/').replace('v1/', '')
+
+    return set(walk(urlpatterns))
+
+
+def build_dataset(reviews):
+    """
+    Данные генерирует команда generate_data с постоянным seed, поэтому
+    замеры разных запусков сравнимы между собой.
+    """
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    call_command(
+        'generate_data', reviews=reviews, seed=SEED, stdout=StringIO())
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = round(percent / 100 * (len(values) - 1))
+    return values[min(len(values) - 1, index)]
+
+
+@pytest.fixture(scope='module')
+def benchmark_context(django_db_setup, django_db_blocker):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from api.models import Category, Comment, Genre, Review, Title
+    from tests.fixtures.fixture_data import token_client
+
+    with django_db_blocker.unblock(), transaction.atomic():
+        build_dataset(REVIEWS)
+        user_model = get_user_model()
+        admin = user_model.objects.create_superuser(
+            username='bench-admin', email='bench-admin@yamdb.fake',
+            password='admin', confirmation_code='code')
+        # Самое популярное произведение и его отзыв с комментариями.
+        title = Title.objects.order_by('pk').first()
+        review = Review.objects.filter(
+            title=title, comments__isnull=False).distinct().first()
+        author = Review.objects.filter(title=title).exclude(
+            pk=review.pk).first().author
+        context = {
+            'counter': count(),
+            'credentials': {
+                'email': admin.email, 'confirmation_code': 'code'},
+            'author': author,
+            'title_id': title.id,
+            'review_id': review.id,
+            'comment_id': Comment.objects.filter(review=review).last().id,
+            'username': author.username,
+            'search': 'ветер',
+            'title_ids': ','.join(
+                str(pk) for pk in Title.objects.order_by('pk').values_list(
+                    'pk', flat=True)[:500]),
+            'titles': [
+                {'id': pk, 'name': name} for pk, name in
+                Title.objects.values_list('pk', 'name')[:100]],
+            'genres': [
+                {'slug': slug, 'name': name} for slug, name in
+                Genre.objects.values_list('slug', 'name')],
+            'categories': [
+                {'slug': slug, 'name': name} for slug, name in
+                Category.objects.values_list('slug', 'name')],
+        }
+        from rest_framework.test import APIClient
+
+        clients = {
+            'anonymous': APIClient(),
+            'admin': token_client(admin),
+            'author': token_client(author),
+        }
+        yield clients, context
+        transaction.set_rollback(True)
+
+
+def measure(scenario, clients, context):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(WARMUP):
+        scenario.prepare(context)
+        scenario.request(clients, context)
+    timings = []
+    for _ in range(REPEAT):
+        # Замеряется путь без кеша ответов.
+        cache.clear()
+        scenario.prepare(context)
+        # Сборка мусора не должна попадать в замер случайным образом.
+        gc.disable()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = scenario.request(clients, context)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            gc.enable()
+        assert response.status_code < 400, (
+            f'{scenario.key}: статус {response.status_code}'
+        )
+    return {
+        'p50': round(percentile(timings, 50), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'p99': round(percentile(timings, 99), 3),
+        'queries': len(queries),
+    }
+
+
+def compare(results, baseline):
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        value, limit = result[METRIC], base[METRIC] * (1 + THRESHOLD)
+        if value > limit and value - base[METRIC] > NOISE_MS:
+            regressions.append(
+                f'{key}: {METRIC} {value} мс, эталон {base[METRIC]} мс')
+        if result['queries'] > base['queries']:
+            regressions.append(
+                f'{key}: {result["queries"]} запросов, '
+                f'эталон {base["queries"]}')
+    return regressions
+
+
+class TestBenchmarkRoutes:
+
+    def test_unique_keys(self):
+        keys = [scenario.key for scenario in SCENARIOS]
+        assert len(keys) == len(set(keys))
+
+    def test_all_routes_covered(self):
+        covered = {scenario.route for scenario in SCENARIOS}
+        missing = api_routes() - covered
+        assert not missing, (
+            f'Добавьте в SCENARIOS замеры для маршрутов: {sorted(missing)}'
+        )
+
+
+@pytest.mark.skipif(
+    not os.getenv('YAMDB_BENCHMARK'),
+    reason='замеры включаются переменной YAMDB_BENCHMARK=1')
+class TestBenchmark:
+
+    def test_benchmark(self, benchmark_context):
+        clients, context = benchmark_context
+        results = {}
+        for scenario in SCENARIOS:
+            results[scenario.key] = measure(scenario, clients, context)
+
+        print(f'\nОтзывов: {REVIEWS}, запросов на маршрут: {REPEAT}')
+        print(f'{"маршрут":<40} {"p50":>8} {"p95":>8} {"p99":>8} {"SQL":>4}')
+        for key, result in results.items():
+            print(f'{key:<40} {result["p50"]:>8} {result["p95"]:>8} '
+                  f'{result["p99"]:>8} {result["queries"]:>4}')
+
+        report = {'reviews': REVIEWS, 'results': results}
+        if os.getenv('BENCHMARK_SAVE'):
+            with open(BASELINE_PATH, 'w', encoding='utf-8') as baseline:
+                json.dump(report, baseline, ensure_ascii=False, indent=2)
+            return
+        if not os.path.exists(BASELINE_PATH):
+            pytest.fail(
+                f'Нет эталона {BASELINE_PATH}: снимите его с BENCHMARK_SAVE=1')
+        with open(BASELINE_PATH, encoding='utf-8') as baseline:
+            baseline = json.load(baseline)
+        if baseline.get('reviews') != REVIEWS:
+            pytest.skip('Эталон снят на другом числе отзывов')
+        regressions = compare(results, baseline['results'])
+        assert not regressions, (
+            'Проверьте производительность маршрутов:\n'
+            + '\n'.join(regressions)
+        )
@@ -0,0 +1,149 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def titles(self, catalog, count, **extra):
+        return [
+            {
+                'name': f'Пакетное {i}',
+                'year': 2000 + i % 20,
+                'category': catalog['categories'][i % 3].slug,
+                'genre': [genre.slug for genre in catalog['genres'][:i % 5]],
+                **extra,
+            }
+            for i in range(count)
+        ]
+
+    def test_create_titles(self, admin_client, catalog):
+        from api.models import Title
+
+        data = self.titles(catalog, 50)
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что POST-запрос `/api/v1/titles/bulk/` '
+            'возвращает статус 201'
+        )
+        results = response.json()
+        assert [item['name'] for item in results] == [
+            item['name'] for item in data]
+        title = Title.objects.get(pk=results[7]['id'])
+        assert title.category.slug == data[7]['category']
+        assert sorted(title.genre.values_list('slug', flat=True)) == sorted(
+            data[7]['genre'])
+        assert results[7]['genre'] == data[7]['genre']
+
+    def test_slug_queries(self, admin_client, catalog,
+                          django_assert_num_queries):
+        from django.db import connection
+
+        if not connection.features.can_return_ids_from_bulk_insert:
+            pytest.skip('bulk_create не возвращает первичные ключи')
+        data = self.titles(catalog, 200)
+        # Жанры, категории, произведения, связи с жанрами, жанры для
+        # ответа и точка сохранения транзакции; версия данных
+        # увеличивается после фиксации.
+        with django_assert_num_queries(7):
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', data, format='json')
+        assert response.status_code == 201
+
+    def test_atomic(self, admin_client, catalog):
+        from api.models import Title
+
+        count = Title.objects.count()
+        data = self.titles(catalog, 3)
+        data[1]['category'] = 'nope'
+        data[2]['year'] = 'год'
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'category' in errors[1] and 'year' in errors[2], (
+            'Проверьте, что ошибки возвращаются для каждого элемента'
+        )
+        assert Title.objects.count() == count, (
+            'Проверьте, что при ошибке атомарная запись ничего не создаёт'
+        )
+
+    def test_partial(self, admin_client, catalog):
+        from api.models import Title
+
+        count = Title.objects.count()
+        data = self.titles(catalog, 3)
+        data[1]['genre'] = ['nope']
+        response = admin_client.post(
+            '/api/v1/titles/bulk/?atomic=false', data, format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [item['status'] for item in results] == [201, 400, 201]
+        assert 'genre' in results[1]['errors']
+        assert Title.objects.count() == count + 2
+
+    def test_update_titles(self, admin_client, catalog):
+        titles = catalog['titles'][:3]
+        genre = catalog['genres'][-1]
+        data = [
+            {'id': titles[0].id, 'name': 'Новое имя'},
+            {'id': titles[1].id, 'genre': [genre.slug]},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+        ]
+        response = admin_client.patch(
+            '/api/v1/titles/bulk/?atomic=false', data, format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [item['status'] for item in results] == [200, 200, 400]
+        titles[0].refresh_from_db()
+        assert titles[0].name == 'Новое имя'
+        assert titles[0].year == catalog['titles'][0].year
+        assert list(titles[1].genre.values_list('slug', flat=True)) == [
+            genre.slug]
+        assert results[1]['data']['genre'] == [genre.slug]
+
+    def test_genres_and_categories(self, admin_client, catalog):
+        from api.models import Category, Genre
+
+        existing = catalog['genres'][0]
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Первый', 'slug': 'first'},
+            {'name': 'Второй', 'slug': 'first'},
+            {'name': 'Третий', 'slug': existing.slug},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'slug' in errors[1] and 'slug' in errors[2], (
+            'Проверьте, что повторяющиеся и существующие слаги отклоняются'
+        )
+        response = admin_client.post('/api/v1/categories/bulk/', [
+            {'name': 'Первая', 'slug': 'first'},
+            {'name': 'Вторая', 'slug': 'second'},
+        ], format='json')
+        assert response.status_code == 201
+        assert Category.objects.filter(
+            slug__in=['first', 'second']).count() == 2
+        response = admin_client.patch('/api/v1/genres/bulk/', [
+            {'slug': existing.slug, 'name': 'Переименован'},
+        ], format='json')
+        assert response.status_code == 200
+        assert Genre.objects.get(pk=existing.pk).name == 'Переименован'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_invalidates_cache(self, admin_client, client, catalog):
+        title = catalog['titles'][0]
+        url = f'/api/v1/titles/{title.id}/'
+        client.get(url)
+        admin_client.patch(
+            '/api/v1/titles/bulk/', [{'id': title.id, 'name': 'Другое'}],
+            format='json')
+        assert client.get(url).json()['name'] == 'Другое'
+
+    def test_permissions(self, catalog):
+        from rest_framework.test import APIClient
+
+        response = APIClient().post(
+            '/api/v1/titles/bulk/', self.titles(catalog, 1), format='json')
+        assert response.status_code == 401
@@ -0,0 +1,62 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/categories/', '/api/v1/genres/', '/api/v1/titles/'
+    ])
+    def test_not_modified(self, client, catalog, url,
+                          django_assert_num_queries):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Проверьте, что `{url}` возвращает заголовок ETag'
+        )
+        assert response.has_header('Last-Modified'), (
+            f'Проверьте, что `{url}` возвращает заголовок Last-Modified'
+        )
+        with django_assert_num_queries(1):
+            cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == 304, (
+            f'Проверьте, что `{url}` с актуальным If-None-Match '
+            'возвращает 304 без запросов к каталогу'
+        )
+        cached = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert cached.status_code == 200, (
+            'Проверьте, что 304 зависит только от ETag: Last-Modified '
+            'не различает записи в пределах секунды'
+        )
+
+    def test_etag_depends_on_query(self, client, catalog):
+        first = client.get('/api/v1/titles/')
+        second = client.get('/api/v1/titles/', {'page': 2})
+        assert first['ETag'] != second['ETag']
+
+    # Версии данных увеличиваются после фиксации транзакции.
+    @pytest.mark.django_db(transaction=True)
+    def test_writes_change_etag(self, client, catalog, django_user_model):
+        from api.models import Review
+
+        title = catalog['titles'][1]
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+        Review.objects.create(
+            title=title,
+            author=catalog['users'][0],
+            text='Новый отзыв',
+            score=7
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag произведения'
+        )
+        assert response.json()['rating'] == 7
+
+        etag = response['ETag']
+        title.genre.clear()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение жанров меняет ETag произведения'
+        )
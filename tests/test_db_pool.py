@@ -0,0 +1,239 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connection
+from django.db.utils import ConnectionHandler
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    from api.db.pool import ConnectionPool
+
+    kwargs.setdefault('size', 2)
+    return ConnectionPool(
+        alive=lambda conn: not conn.closed,
+        ping=lambda conn: conn.healthy,
+        **kwargs)
+
+
+class TestConnectionPool:
+
+    def test_reuse(self):
+        pool = make_pool()
+        first = pool.get(FakeConnection)
+        pool.put(first)
+        assert pool.get(FakeConnection) is first, (
+            'Проверьте, что пул выдаёт вернувшееся соединение повторно'
+        )
+        stats = pool.stats()
+        assert stats['opened'] == 1
+        assert stats['in_use'] == 1
+        assert stats['checkouts'] == 2
+
+    def test_discard_broken(self):
+        pool = make_pool()
+        first = pool.get(FakeConnection)
+        pool.put(first)
+        first.closed = True
+        assert pool.get(FakeConnection) is not first, (
+            'Проверьте, что закрытое сервером соединение не выдаётся'
+        )
+        assert pool.stats()['discarded'] == 1
+        assert pool.stats()['opened'] == 1
+
+    def test_ping_after_interval(self):
+        pool = make_pool(check_interval=60)
+        first = pool.get(FakeConnection)
+        pool.put(first)
+        first.healthy = False
+        assert pool.get(FakeConnection) is first
+        assert pool.stats()['pings'] == 0, (
+            'Проверьте, что недавно использованное соединение '
+            'не проверяется запросом к серверу'
+        )
+        pool.check_interval = 0
+        pool.put(first)
+        assert pool.get(FakeConnection) is not first, (
+            'Проверьте, что долго простаивавшее соединение проверяется'
+        )
+        assert pool.stats()['pings'] == 1
+
+    def test_timeout(self):
+        pool = make_pool(size=1, timeout=0.05)
+        pool.get(FakeConnection)
+        with pytest.raises(RuntimeError):
+            pool.get(FakeConnection)
+        stats = pool.stats()
+        assert stats['timeouts'] == 1
+        assert stats['waits'] == 1
+        assert stats['wait_seconds'] >= 0.05
+
+    def test_wait(self):
+        pool = make_pool(size=1, timeout=5)
+        first = pool.get(FakeConnection)
+        timer = threading.Timer(0.05, pool.put, [first])
+        timer.start()
+        started = time.monotonic()
+        assert pool.get(FakeConnection) is first, (
+            'Проверьте, что ожидающий поток получает вернувшееся соединение'
+        )
+        assert time.monotonic() - started >= 0.04
+        timer.join()
+        assert pool.stats()['opened'] == 1
+
+    def test_connect_error(self):
+        pool = make_pool(size=1)
+
+        def fail():
+            raise ConnectionError
+
+        with pytest.raises(ConnectionError):
+            pool.get(fail)
+        assert pool.stats()['opened'] == 0, (
+            'Проверьте, что неудачное подключение освобождает место в пуле'
+        )
+
+
+def open_wrapper(alias, settings_dict):
+    """Отдельный DatabaseWrapper, как у нового потока."""
+    return ConnectionHandler({
+        'default': {'ENGINE': 'django.db.backends.dummy'},
+        alias: settings_dict,
+    })[alias]
+
+
+@pytest.fixture
+def pooled(tmp_path, django_db_blocker):
+    from api.db import pool
+
+    wrapper = open_wrapper('pooled', {
+        'ENGINE': 'api.db.sqlite3',
+        'NAME': str(tmp_path / 'pool.sqlite3'),
+        'POOL': {'SIZE': 2, 'TIMEOUT': 0.05, 'CHECK_INTERVAL': 0},
+    })
+    with django_db_blocker.unblock():
+        yield wrapper
+        wrapper.close()
+    pool.close_pool('pooled')
+
+
+class TestPooledBackend:
+
+    def test_reuse(self, pooled):
+        from api.db.pool import pool_stats
+
+        with pooled.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id integer)')
+        raw = pooled.connection
+        pooled.close()
+        assert pool_stats()['pooled']['idle'] == 1, (
+            'Проверьте, что закрытое соединение Django возвращается в пул'
+        )
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM item')
+        assert pooled.connection is raw
+        assert pool_stats()['pooled']['opened'] == 1
+
+    def test_server_disconnect(self, pooled):
+        pooled.ensure_connection()
+        raw = pooled.connection
+        pooled.close()
+        raw.close()
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pooled.connection is not raw, (
+            'Проверьте, что разорванное соединение заменяется новым'
+        )
+        assert pool_discarded() == 1
+
+    def test_exhausted(self, pooled):
+        other = open_wrapper('pooled', pooled.settings_dict)
+        third = open_wrapper('pooled', pooled.settings_dict)
+        pooled.ensure_connection()
+        other.ensure_connection()
+        with pytest.raises(OperationalError):
+            third.ensure_connection()
+        other.close()
+        third.ensure_connection()
+        third.close()
+
+
+def pool_discarded():
+    from api.db.pool import pool_stats
+
+    return pool_stats()['pooled']['discarded']
+
+
+@pytest.mark.django_db
+class TestPoolMetrics:
+
+    def test_metrics(self, admin, pooled):
+        from tests.fixtures.fixture_data import token_client
+
+        pooled.ensure_connection()
+        text = token_client(admin).get('/metrics/').content.decode()
+        assert 'yamdb_db_pool_in_use{db="pooled"} 1' in text, (
+            'Проверьте, что /metrics/ показывает использование пула'
+        )
+        assert 'yamdb_db_pool_wait_seconds_total{db="pooled"}' in text
+
+
+@pytest.fixture
+def pg_pooled(django_db_blocker):
+    from api.db import pool
+
+    settings_dict = dict(connection.settings_dict, ENGINE='api.db.postgresql')
+    settings_dict['POOL'] = {'SIZE': 1, 'CHECK_INTERVAL': 60}
+    pooled = open_wrapper('pg_pooled', settings_dict)
+    with django_db_blocker.unblock():
+        yield pooled
+        pooled.close()
+    pool.close_pool('pg_pooled')
+
+
+def terminate(pooled):
+    """Разорвать соединение пула со стороны сервера."""
+    pooled.ensure_connection()
+    raw = pooled.connection
+    pid = raw.get_backend_pid()
+    pooled.close()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+    return raw
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='нужен PostgreSQL')
+class TestPooledPostgres:
+
+    def test_ping(self, pg_pooled):
+        raw = terminate(pg_pooled)
+        pg_pooled.get_pool().check_interval = 0
+        with pg_pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pg_pooled.connection is not raw, (
+            'Проверьте, что разорванное сервером соединение '
+            'заменяется новым при проверке'
+        )
+
+    def test_broken_discarded(self, pg_pooled):
+        raw = terminate(pg_pooled)
+        with pytest.raises(OperationalError):
+            with pg_pooled.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        pg_pooled.close()
+        with pg_pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pg_pooled.connection is not raw, (
+            'Проверьте, что сломанное соединение не возвращается в пул'
+        )
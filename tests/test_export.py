@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tests.fixtures.fixture_data import token_client
+
+
+def export(client, resource, params=None):
+    response = client.get(f'/api/v1/export/{resource}/', params or {})
+    assert response.status_code == 200, (
+        f'Проверьте, что администратор получает выгрузку {resource}'
+    )
+    assert response.streaming, 'Проверьте, что выгрузка отдаётся потоком'
+    return response, b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_ndjson(self, admin_client, catalog):
+        response, content = export(admin_client, 'titles')
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert 'titles.ndjson' in response['Content-Disposition']
+        rows = [json.loads(line) for line in content.splitlines()]
+        assert [row['id'] for row in rows] == sorted(
+            title.id for title in catalog['titles']), (
+            'Проверьте, что выгружаются все произведения по возрастанию id'
+        )
+        title = catalog['titles'][0]
+        data = admin_client.get(f'/api/v1/titles/{title.id}/').json()
+        assert rows[0] == {
+            'id': title.id,
+            'name': data['name'],
+            'year': data['year'],
+            'description': data['description'],
+            'category': data['category']['slug'],
+            'genre': [genre['slug'] for genre in data['genre']],
+            'rating': data['rating'],
+            'reviews_count': 15,
+        }, 'Проверьте, что значения совпадают с ответами API'
+
+    def test_reviews_csv(self, admin_client, catalog):
+        response, content = export(admin_client, 'reviews', {'format': 'csv'})
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == 15
+        review = catalog['reviews'][0]
+        data = admin_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/').json()
+        assert rows[0] == {
+            'id': str(review.id), 'title': str(review.title_id),
+            'author': data['author'], 'text': data['text'],
+            'score': str(data['score']), 'pub_date': data['pub_date'],
+        }
+        admin_client.credentials(HTTP_ACCEPT='text/csv')
+        _, content = export(admin_client, 'titles')
+        genres = list(csv.DictReader(io.StringIO(content)))[2]['genre']
+        assert genres == 'genre-0,genre-1,genre-2', (
+            'Проверьте, что жанры в CSV записываются через запятую'
+        )
+
+    def test_filters(self, admin_client, catalog):
+        _, content = export(admin_client, 'titles', {'category': 'category-1'})
+        assert len(content.splitlines()) == 5
+        _, content = export(admin_client, 'reviews', {
+            'title': catalog['titles'][0].id, 'score': 4})
+        assert [json.loads(line)['text'] for line in content.splitlines()] == [
+            'Отзыв 4']
+        _, content = export(admin_client, 'comments', {'author': 'user2'})
+        assert [json.loads(line)['text'] for line in content.splitlines()] == [
+            'Комментарий 2'], 'Проверьте фильтрацию выгрузки'
+        response = admin_client.get(
+            '/api/v1/export/reviews/', {'score': 'x', 'format': 'csv'})
+        assert response.status_code == 400
+        assert response.content.decode().startswith('score\r\n')
+
+    def test_permissions(self, catalog):
+        assert APIClient().get('/api/v1/export/titles/').status_code == 401
+        response = token_client(catalog['users'][0]).get(
+            '/api/v1/export/comments/')
+        assert response.status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
+
+    def test_chunks(self, admin_client, catalog, settings):
+        settings.EXPORT_CHUNK_SIZE = 4
+        settings.JSON_STREAM_CHUNK_SIZE = 1000
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get('/api/v1/export/titles/')
+            chunks = list(response.streaming_content)
+        assert len(chunks) > 1
+        genre_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'api_title_genre' in query['sql']]
+        assert len(genre_queries) == 4, (
+            'Проверьте, что жанры загружаются одним запросом на пакет строк'
+        )
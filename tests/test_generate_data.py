@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+
+
+def generate(**kwargs):
+    from django.core.management import call_command
+
+    call_command('generate_data', stdout=StringIO(), **kwargs)
+
+
+def snapshot():
+    from api.models import Comment, Review, Title
+
+    return (
+        list(Title.objects.order_by('pk').values_list(
+            'name', 'year', 'category__slug', 'score_sum', 'reviews_count')),
+        list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author__username', 'score', 'pub_date')),
+        list(Comment.objects.order_by('pk').values_list(
+            'review_id', 'author__username', 'text')),
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_counts(self):
+        from api.models import Category, Comment, Genre, Review, Title, User
+
+        generate(reviews=400, titles=20, users=50, comments=300, seed=1)
+        assert Title.objects.count() == 20
+        assert User.objects.count() == 50
+        assert Category.objects.count() == 10
+        assert Genre.objects.count() == 30
+        assert Review.objects.count() == 400, (
+            'Проверьте, что команда создаёт заданное число отзывов'
+        )
+        assert Comment.objects.count() == 300
+        assert all(Title.objects.values_list('genre', flat=True))
+
+    def test_zipf(self):
+        from django.db.models import Count
+
+        from api.models import Title
+
+        generate(reviews=400, titles=20, users=100, seed=1)
+        counts = list(Title.objects.order_by('pk').annotate(
+            total=Count('reviews')).values_list('total', flat=True))
+        assert counts[0] > 5 * counts[-1], (
+            'Проверьте, что отзывы распределены по произведениям неравномерно'
+        )
+
+    @pytest.mark.parametrize('no_copy', [False, True])
+    def test_dates(self, no_copy):
+        from django.utils import timezone
+
+        from api.models import Review
+
+        generate(reviews=200, seed=1, no_copy=no_copy)
+        dates = Review.objects.values_list('pub_date', flat=True)
+        assert min(dates) < timezone.now() - timezone.timedelta(days=30), (
+            'Проверьте, что даты отзывов берутся из сгенерированных строк'
+        )
+        assert Review._meta.get_field('pub_date').auto_now_add, (
+            'Проверьте, что загрузка не меняет поля модели'
+        )
+
+    def test_seed(self):
+        from api.models import Category, Comment, Genre, Title, User
+
+        generate(reviews=200, seed=7)
+        first = snapshot()
+        for model in (Comment, Title, Genre, Category, User):
+            model.objects.all().delete()
+        generate(reviews=200, seed=7)
+        assert snapshot()[0] == first[0], (
+            'Проверьте, что с одинаковым seed данные совпадают'
+        )
+        assert [row[:3] for row in snapshot()[1]] == [
+            row[:3] for row in first[1]]
+        assert snapshot()[2] == first[2]
@@ -0,0 +1,103 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+FILES = {
+    'user': [
+        'id,username,email,role',
+        *(f'{i},user{i},user{i}@yamdb.fake,user' for i in range(1, 4)),
+    ],
+    'category': ['id,name,slug', '1,Фильмы,movie', '2,Книги,book'],
+    'genre': ['id,name,slug', '1,Драма,drama', '2,Комедия,comedy'],
+    'title': [
+        'id,name,year,category_id',
+        '1,Первое,1990,1', '2,Второе,2000,2', '3,Третье,2010,1',
+    ],
+    'review': [
+        'id,title_id,text,author_id,score,pub_date',
+        '1,1,Отзыв 1,1,10,2021-01-01T00:00:00Z',
+        '2,1,Отзыв 2,2,6,2021-01-02T00:00:00Z',
+        '3,2,Отзыв 3,1,7,2021-01-03T00:00:00Z',
+        '4,2,Отзыв 4,3,3,2021-01-04T00:00:00Z',
+        '5,3,Отзыв 5,2,9,2021-01-05T00:00:00Z',
+    ],
+    'comment': [
+        'id,review_id,text,author_id,pub_date',
+        *(f'{i},{i},Комментарий {i},3,2021-02-01T00:00:00Z'
+          for i in range(1, 5)),
+    ],
+    'title_genre': [
+        'id,title_id,genre_id', '1,1,1', '2,1,2', '3,2,2', '4,3,1',
+    ],
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, lines in FILES.items():
+        (tmp_path / f'{name}.csv').write_text(
+            '\n'.join(lines) + '\n', encoding='utf-8')
+    return str(tmp_path)
+
+
+def import_csv(data_dir, *args):
+    call_command(
+        'import_csv', '--data_dir', data_dir, '--batch-size', '2', *args,
+        stdout=io.StringIO())
+
+
+def assert_loaded():
+    from api.models import (Category, Comment, Genre, ImportProgress,
+                            Review, Title, User)
+
+    counts = [
+        model.objects.count()
+        for model in (User, Category, Genre, Title, Review, Comment,
+                      Title.genre.through)
+    ]
+    assert counts == [3, 2, 2, 3, 5, 4, 4], (
+        'Проверьте, что загружаются все строки файлов ровно один раз'
+    )
+    assert Title.objects.get(pk=1).rating == 8, (
+        'Проверьте, что после загрузки пересчитывается рейтинг'
+    )
+    assert not ImportProgress.objects.exists()
+
+
+@pytest.mark.django_db
+class TestImportCSV:
+
+    @pytest.mark.parametrize('args', [(), ('--no-copy',)])
+    def test_load(self, data_dir, args):
+        from api.models import User
+
+        import_csv(data_dir, *args)
+        assert_loaded()
+        assert User.objects.create(
+            username='new', email='new@yamdb.fake').pk == 4, (
+            'Проверьте, что последовательности первичных ключей сдвигаются'
+        )
+
+    def test_resume(self, data_dir, monkeypatch):
+        from api.models import ImportProgress, Review
+
+        save = ImportProgress.save
+
+        def crash(progress, *args, **kwargs):
+            # Сбой после записи второго пакета отзывов, до фиксации.
+            if progress.name == 'review' and progress.rows == 4:
+                raise RuntimeError('сбой')
+            save(progress, *args, **kwargs)
+
+        monkeypatch.setattr(ImportProgress, 'save', crash)
+        with pytest.raises(RuntimeError):
+            import_csv(data_dir)
+        assert Review.objects.count() == 2, (
+            'Проверьте, что пакет откатывается вместе с отметкой о нём'
+        )
+        assert ImportProgress.objects.get(name='review').rows == 2
+
+        monkeypatch.setattr(ImportProgress, 'save', save)
+        import_csv(data_dir, '--resume')
+        assert_loaded()
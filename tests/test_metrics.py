@@ -0,0 +1,73 @@
+import pytest
+from rest_framework.test import APIClient
+
+from tests.fixtures.fixture_data import token_client
+
+
+def parse_server_timing(header):
+    timings = {}
+    for part in header.split(', '):
+        name, *params = part.split(';')
+        timings[name] = dict(param.split('=', 1) for param in params)
+    return timings
+
+
+@pytest.fixture
+def registry():
+    from api.metrics import registry
+
+    registry.clear()
+    yield registry
+    registry.clear()
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_server_timing(self, catalog):
+        response = APIClient().get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' in response, (
+            'Проверьте, что ответ содержит заголовок Server-Timing'
+        )
+        timings = parse_server_timing(response['Server-Timing'])
+        assert set(timings) == {'db', 'serialize', 'render', 'total'}
+        assert timings['db']['desc'] == '"4 queries"', (
+            'Проверьте, что Server-Timing считает запросы к базе'
+        )
+        assert float(timings['serialize']['dur']) > 0
+        assert float(timings['render']['dur']) > 0
+        assert float(timings['total']['dur']) >= max(
+            float(timings[name]['dur'])
+            for name in ('db', 'serialize', 'render'))
+
+    def test_histograms(self, catalog, admin, registry):
+        client = APIClient()
+        title = catalog['titles'][0]
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.id}/reviews/')
+        response = token_client(admin).get('/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert (
+            'yamdb_request_seconds_count'
+            '{view="TitleViewSet.list",phase="total"} 2'
+        ) in text, 'Проверьте, что время запросов собирается по представлениям'
+        assert (
+            'yamdb_request_queries_count{view="ReviewViewSet.list"} 1'
+        ) in text
+        assert (
+            'yamdb_requests_total{view="TitleViewSet.list",status="200"} 2'
+        ) in text
+        assert 'yamdb_response_cache_total{cache="titles",result="hits"}' in (
+            text
+        )
+
+    def test_metrics_admin_only(self, catalog):
+        assert APIClient().get('/metrics/').status_code == 401
+        user = catalog['users'][0]
+        assert token_client(user).get('/metrics/').status_code == 403, (
+            'Проверьте, что метрики доступны только администратору'
+        )
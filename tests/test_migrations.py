@@ -0,0 +1,58 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+BEFORE = ('api', '0007_dataversion')
+AFTER = ('api', '0008_review_comment_indexes')
+
+
+def migrate(target):
+    executor = MigrationExecutor(connection)
+    executor.migrate([target])
+    executor.loader.build_graph()
+    return executor.loader.project_state([target]).apps
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMigrations:
+
+    def test_duplicate_reviews_merged(self):
+        apps = migrate(BEFORE)
+        try:
+            User = apps.get_model('api', 'User')
+            Title = apps.get_model('api', 'Title')
+            Review = apps.get_model('api', 'Review')
+            Comment = apps.get_model('api', 'Comment')
+            author = User.objects.create(username='a', email='a@yamdb.fake')
+            other = User.objects.create(username='b', email='b@yamdb.fake')
+            title = Title.objects.create(name='Произведение', year=2000)
+            old, new = [
+                Review.objects.create(
+                    title=title, author=author, text=f'Отзыв {score}',
+                    score=score)
+                for score in (2, 8)
+            ]
+            Review.objects.create(
+                title=title, author=other, text='Другой', score=5)
+            Comment.objects.create(review=old, author=other, text='К старому')
+            Title.objects.filter(pk=title.pk).update(
+                score_sum=15, reviews_count=3)
+
+            apps = migrate(AFTER)
+            Title = apps.get_model('api', 'Title')
+            Review = apps.get_model('api', 'Review')
+            Comment = apps.get_model('api', 'Comment')
+            assert list(Review.objects.filter(author=author.pk).values_list(
+                'pk', flat=True)) == [new.pk], (
+                'Проверьте, что из повторных отзывов остаётся самый новый'
+            )
+            assert Comment.objects.get().review_id == new.pk, (
+                'Проверьте, что комментарии переносятся на оставшийся отзыв'
+            )
+            title = Title.objects.get()
+            assert (title.score_sum, title.reviews_count) == (13, 2), (
+                'Проверьте, что рейтинг произведения пересчитывается'
+            )
+        finally:
+            call_command('migrate', verbosity=0)
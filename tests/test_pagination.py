@@ -0,0 +1,95 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def collect(self, client, url):
+        names, previous = [], None
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос `{url}` возвращает статус 200'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что выдача по курсору не считает объекты'
+            )
+            names += [review['text'] for review in data['results']]
+            previous, url = data['previous'], data['next']
+        return names, previous
+
+    def test_reviews_cursor(self, client, catalog):
+        title = catalog['titles'][0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        expected = [
+            review['text'] for review in client.get(url).json()['results']
+        ]
+        expected += [review['text'] for review in client.get(
+            url, {'page': 2}).json()['results']]
+
+        names, previous = self.collect(client, f'{url}?pagination=cursor')
+        assert names == expected, (
+            'Проверьте, что выдача по курсору идёт в порядке -pub_date, -id '
+            'без пропусков и повторов'
+        )
+        data = client.get(previous).json()
+        assert [review['text'] for review in data['results']] == (
+            expected[:10]
+        ), 'Проверьте, что ссылка previous возвращает предыдущую страницу'
+
+    def test_new_reviews_do_not_shift_pages(self, client, catalog,
+                                            django_user_model):
+        from api.models import Review
+
+        title = catalog['titles'][0]
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        first = client.get(url).json()
+        Review.objects.create(
+            title=title,
+            author=django_user_model.objects.create(
+                username='late', email='late@yamdb.fake'),
+            text='Новый отзыв',
+            score=5
+        )
+        second = client.get(first['next']).json()
+        seen = {review['id'] for review in first['results']}
+        assert not seen & {review['id'] for review in second['results']}, (
+            'Проверьте, что новые отзывы не сдвигают страницы курсора'
+        )
+
+    def test_invalid_cursor(self, client, catalog):
+        title = catalog['titles'][0]
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/', {'cursor': 'bad'})
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestPageSize:
+
+    def test_page_size(self, client, catalog, settings):
+        response = client.get('/api/v1/titles/', {'page_size': 12})
+        assert len(response.json()['results']) == 12, (
+            'Проверьте, что размер страницы задаётся параметром page_size'
+        )
+        settings.MAX_PAGE_SIZE = 4
+        response = client.get('/api/v1/titles/', {'page_size': 13})
+        assert len(response.json()['results']) == 4, (
+            'Проверьте, что размер страницы не больше MAX_PAGE_SIZE'
+        )
+        response = client.get('/api/v1/titles/', {'page_size': 'много'})
+        assert len(response.json()['results']) == 10, (
+            'Проверьте, что с неверным page_size используется PAGE_SIZE'
+        )
+
+    def test_cursor_page_size(self, client, catalog):
+        title = catalog['titles'][0]
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'pagination': 'cursor', 'page_size': 3})
+        data = response.json()
+        assert len(data['results']) == 3
+        assert 'page_size=3' in data['next'], (
+            'Проверьте, что ссылки курсора сохраняют размер страницы'
+        )
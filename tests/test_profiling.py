@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+from tests.fixtures.fixture_data import token_client
+
+
+@pytest.fixture
+def profiles_dir(settings, tmp_path):
+    settings.PROFILES_DIR = str(tmp_path / 'profiles')
+    settings.PROFILES_MAX_COUNT = 2
+    return tmp_path / 'profiles'
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path):
+    """Журнал медленных запросов во временном файле, порог 0 мс."""
+    from api.log_handlers import RotatingFileHandler
+
+    path = tmp_path / 'logs' / 'slow_queries.log'
+    settings.SLOW_QUERY_LOG = str(path)
+    settings.SLOW_QUERY_MS = 0
+    logger = logging.getLogger('api.slow_queries')
+    handlers = logger.handlers[:]
+    handler = RotatingFileHandler(path, encoding='utf-8', delay=True)
+    logger.handlers = [handler]
+    yield path
+    handler.close()
+    logger.handlers = handlers
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_profile_admin(self, catalog, admin, profiles_dir):
+        client = token_client(admin)
+        response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        name = response['X-Profile']
+        assert 'TitleViewSet.list' in name, (
+            'Проверьте, что имя профиля содержит представление'
+        )
+        assert (profiles_dir / name).exists()
+        profiles = client.get('/metrics/profiles/').json()
+        assert [profile['name'] for profile in profiles] == [name]
+        response = client.get(f'/metrics/profiles/{name}/')
+        assert response.status_code == 200
+        assert 'function calls' in response.content.decode(), (
+            'Проверьте, что профиль отдаётся отчётом pstats'
+        )
+        response = client.get(f'/metrics/profiles/{name}/?download=1')
+        assert response.status_code == 200
+        assert client.get(
+            '/metrics/profiles/missing.prof/').status_code == 404
+
+    def test_profile_not_admin(self, catalog, profiles_dir):
+        for client in (APIClient(), token_client(catalog['users'][0])):
+            response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+            assert response.status_code == 200
+            assert 'X-Profile' not in response, (
+                'Проверьте, что профилировать может только администратор'
+            )
+        assert not profiles_dir.exists()
+        assert token_client(catalog['users'][0]).get(
+            '/metrics/profiles/').status_code == 403
+
+    def test_profiles_bounded(self, admin, profiles_dir):
+        client = token_client(admin)
+        for _ in range(4):
+            client.get('/api/v1/categories/', HTTP_X_PROFILE='1')
+        assert len(list(profiles_dir.iterdir())) == 2, (
+            'Проверьте, что старые профили удаляются'
+        )
+
+    def test_slow_queries(self, catalog, admin, slow_query_log):
+        assert not slow_query_log.parent.exists()
+        APIClient().get('/api/v1/genres/')
+        assert slow_query_log.exists(), (
+            'Проверьте, что каталог журнала создаётся при первой записи'
+        )
+        entries = token_client(admin).get('/metrics/slow-queries/').json()
+        entries = [
+            entry for entry in entries if entry['view'] == 'GenreViewSet.list']
+        assert entries, 'Проверьте, что медленные запросы попадают в журнал'
+        assert 'api_genre' in entries[0]['sql']
+        assert token_client(catalog['users'][0]).get(
+            '/metrics/slow-queries/').status_code == 403
@@ -0,0 +1,100 @@
+import pytest
+
+from tests.fixtures.fixture_data import token_client
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+    """
+    Количество запросов к базе на страницу не зависит от числа объектов
+    на ней: связанные объекты загружаются select_related/prefetch_related.
+    """
+
+    def assert_budget(self, client, url, budget, django_assert_num_queries):
+        for page in (1, 2):
+            with django_assert_num_queries(budget):
+                response = client.get(url, {'page': page})
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос `{url}` возвращает статус 200'
+            )
+            assert response.json()['results'], (
+                f'Проверьте, что на странице {page} `{url}` есть объекты'
+            )
+
+    def test_titles_list(self, client, catalog, django_assert_num_queries):
+        # Версии данных, COUNT, произведения с категориями, жанры.
+        self.assert_budget(
+            client, '/api/v1/titles/', 4, django_assert_num_queries)
+
+    def test_title_detail(self, client, catalog, django_assert_num_queries):
+        title = catalog['titles'][-1]
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == title.genre.count()
+
+    def test_reviews_list(self, client, catalog, django_assert_num_queries):
+        # Произведение, COUNT, отзывы с авторами.
+        title = catalog['titles'][0]
+        self.assert_budget(
+            client, f'/api/v1/titles/{title.id}/reviews/', 3,
+            django_assert_num_queries
+        )
+
+    def test_review_detail(self, client, catalog, django_assert_num_queries):
+        review = catalog['reviews'][0]
+        with django_assert_num_queries(1):
+            response = client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}/')
+        assert response.status_code == 200
+        assert response.json()['author'] == review.author.username
+
+    def test_comments_list(self, client, catalog, django_assert_num_queries):
+        # Отзыв, COUNT, комментарии с авторами.
+        review = catalog['reviews'][0]
+        self.assert_budget(
+            client,
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/',
+            3,
+            django_assert_num_queries
+        )
+
+    def test_users_list(self, admin_client, catalog,
+                        django_assert_num_queries):
+        self.assert_budget(
+            admin_client, '/api/v1/users/', 2, django_assert_num_queries)
+
+    def test_review_create(self, catalog, django_assert_num_queries):
+        title = catalog['titles'][1]
+        client = token_client(catalog['users'][0])
+        # Время отзыва токенов (затем берётся из кеша), произведение,
+        # проверка повторного отзыва, вставка, рейтинг, автор для ответа
+        # и точки сохранения транзакции; версия данных увеличивается
+        # после фиксации.
+        with django_assert_num_queries(8):
+            response = client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'Отзыв', 'score': 7}
+            )
+        assert response.status_code == 201
+
+    def test_comment_create(self, catalog, django_assert_num_queries):
+        review = catalog['reviews'][0]
+        client = token_client(catalog['users'][0])
+        # Время отзыва токенов, отзыв, вставка, автор для ответа.
+        with django_assert_num_queries(4):
+            response = client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+                'comments/',
+                {'text': 'Комментарий'}
+            )
+        assert response.status_code == 201
+
+    def test_comment_wrong_title(self, client, catalog):
+        review = catalog['reviews'][0]
+        other = catalog['titles'][1]
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что комментарии ищутся только у отзывов '
+            'произведения из адреса'
+        )
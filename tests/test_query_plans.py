@@ -0,0 +1,165 @@
+import re
+
+import pytest
+
+
+def explain(queryset):
+    """
+    План запроса. На PostgreSQL в тестовой базе слишком мало строк,
+    поэтому последовательное чтение и сортировка отключаются: так план
+    показывает, может ли индекс дать и отбор, и порядок строк.
+    """
+    from django.db import connection
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    """Частые запросы к отзывам и комментариям идут по индексам."""
+
+    def assert_index(self, queryset, *indexes):
+        plan = explain(queryset)
+        assert any(index in plan for index in indexes), (
+            f'Проверьте, что запрос использует индекс {indexes[0]}:\n{plan}'
+        )
+
+    def assert_no_scan(self, queryset):
+        # Какой из индексов выбрать на маленьких таблицах, планировщик
+        # решает по статистике, важно лишь, что полного чтения нет.
+        plan = explain(queryset)
+        assert 'Seq Scan' not in plan and not re.search(r'\bSCAN\b', plan), (
+            f'Проверьте, что все таблицы запроса читаются по индексам:\n{plan}'
+        )
+
+    def test_reviews_list(self, catalog):
+        from api.views import ReviewViewSet
+
+        view = ReviewViewSet(kwargs={'title_id': catalog['titles'][0].id})
+        self.assert_index(
+            view.get_queryset().order_by('-pub_date', '-id')[:10],
+            'review_title_pub_date_idx'
+        )
+
+    def test_reviews_cursor(self, catalog):
+        from django.db.models import Q
+
+        from api.views import ReviewViewSet
+
+        review = catalog['reviews'][5]
+        view = ReviewViewSet(kwargs={'title_id': review.title_id})
+        queryset = view.get_queryset().filter(
+            Q(pub_date__lt=review.pub_date)
+            | Q(pub_date=review.pub_date, id__lt=review.id)
+        ).order_by('-pub_date', '-id')[:11]
+        self.assert_index(queryset, 'review_title_pub_date_idx')
+
+    def test_review_author_unique(self, catalog):
+        from api.models import Review
+
+        review = catalog['reviews'][0]
+        self.assert_index(
+            Review.objects.filter(
+                title=review.title_id, author_id=review.author_id
+            ).order_by()[:1],
+            'unique_review_author',
+            # SQLite называет индекс ограничения UNIQUE сам.
+            'sqlite_autoindex_api_review'
+        )
+
+    def test_comments_list(self, catalog):
+        from api.views import CommentViewSet
+
+        review = catalog['reviews'][0]
+        view = CommentViewSet(
+            kwargs={'title_id': review.title_id, 'review_id': review.id})
+        self.assert_index(
+            view.get_queryset().order_by('-pub_date', '-id')[:10],
+            'comment_review_pub_date_idx'
+        )
+
+    def filter_titles(self, params):
+        from api.filters import TitleFilter
+        from api.models import Title
+
+        filterset = TitleFilter(params, Title.objects.order_by())
+        assert filterset.is_valid(), filterset.errors
+        return filterset.qs
+
+    def test_titles_genre_filter(self, catalog):
+        for params in ({'genre': 'genre-1'},
+                       {'genre__in': 'genre-1,genre-2', 'genre_match': 'all'}):
+            queryset = self.filter_titles(params)
+            assert 'JOIN' not in str(queryset.query), (
+                'Проверьте, что фильтр по жанрам не соединяет таблицы '
+                'в основном запросе'
+            )
+            self.assert_index(
+                queryset, 'api_title_genre_genre_id',
+                'api_title_genre_title_id_genre_id')
+            self.assert_no_scan(queryset)
+
+    def test_titles_category_filter(self, catalog):
+        queryset = self.filter_titles({'category__in': 'category-1,category-2'})
+        self.assert_index(queryset, 'api_title_category_id')
+        self.assert_no_scan(queryset)
+
+    def test_titles_year_filter(self, catalog):
+        self.assert_index(
+            self.filter_titles({'year__gte': 1995, 'year__lte': 1999}),
+            'api_title_year')
+
+    def assert_no_sort(self, queryset, index):
+        self.assert_index(queryset, index)
+        plan = explain(queryset)
+        assert 'Sort' not in plan and 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что порядок строк берётся из индекса {index}:\n{plan}'
+        )
+
+    def order_titles(self, queryset, *ordering):
+        from api.filters import TitleOrderingFilter
+
+        return queryset.order_by(*TitleOrderingFilter().order_expressions(
+            queryset.model, ordering))[:10]
+
+    def test_titles_ordering(self, catalog):
+        from api.models import Title
+
+        titles = Title.objects.all()
+        for ordering, index in (('-rating', 'title_rating_desc_idx'),
+                                ('rating', 'title_rating_asc_idx'),
+                                ('-reviews_count', 'title_reviews_count_idx'),
+                                ('reviews_count', 'title_reviews_count_idx')):
+            self.assert_no_sort(self.order_titles(titles, ordering), index)
+        self.assert_no_sort(titles[:10], 'title_name_year_idx')
+
+    def test_top_rated_in_genre(self, catalog):
+        """Лучшие произведения жанра начиная с года - обход одного индекса."""
+        from django.db import connection
+
+        queryset = self.order_titles(
+            self.filter_titles({'genre': 'genre-1', 'year__gte': 1995}),
+            '-rating')
+        self.assert_no_scan(queryset)
+        # SQLite без статистики начинает с подзапроса по жанру и
+        # сортирует отобранное, что на маленьких таблицах тоже верно.
+        if connection.vendor == 'postgresql':
+            self.assert_no_sort(queryset, 'title_rating_desc_idx')
+
+    def test_unique_review_author(self, catalog):
+        from django.db import IntegrityError, transaction
+
+        from api.models import Review
+
+        review = catalog['reviews'][0]
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Review.objects.create(
+                title_id=review.title_id,
+                author_id=review.author_id,
+                text='Другой текст',
+                score=5
+            )
@@ -0,0 +1,130 @@
+import datetime
+import decimal
+import json
+import uuid
+from io import BytesIO
+
+import pytest
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+SAMPLES = [
+    None,
+    [],
+    {'count': 2, 'next': None, 'results': [{'name': 'Мастер и Маргарита',
+                                           'rating': 7.2, 'genre': []}]},
+    {'detail': ErrorDetail('Учетные данные не были предоставлены.',
+                           code='not_authenticated')},
+    {'date': datetime.datetime(
+        2021, 5, 1, 12, 30, 1, 123456, tzinfo=datetime.timezone.utc),
+     'day': datetime.date(2021, 5, 1), 'uuid': uuid.UUID(int=7),
+     'price': decimal.Decimal('1.10')},
+    {'floats': [0.0, -1.5, 1 / 3, 1e16, 1e-5, 1e-7, 2.5e300]},
+    {'text': 'строка с разделителями "кавычки" \\ \n\t\x01'},
+    {1: 'ключ не строка', 'big': 2 ** 70},
+]
+
+
+def fast_renderer(monkeypatch, with_orjson):
+    from api import renderers
+
+    if not with_orjson:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    return renderers.FastJSONRenderer()
+
+
+@pytest.mark.parametrize('with_orjson', [True, False])
+class TestFastJSONRenderer:
+
+    @pytest.mark.parametrize('data', SAMPLES)
+    def test_identical(self, monkeypatch, with_orjson, data):
+        renderer = fast_renderer(monkeypatch, with_orjson)
+        assert renderer.render(data) == JSONRenderer().render(data), (
+            'Проверьте, что FastJSONRenderer рендерит так же, '
+            'как JSONRenderer'
+        )
+        indent = 'application/json; indent=4'
+        assert renderer.render(data, indent) == JSONRenderer().render(
+            data, indent)
+
+    def test_chunks(self, monkeypatch, settings, with_orjson):
+        settings.JSON_STREAM_MIN_ITEMS = 3
+        settings.JSON_STREAM_CHUNK_SIZE = 100
+        renderer = fast_renderer(monkeypatch, with_orjson)
+        renderer.stream_batch_size = 7
+        items = [{'id': i, 'name': f'Произведение {i}', 'rating': None}
+                 for i in range(50)]
+        for data in (items, {'count': 50, 'next': None, 'results': items}):
+            chunks = list(renderer.render_chunks(data))
+            assert len(chunks) > 2, 'Проверьте, что список отдаётся кусками'
+            assert b''.join(chunks) == JSONRenderer().render(data)
+        assert renderer.stream_items(items[:2]) is None
+        assert renderer.stream_items(
+            items, 'application/json; indent=2') is None
+
+
+class TestFastJSONParser:
+
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body), parser_context={})
+
+    @pytest.mark.parametrize('with_orjson', [True, False])
+    def test_parse(self, monkeypatch, with_orjson):
+        from api import parsers
+
+        if not with_orjson:
+            monkeypatch.setattr(parsers, 'orjson', None)
+        body = '{"name": "Отзыв", "score": 7, "genre": ["a"]}'.encode()
+        assert self.parse(parsers.FastJSONParser(), body) == self.parse(
+            JSONParser(), body)
+        for invalid in (b'{"name": ', b'[NaN]', b''):
+            with pytest.raises(ParseError) as fast:
+                self.parse(parsers.FastJSONParser(), invalid)
+            with pytest.raises(ParseError) as default:
+                self.parse(JSONParser(), invalid)
+            assert fast.value.detail == default.value.detail, (
+                'Проверьте, что ошибки разбора совпадают с JSONParser'
+            )
+
+
+@pytest.mark.django_db
+class TestStreamingResponses:
+
+    def test_stream_titles(self, client, catalog, settings):
+        expected = client.get('/api/v1/titles/', {'page': 2})
+        assert not expected.streaming
+        settings.JSON_STREAM_MIN_ITEMS = 2
+        response = client.get('/api/v1/titles/', {'page': 2})
+        assert response.streaming, (
+            'Проверьте, что большие списки отдаются StreamingHttpResponse'
+        )
+        assert response['Content-Type'] == 'application/json'
+        assert response['ETag'] == expected['ETag']
+        assert b''.join(response.streaming_content) == expected.content
+
+    def test_stream_page_size(self, client, settings):
+        from api.models import Category
+
+        Category.objects.bulk_create([
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(settings.JSON_STREAM_MIN_ITEMS)
+        ])
+        response = client.get(
+            '/api/v1/categories/',
+            {'page_size': settings.JSON_STREAM_MIN_ITEMS})
+        assert isinstance(response, StreamingHttpResponse), (
+            'Проверьте, что список с page_size от JSON_STREAM_MIN_ITEMS '
+            'отдаётся StreamingHttpResponse'
+        )
+        data = json.loads(b''.join(response.streaming_content))
+        assert len(data['results']) == settings.JSON_STREAM_MIN_ITEMS
+
+    def test_error_message(self, client):
+        response = client.get('/api/v1/titles/', {'fields': 'нет'})
+        assert response.status_code == 400
+        assert response.content == JSONRenderer().render(response.data)
+        assert 'Неизвестные поля: нет' in response.content.decode(), (
+            'Проверьте, что кириллица в ошибках не экранируется'
+        )
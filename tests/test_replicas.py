@@ -0,0 +1,180 @@
+import pytest
+from django.db import connections
+from rest_framework.test import APIClient
+
+from tests.fixtures.fixture_data import token_client
+
+REPLICA = 'replica_test'
+
+
+@pytest.fixture(scope='module')
+def replica_path(tmp_path_factory, django_db_blocker):
+    """Отдельная база SQLite со схемой проекта и своими данными."""
+    from django.core.management import call_command
+
+    from api.models import Category
+
+    path = str(tmp_path_factory.mktemp('replica') / 'replica.sqlite3')
+    with django_db_blocker.unblock():
+        with replica_alias(path):
+            call_command('migrate', database=REPLICA, verbosity=0)
+            # bulk_create не вызывает сигналы, которые пишут в основную базу.
+            Category.objects.using(REPLICA).bulk_create([
+                Category(name='С реплики', slug='replica-only')])
+    return path
+
+
+class replica_alias:
+    """Подключение реплики к connections на время блока."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': self.path}
+        return REPLICA
+
+    def __exit__(self, *exc_info):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+
+
+@pytest.fixture
+def replica(replica_path, settings):
+    from api import routers
+
+    settings.DATABASE_REPLICAS = [REPLICA]
+    with replica_alias(replica_path):
+        yield REPLICA
+    routers._down_until.clear()
+
+
+def category_slugs(client):
+    response = client.get('/api/v1/categories/')
+    assert response.status_code == 200
+    return {category['slug'] for category in response.json()['results']}
+
+
+@pytest.mark.django_db
+class TestReplicaRouting:
+
+    def test_read_from_replica(self, replica):
+        from api.models import Category
+
+        Category.objects.create(name='С основной базы', slug='primary')
+        assert category_slugs(APIClient()) == {'replica-only'}, (
+            'Проверьте, что чтение каталога идёт с реплики'
+        )
+        assert Category.objects.filter(slug='primary').exists(), (
+            'Проверьте, что вне запросов чтение идёт с основной базы'
+        )
+
+    def test_other_paths(self, replica, admin):
+        response = token_client(admin).get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что пользователи читаются с основной базы'
+        )
+
+    def test_read_your_writes(self, replica, admin):
+        from api.models import Category
+
+        client = token_client(admin)
+        response = client.post(
+            '/api/v1/categories/', {'name': 'Новая', 'slug': 'new'})
+        assert response.status_code == 201
+        assert Category.objects.filter(slug='new').exists()
+        assert not Category.objects.using(replica).filter(
+            slug='new').exists(), 'Проверьте, что запись идёт в основную базу'
+        assert 'new' in category_slugs(client), (
+            'Проверьте, что после записи пользователь читает '
+            'с основной базы'
+        )
+        assert category_slugs(APIClient()) == {'replica-only'}, (
+            'Проверьте, что остальные пользователи читают с реплики'
+        )
+
+    def test_pin_cookie(self, replica, admin, settings):
+        from django.core.cache import cache
+
+        from api.routers import PIN_COOKIE
+
+        client = token_client(admin)
+        response = client.post(
+            '/api/v1/categories/', {'name': 'Новая', 'slug': 'new'})
+        assert PIN_COOKIE in response.cookies, (
+            'Проверьте, что после записи клиент получает cookie отметки'
+        )
+        # Другой воркер: кеш процесса отметку не знает.
+        cache.clear()
+        assert 'new' in category_slugs(client), (
+            'Проверьте, что отметка о записи не зависит от кеша процесса'
+        )
+        settings.REPLICA_STICKY_SECONDS = 0
+        assert category_slugs(client) == {'replica-only'}, (
+            'Проверьте, что устаревшая отметка не действует'
+        )
+        forged = APIClient()
+        forged.cookies[PIN_COOKIE] = '1'
+        assert category_slugs(forged) == {'replica-only'}, (
+            'Проверьте, что cookie без подписи не действует'
+        )
+
+    def test_pin_without_cookie(self, replica, admin):
+        from django.core.cache import cache
+
+        client = token_client(admin)
+        response = client.post(
+            '/api/v1/categories/', {'name': 'Новая', 'slug': 'new'})
+        assert response.status_code == 201
+        # API-клиент без поддержки cookie.
+        client.cookies.clear()
+        assert 'new' in category_slugs(client), (
+            'Проверьте, что отметка о записи хранится по пользователю '
+            'в кеше, а не только в cookie'
+        )
+        cache.clear()
+        assert category_slugs(client) == {'replica-only'}
+
+    def test_primary_models(self, replica, admin):
+        from django.core.cache import cache
+
+        from api.models import Category, DataVersion, User
+        from api.routers import ReplicaRouter, Route, current_route
+
+        router = ReplicaRouter()
+        token = current_route.set(Route())
+        try:
+            assert router.db_for_read(Category) == replica
+            assert router.db_for_read(User) == 'default'
+            assert router.db_for_read(DataVersion) == 'default', (
+                'Проверьте, что версии данных читаются с основной базы'
+            )
+        finally:
+            current_route.reset(token)
+        # На реплике нет строки пользователя: время отзыва токенов
+        # читается с основной базы.
+        cache.clear()
+        response = token_client(admin).get('/api/v1/categories/')
+        assert response.status_code == 200, (
+            'Проверьте, что аутентификация читает пользователя '
+            'с основной базы'
+        )
+
+    def test_unhealthy_replica(self, replica, tmp_path, settings):
+        from api import routers
+        from api.models import Category
+
+        Category.objects.create(name='С основной базы', slug='primary')
+        connections[replica].settings_dict['NAME'] = str(
+            tmp_path / 'missing' / 'replica.sqlite3')
+        assert category_slugs(APIClient()) == {'primary'}, (
+            'Проверьте, что при недоступной реплике чтение идёт '
+            'с основной базы'
+        )
+        assert replica in routers._down_until
+        assert not routers.is_healthy(replica), (
+            'Проверьте, что недоступная реплика какое-то время '
+            'не используется'
+        )
@@ -0,0 +1,53 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self, catalog):
+        from api.models import Title
+
+        category = catalog['categories'][0]
+        return [
+            Title.objects.create(
+                name='Война и мир', year=1869, category=category,
+                description='Роман-эпопея о войне 1812 года'),
+            Title.objects.create(
+                name='Мир приключений', year=1950, category=category,
+                description='Сборник'),
+            Title.objects.create(
+                name='Чапаев', year=1934, category=category,
+                description='Фильм о гражданской войне'),
+        ]
+
+    def names(self, client, params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.parametrize('param', ['search', 'name'])
+    def test_search_name_and_description(self, client, titles, param):
+        assert set(self.names(client, {param: 'войн'})) == {
+            'Война и мир', 'Чапаев'
+        }, (
+            f'Проверьте, что параметр `{param}` ищет по названию и описанию'
+        )
+        assert set(self.names(client, {param: 'мир приключ'})) == {
+            'Война и мир', 'Мир приключений'
+        }, f'Проверьте, что слова в параметре `{param}` объединяются по ИЛИ'
+
+    def test_search_is_ranked(self, client, titles):
+        assert self.names(client, {'search': 'мир приключений'})[0] == (
+            'Мир приключений'
+        ), 'Проверьте, что результаты поиска упорядочены по релевантности'
+
+    def test_index_follows_title_writes(self, client, titles):
+        war_and_peace, _, chapaev = titles
+        chapaev.description = 'Фильм'
+        chapaev.save()
+        war_and_peace.delete()
+        assert self.names(client, {'search': 'войн'}) == [], (
+            'Проверьте, что поисковый индекс обновляется при записи '
+            'произведений'
+        )
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get(client, url, params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос `{url}` с {params} возвращает статус 200'
+    )
+    data = response.json()
+    return data.get('results', data), [
+        query['sql'] for query in queries.captured_queries]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields(self, client, catalog):
+        results, queries = get(
+            client, '/api/v1/titles/', {'fields': 'id,name,rating'})
+        assert set(results[0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что ?fields= оставляет в ответе только эти поля'
+        )
+        assert len(queries) == 3, (
+            'Проверьте, что без genre жанры не загружаются'
+        )
+        titles = queries[-1]
+        assert '"rating"' in titles
+        assert 'description' not in titles and 'api_category' not in titles, (
+            'Проверьте, что ненужные столбцы и связи не загружаются'
+        )
+        results, queries = get(client, '/api/v1/titles/', {'fields': 'name'})
+        assert '"rating"' not in queries[-1], (
+            'Проверьте, что без rating не загружаются данные рейтинга'
+        )
+
+    def test_titles_expand(self, client, catalog):
+        title = catalog['titles'][1]
+        url = f'/api/v1/titles/{title.id}/'
+        data, _ = get(client, url, {'expand': 'category'})
+        assert data['genre'] == ['genre-0', 'genre-1'], (
+            'Проверьте, что связи без expand выводятся слагами'
+        )
+        assert data['category'] == {
+            'name': title.category.name, 'slug': title.category.slug}
+        full, _ = get(client, url, {})
+        assert full['genre'][0] == {'name': 'Жанр 0', 'slug': 'genre-0'}, (
+            'Проверьте, что без параметров ответ не изменился'
+        )
+        data, queries = get(
+            client, url, {'fields': 'genre', 'expand': 'genre'})
+        assert data == {'genre': full['genre']}
+        assert not any('api_category' in query for query in queries)
+
+    def test_reviews(self, client, catalog):
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        results, queries = get(client, url, {'fields': 'id,score'})
+        assert set(results[0]) == {'id', 'score'}
+        assert 'api_user' not in queries[-1], (
+            'Проверьте, что без author авторы не загружаются'
+        )
+        results, _ = get(client, url, {'expand': 'author'})
+        assert set(results[0]['author']) == {
+            'username', 'first_name', 'last_name', 'bio'}, (
+            'Проверьте, что ?expand=author выводит автора объектом'
+        )
+
+    def test_comments(self, client, catalog):
+        review = catalog['reviews'][0]
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+               'comments/')
+        results, queries = get(client, url, {'fields': 'text'})
+        assert set(results[0]) == {'text'}
+        assert len(queries) == 3 and 'api_user' not in queries[-1]
+
+    def test_unknown(self, client, catalog):
+        for params in ({'fields': 'id,secret'}, {'expand': 'rating'}):
+            response = client.get('/api/v1/titles/', params)
+            assert response.status_code == 400, (
+                'Проверьте, что неизвестные поля в ?fields= и ?expand= '
+                'возвращают ошибку 400'
+            )
@@ -0,0 +1,86 @@
+import pytest
+
+
+def title_names(client, params):
+    """Названия со всех страниц выдачи."""
+    names, page = [], 1
+    while page:
+        response = client.get('/api/v1/titles/', {**params, 'page': page})
+        assert response.status_code == 200, (
+            f'Проверьте, что фильтр {params} возвращает статус 200'
+        )
+        data = response.json()
+        names += [title['name'] for title in data['results']]
+        page = data['next'] and page + 1
+    assert len(names) == len(set(names)) == data['count'], (
+        'Проверьте, что произведения в выдаче не повторяются'
+    )
+    return sorted(names)
+
+
+def expected(indexes):
+    return sorted(f'Произведение {i}' for i in indexes)
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+    """У произведения i жанры genre-0..genre-(i % 5), категория i % 3."""
+
+    def test_genre(self, client, catalog):
+        assert title_names(client, {'genre': 'genre-4'}) == expected(
+            [4, 9, 14]), 'Проверьте фильтр по слагу жанра'
+        assert title_names(client, {'genre': 'genre'}) == [], (
+            'Проверьте, что слаг жанра сравнивается точно'
+        )
+        assert title_names(client, {'genre': 'genre-1'}) == expected(
+            i for i in range(15) if i % 5 >= 1)
+
+    def test_genre_in(self, client, catalog):
+        assert title_names(
+            client, {'genre__in': 'genre-3,genre-4'}
+        ) == expected(i for i in range(15) if i % 5 >= 3), (
+            'Проверьте, что genre__in находит произведения хотя бы '
+            'с одним жанром'
+        )
+        assert title_names(client, {
+            'genre__in': 'genre-0,genre-4', 'genre_match': 'all',
+        }) == expected([4, 9, 14]), (
+            'Проверьте, что genre_match=all оставляет произведения '
+            'со всеми жанрами'
+        )
+        assert title_names(client, {
+            'genre__in': 'genre-4,missing', 'genre_match': 'all'}) == []
+        response = client.get(
+            '/api/v1/titles/', {'genre__in': 'genre-0', 'genre_match': 'x'})
+        assert response.status_code == 400
+
+    def test_category(self, client, catalog):
+        assert title_names(client, {'category': 'category-1'}) == expected(
+            range(1, 15, 3))
+        assert title_names(client, {'category': 'category'}) == []
+        assert title_names(
+            client, {'category__in': 'category-0,category-2'}
+        ) == expected(i for i in range(15) if i % 3 != 1)
+
+    def test_year(self, client, catalog):
+        assert title_names(client, {'year': 1992}) == expected([2])
+        assert title_names(
+            client, {'year__gte': 1995, 'year__lte': 1999}
+        ) == expected(range(5, 10)), 'Проверьте фильтр по диапазону лет'
+
+    def test_rating(self, client, catalog):
+        # Оценки отзывов произведения 0: i % 11 для i < 15, рейтинг 61/15.
+        assert title_names(client, {'rating__gte': 4}) == expected([0])
+        assert title_names(client, {'rating__gte': 4.1}) == []
+        assert title_names(
+            client, {'rating__gte': 4, 'rating__lte': 61 / 15}
+        ) == expected([0]), 'Проверьте фильтр по диапазону рейтинга'
+        assert title_names(client, {'rating__lte': 10}) == expected([0]), (
+            'Проверьте, что произведения без оценок не попадают в диапазон'
+        )
+
+    def test_combined(self, client, catalog):
+        assert title_names(client, {
+            'genre__in': 'genre-2,genre-3', 'category': 'category-2',
+            'year__gte': 1995,
+        }) == expected([8, 14])
@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def rated(catalog):
+    """Оценки произведений 1-4 (у произведения 0 рейтинг 61/15)."""
+    from api.models import Review
+
+    titles, users = catalog['titles'], catalog['users']
+    scores = {1: [9], 2: [5, 7], 3: [6], 4: [9, 9]}
+    for index, values in scores.items():
+        for user, score in zip(users, values):
+            Review.objects.create(
+                title=titles[index], author=user, text='Отзыв', score=score)
+    return titles
+
+
+def title_ids(client, params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200, (
+        f'Проверьте, что запрос с {params} возвращает статус 200'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    def test_rating(self, client, rated):
+        ids = [title.id for title in rated]
+        assert title_ids(client, {'ordering': '-rating'})[:5] == [
+            ids[4], ids[1], ids[3], ids[2], ids[0]], (
+            'Проверьте сортировку по убыванию рейтинга; при равном '
+            'рейтинге - по убыванию id'
+        )
+        assert title_ids(client, {'ordering': 'rating'})[:6] == [
+            ids[0], ids[2], ids[3], ids[1], ids[4], ids[5]], (
+            'Проверьте, что произведения без оценок идут в конце'
+        )
+
+    def test_reviews_count_year_name(self, client, rated):
+        ids = [title.id for title in rated]
+        assert title_ids(client, {'ordering': '-reviews_count'})[:4] == [
+            ids[0], ids[4], ids[2], ids[3]]
+        assert title_ids(client, {'ordering': '-year'}) == ids[::-1][:10]
+        assert title_ids(client, {'ordering': 'name,year'}) == title_ids(
+            client, {}), 'Проверьте, что без ordering порядок прежний'
+
+    def test_filtered(self, client, rated):
+        ids = [title.id for title in rated]
+        assert title_ids(client, {
+            'genre': 'genre-1', 'year__gte': 1992, 'ordering': '-rating',
+        })[:3] == [ids[4], ids[3], ids[2]], (
+            'Проверьте сортировку вместе с фильтрами'
+        )
+
+    def test_unknown_field(self, client, rated):
+        assert title_ids(client, {'ordering': 'description'}) == title_ids(
+            client, {}), 'Проверьте, что сортировка только по разрешённым полям'
@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleRatings:
+    url = '/api/v1/titles/ratings/'
+
+    def test_ratings(self, client, catalog, django_assert_num_queries):
+        titles = catalog['titles']
+        ids = [titles[0].id, titles[1].id, 10 ** 6]
+        # Версии данных и одна выборка хранимых рейтингов.
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.url, {'ids': ','.join(map(str, ids))})
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос `{self.url}` возвращает статус 200'
+        )
+        results = response.json()['results']
+        assert [item['id'] for item in results] == ids[:2], (
+            'Проверьте, что рейтинги выдаются в порядке ids, '
+            'а неизвестные произведения пропускаются'
+        )
+        titles[0].refresh_from_db()
+        assert results[0]['rating'] == titles[0].rating
+        assert results[0]['reviews_count'] == len(catalog['reviews'])
+        assert results[1] == {
+            'id': titles[1].id, 'rating': None, 'reviews_count': 0}
+
+    def test_many_ids(self, client, catalog, django_assert_max_num_queries):
+        ids = [title.id for title in catalog['titles']] + list(
+            range(10 ** 6, 10 ** 6 + 1500))
+        with django_assert_max_num_queries(3):
+            response = client.get(
+                self.url, {'ids': ','.join(map(str, ids))})
+        assert response.status_code == 200
+        assert len(response.json()['results']) == len(catalog['titles'])
+
+    def test_invalid_ids(self, client, settings):
+        settings.TITLE_RATINGS_MAX_BATCH = 2
+        for params in ({}, {'ids': 'a,b'}, {'ids': '1,2,3'}):
+            response = client.get(self.url, params)
+            assert response.status_code == 400, (
+                f'Проверьте, что запрос с параметрами {params} '
+                'возвращает статус 400'
+            )
+
+
+@pytest.mark.django_db
+class TestStoredRating:
+
+    def stored(self, title):
+        title.refresh_from_db()
+        return title.score_sum, title.reviews_count, title.rating
+
+    def test_review_changes(self, catalog):
+        from api.models import Review
+
+        title, other = catalog['titles'][1], catalog['titles'][2]
+        users = catalog['users']
+        first = Review.objects.create(
+            title=title, author=users[0], text='Отзыв', score=4)
+        Review.objects.create(
+            title=title, author=users[1], text='Отзыв', score=9)
+        assert self.stored(title) == (13, 2, 6.5), (
+            'Проверьте, что рейтинг сохраняется при создании отзыва'
+        )
+        first.score = 5
+        first.save()
+        assert self.stored(title) == (14, 2, 7.0)
+        first.title = other
+        first.save()
+        assert self.stored(title) == (9, 1, 9.0)
+        assert self.stored(other) == (5, 1, 5.0)
+        first.delete()
+        assert self.stored(other) == (0, 0, None), (
+            'Проверьте, что без отзывов рейтинг пустой'
+        )
+
+    def test_rebuild(self, catalog):
+        from django.core.management import CommandError, call_command
+
+        from api.models import Title
+
+        title = catalog['titles'][0]
+        expected = self.stored(title)
+        assert expected[2] == 61 / 15
+        Title.objects.filter(pk=title.pk).update(rating=1.0)
+        Title.objects.filter(pk=catalog['titles'][1].pk).update(rating=2.0)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check', stdout=io.StringIO())
+        call_command('rebuild_ratings', stdout=io.StringIO())
+        assert self.stored(title) == expected, (
+            'Проверьте, что rebuild_ratings пересчитывает рейтинг'
+        )
+        assert self.stored(catalog['titles'][1]) == (0, 0, None)
+        call_command('rebuild_ratings', '--check', stdout=io.StringIO())
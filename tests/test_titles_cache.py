@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+
+class TestResponseCache:
+
+    def test_single_flight(self):
+        from api.caching import ResponseCache
+
+        cache = ResponseCache('test-single-flight', timeout=60)
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'value': 42}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cache.get_or_build('hot', build)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1, (
+            'Проверьте, что при промахе значение строит только один поток'
+        )
+        assert [value for value, _ in results] == [{'value': 42}] * 8
+        assert cache.stats() == {'hits': 0, 'misses': 1, 'coalesced': 7}
+
+
+@pytest.mark.django_db
+class TestTitlesCache:
+
+    def test_cached_list_and_detail(self, client, catalog,
+                                    django_assert_num_queries):
+        title = catalog['titles'][0]
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/'):
+            first = client.get(url, {'search': 'произведение'})
+            assert first['X-Cache'] == 'MISS'
+            with django_assert_num_queries(1):
+                second = client.get(url, {'search': 'произведение'})
+            assert second['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный запрос `{url}` берётся из кеша'
+            )
+            assert second.json() == first.json()
+
+    def test_host_in_key(self, client, catalog):
+        for host in ('a.example', 'b.example'):
+            response = client.get(
+                '/api/v1/titles/', {'page_size': 2}, HTTP_HOST=host)
+            assert response['X-Cache'] == 'MISS'
+            assert response.json()['next'].startswith(f'http://{host}/'), (
+                'Проверьте, что ссылки пагинации из кеша ведут на хост '
+                'запроса'
+            )
+        response = client.get(
+            '/api/v1/titles/', {'page_size': 2}, HTTP_HOST='a.example',
+            secure=True)
+        assert response.json()['next'].startswith('https://a.example/')
+
+    @pytest.mark.parametrize('change', ['review', 'genre', 'category'])
+    @pytest.mark.django_db(transaction=True)
+    def test_writes_invalidate(self, client, catalog, change):
+        from api.models import Review
+
+        title = catalog['titles'][1]
+        url = f'/api/v1/titles/{title.id}/'
+        client.get(url)
+        if change == 'review':
+            Review.objects.create(
+                title=title, author=catalog['users'][0], text='Ок', score=3)
+        elif change == 'genre':
+            genre = catalog['genres'][0]
+            genre.name = 'Новое имя'
+            genre.save()
+        else:
+            title.category.delete()
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            f'Проверьте, что изменение {change} сбрасывает кеш произведения'
+        )
@@ -0,0 +1,114 @@
+import pytest
+from rest_framework.test import APIClient
+
+from tests.fixtures.fixture_data import token_client
+
+
+@pytest.mark.django_db
+class TestTokenUser:
+
+    def test_token_contains_claims(self, admin):
+        admin.confirmation_code = 'code'
+        admin.save()
+        response = APIClient().post(
+            '/api/v1/auth/token/',
+            {'email': admin.email, 'confirmation_code': 'code'}
+        )
+        assert response.status_code == 200
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == admin.role, (
+            'Проверьте, что токен содержит роль пользователя'
+        )
+        assert token['is_staff'] is True
+
+    def test_no_user_query(self, admin, django_assert_num_queries):
+        client = token_client(admin)
+        # Первый запрос читает время отзыва токенов и кеширует его.
+        client.get('/api/v1/users/')
+        # Только COUNT и список пользователей, без загрузки admin.
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/users/')
+        assert response.status_code == 200
+
+    def test_legacy_token(self, admin):
+        response = token_client(admin, legacy=True).get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Проверьте, что токены без ролей по-прежнему принимаются'
+        )
+
+    def test_me(self, admin):
+        client = token_client(admin)
+        response = client.patch('/api/v1/users/me/', {'bio': 'Новое'})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/me/').json()['bio'] == 'Новое'
+
+    def test_role_change_revokes_token(self, admin):
+        client = token_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = admin.USER
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что после смены роли старый токен отзывается'
+        )
+        assert token_client(admin).get('/api/v1/users/').status_code == 403
+
+    def test_revocation_outlives_cache(self, admin):
+        from django.core.cache import cache
+
+        client = token_client(admin)
+        admin.is_active = False
+        admin.save()
+        # Процесс с пустым кешем берёт время отзыва из базы.
+        cache.clear()
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что отзыв токенов хранится в базе, а не только в кеше'
+        )
+        admin.bio = 'Новое'
+        admin.save()
+        cache.clear()
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что повторное сохранение не снимает отзыв'
+        )
+
+    def test_me_patch_keeps_fresh_fields(self, django_user_model):
+        User = django_user_model
+        user = User.objects.create(username='user', email='user@yamdb.fake')
+        client = token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        # Роль изменена в другом процессе, кеш этого процесса не знает.
+        User.objects.filter(pk=user.pk).update(role=User.MODERATOR)
+        response = client.patch('/api/v1/users/me/', {'bio': 'Новое'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert (user.role, user.bio) == (User.MODERATOR, 'Новое'), (
+            'Проверьте, что PATCH /users/me/ не перезаписывает роль '
+            'значением из кеша'
+        )
+
+    def test_profile_change_keeps_token(self, admin):
+        client = token_client(admin)
+        admin.bio = 'Новое'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 200
+
+    def test_username_change_keeps_token(self, admin):
+        client = token_client(admin)
+        response = client.patch('/api/v1/users/me/', {'username': 'renamed'})
+        assert response.status_code == 200
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что смена имени пользователя не отзывает его токен'
+        )
+        assert response.json()['username'] == 'renamed'
+
+    def test_author_permissions(self, catalog):
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        response = token_client(review.author).patch(url, {'text': 'Другой'})
+        assert response.status_code == 200
+        assert response.json()['author'] == review.author.username
+        stranger = catalog['users'][-1]
+        response = token_client(stranger).patch(url, {'text': 'Чужой'})
+        assert response.status_code == 403
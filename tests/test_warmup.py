@@ -0,0 +1,57 @@
+import os
+import runpy
+
+import pytest
+from django.conf import settings
+
+CONFIG_PATH = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **env):
+    for name in ('SERVER_MODE', 'WEB_CONCURRENCY', 'GUNICORN_THREADS',
+                 'GUNICORN_MAX_REQUESTS', 'GUNICORN_MAX_REQUESTS_JITTER'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG_PATH)
+
+
+class TestGunicornConfig:
+
+    def test_defaults(self, monkeypatch):
+        config = load_config(monkeypatch)
+        assert config['workers'] == config['CPUS'] * 2 + 1, (
+            'Проверьте, что число воркеров зависит от числа CPU'
+        )
+        assert config['preload_app'] is True
+        assert config['worker_class'] == 'gthread'
+        assert config['wsgi_app'] == 'api_yamdb.wsgi:application'
+        assert config['max_requests'] > 0
+        assert config['max_requests_jitter'] > 0, (
+            'Проверьте, что воркеры перезапускаются с разбросом'
+        )
+        assert callable(config['when_ready'])
+
+    def test_env(self, monkeypatch):
+        config = load_config(
+            monkeypatch, WEB_CONCURRENCY='3', GUNICORN_THREADS='1')
+        assert config['workers'] == 3
+        assert config['worker_class'] == 'sync'
+        config = load_config(monkeypatch, SERVER_MODE='asgi')
+        assert config['wsgi_app'] == 'api_yamdb.asgi:application'
+        assert config['worker_class'] == 'uvicorn.workers.UvicornWorker'
+
+
+@pytest.mark.django_db
+class TestWarmup:
+
+    def test_warmup(self, django_assert_num_queries):
+        from django.urls import get_resolver
+
+        from api.warmup import warmup
+
+        with django_assert_num_queries(0):
+            warmup()
+        assert get_resolver()._populated, (
+            'Проверьте, что прогрев строит таблицы маршрутов'
+        )